@@ -0,0 +1,183 @@
+import argparse
+import heapq
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'keboola'))
+
+from bench_parsers import load_corpus  # noqa: E402
+from contact_extractor import (EMAIL_PATTERN, EMAIL_REGEX, PHONE_PATTERN, PHONE_REGEX, clean_email,  # noqa: E402
+                               extract_contacts)
+from page_parsers import extract_text_and_links  # noqa: E402
+
+
+# Phone regex V2 as it was written in web_scraper.py before contact_extractor
+ORIGINAL_PHONE_REGEX = re.compile(r"""
+    (?:
+        \+420[-\s]?        # Optional country code +420 followed by an optional space or dash
+    )?
+    (?:
+        \d{3}[-\s]?        # First part of the phone number (3 digits) followed by an optional space or dash
+        \d{3}[-\s]?        # Second part of the phone number (3 digits) followed by an optional space or dash
+        \d{3}              # Third part of the phone number (3 digits)
+        |                  # OR
+        \d{3}[-\s]?        # First part of the phone number (3 digits) followed by an optional space or dash
+        \d{2}[-\s]?        # Second part of the phone number (2 digits) followed by an optional space or dash
+        \d{2}[-\s]?        # Third part of the phone number (2 digits) followed by an optional space or dash
+        \d{2}              # Fourth part of the phone number (2 digits)
+    )
+""", re.VERBOSE)
+
+# Both patterns in one alternation, the text is scanned once and emails win over phones at the same offset.
+# 'glued' captures an email local part continuing right after a phone, the only case where one scan
+# can differ from two separate findall calls
+CONTACT_REGEX = re.compile(
+    f"(?P<email>{EMAIL_PATTERN})|(?P<phone>{PHONE_PATTERN})(?:(?=(?P<glued>[a-zA-Z0-9._%+-]*@)))?", re.VERBOSE)
+
+
+def scan_separately(text):
+    """
+    Puvodni dvojice pruchodu (EMAIL_REGEX a PHONE_REGEX), vysledky slouci podle pozice.
+
+    Parametry:
+    text (str): Text stranky
+
+    Navratova hodnota:
+    list: Ctverice (typ, hodnota, zacatek, konec)
+    """
+    emails = (('email', match.group(), match.start(), match.end())
+              for match in EMAIL_REGEX.finditer(text))
+    phones = (('phone', match.group(), match.start(), match.end())
+              for match in PHONE_REGEX.finditer(text))
+    return list(heapq.merge(emails, phones, key=lambda contact: contact[2]))
+
+
+def scan_contacts(text):
+    """
+    Jednim pruchodem textu najde emaily i kandidaty telefonnich cisel vcetne jejich pozic.
+    Vysledek odpovida samostatnym findall obou regularnich vyrazu: telefonni cisla uvnitr
+    emailu se dohledaji v jeho useku a pokud na telefonni cislo primo navazuje email,
+    pouziji se pro celou stranku oba puvodni pruchody.
+
+    Parametry:
+    text (str): Text stranky
+
+    Navratova hodnota:
+    list: Ctverice (typ, hodnota, zacatek, konec) serazene podle pozice, typ je 'email' nebo 'phone'
+    """
+    contacts = []
+    for match in CONTACT_REGEX.finditer(text):
+        start, end = match.span()
+        if match.lastgroup == 'email':
+            contacts.append(('email', match.group(), start, end))
+            # Digits inside the local part are phone candidates for a separate phone scan too
+            contacts.extend(('phone', phone.group(), phone.start(), phone.end())
+                            for phone in PHONE_REGEX.finditer(text, start, end))
+        elif match.group('glued'):
+            return scan_separately(text)
+        else:
+            contacts.append(('phone', match.group(), start, end))
+    return contacts
+
+
+def findall_pair(text):
+    """
+    Puvodni extrakce dvema samostatnymi pruchody textu s puvodnim vyrazem pro telefony.
+    """
+    return set(EMAIL_REGEX.findall(text)), set(ORIGINAL_PHONE_REGEX.findall(text))
+
+
+def single_pass(text):
+    """
+    Jeden pruchod spojenym vyrazem (scan_contacts), pozice se zahodi.
+    """
+    emails = set()
+    phones = set()
+    for kind, value, _, _ in scan_contacts(text):
+        (emails if kind == 'email' else phones).add(value)
+    return emails, phones
+
+
+def clean_email_per_call(email):
+    """
+    Puvodni clean_email, ktery kompiluje vzory pri kazdem volani.
+    """
+    email_pattern = re.compile(
+        r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,7}\b')
+    valid_emails = [e.lower() for e in email_pattern.findall(email)]
+    domains = ['.cz', '.com', '.eu', '.org']
+    cleaned_emails = []
+    for email in valid_emails:
+        for domain in domains:
+            if email.endswith(domain):
+                email = re.sub(f'{domain}.*', domain, email)
+                break
+        cleaned_emails.append(email)
+    return ', '.join(cleaned_emails)
+
+
+def edge_case_texts(count, seed=0):
+    """
+    Vygeneruje kratke texty, kde telefonni cisla primo sousedi s emaily (jediny pripad, kdy se
+    jeden pruchod muze lisit od dvou).
+
+    Parametry:
+    count (int): Pocet textu
+    seed (int): Seminko generatoru
+
+    Navratova hodnota:
+    list: List textu
+    """
+    rnd = random.Random(seed)
+    pieces = ['777 123 456', '+420 603-111-222', '777123456', '603 11 22 33', 'info', 'a.b', '@', 'x.cz',
+              'poradna.org', ' ', '-', '.', '%', 'tel:', '12', '0', 'kontakt@web.cz', '\n']
+    return [''.join(rnd.choice(pieces) for _ in range(rnd.randint(1, 12))) for _ in range(count)]
+
+
+def best_time(func, items, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = [func(item) for item in items]
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Propustnost extrakce emailu a telefonnich cisel.')
+    parser.add_argument('--cache', help='SQLite cache odpovedi (RESPONSE_CACHE_PATH)')
+    parser.add_argument('--html-dir', help='adresar s ulozenymi .html soubory')
+    parser.add_argument('--synthetic', type=int, default=500,
+                        help='pocet generovanych stranek bez --cache/--html-dir')
+    parser.add_argument('--edge-cases', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    texts = [extract_text_and_links(html)[0]
+             for _, html in load_corpus(args.cache, args.html_dir, args.synthetic)]
+    megabytes = sum(len(text.encode('utf-8')) for text in texts) / 1e6
+    print(f"Corpus: {len(texts)} page texts, {megabytes:.1f} MB")
+
+    reference_time, reference = best_time(findall_pair, texts, args.repeat)
+    print(f"{'original pair':16s} {megabytes / reference_time:8.2f} MB/s")
+    edge_cases = edge_case_texts(args.edge_cases)
+    for name, func in [('extract_contacts', extract_contacts), ('single pass', single_pass)]:
+        elapsed, results = best_time(func, texts, args.repeat)
+        edge_mismatches = sum(findall_pair(text) != func(text) for text in edge_cases)
+        print(f"{name:16s} {megabytes / elapsed:8.2f} MB/s  "
+              f"mismatches: {sum(r != e for r, e in zip(results, reference))} corpus, {edge_mismatches} edge cases")
+
+    emails = [email for pair in reference for email in pair[0]] or ['Info@Poradna.cz']
+    per_call_time, expected = best_time(clean_email_per_call, emails, args.repeat)
+    precompiled_time, cleaned = best_time(clean_email, emails, args.repeat)
+    print(f"clean_email: {len(emails) / per_call_time:10.0f} emails/s per-call compile, "
+          f"{len(emails) / precompiled_time:10.0f} emails/s precompiled, mismatches: "
+          f"{sum(c != e for c, e in zip(cleaned, expected))}")
+
+
+if __name__ == "__main__":
+    main()
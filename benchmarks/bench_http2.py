@@ -0,0 +1,136 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import pandas as pd
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, '..', 'keboola'))
+
+from bench_scraper import free_port, percentile, wait_for_server  # noqa: E402
+from fake_web import site_id_from_host, site_kind, site_url  # noqa: E402
+
+# Client and protocol of every configuration: (HTTP2, HTTP2_PRIOR_KNOWLEDGE) of web_scraper
+CONFIGS = {
+    'aiohttp-http1': (False, False),
+    # httpx over HTTP/1.1 separates the client library from the protocol
+    'httpx-http1': (True, False),
+    'httpx-http2': (True, True),
+}
+
+
+def start_server(args):
+    """
+    Spusti asyncio variantu fake_web.py (HTTP/1.1 i h2c na jednom portu) se simulovanou latenci.
+
+    Navratova hodnota:
+    subprocess.Popen: Proces serveru
+    """
+    server = subprocess.Popen([sys.executable, os.path.join(BENCH_DIR, 'fake_web.py'), '--h2', '--port', str(args.port),
+                               '--timeout-delay', str(args.timeout + 1), '--latency', str(args.latency),
+                               '--connect-delay', str(args.connect_delay)])
+    wait_for_server(server, args.port)
+    return server
+
+
+def run_config(args):
+    """
+    Jedno mereni v samostatnem procesu, vysledek vypise jako JSON. Doba webu se meri z logu stahovani
+    od zacatku prvni po konec posledni stranky webu, bez cekani na volne misto v ASYNC_MAX_SITES.
+    """
+    import web_scraper as ws
+    from fetch_metrics import FetchLog
+
+    ws.SCRAPER_ENGINE = 'asyncio'
+    ws.REQUEST_TIMEOUT = args.timeout
+    ws.HTTP2, ws.HTTP2_PRIOR_KNOWLEDGE = CONFIGS[args.config]
+    ws.CONTACT_TOP_K = args.top_k
+    ws.SITE_MAX_PAGES = args.top_k + 1
+    ws.ASYNC_MAX_SITES = args.concurrent_sites
+    # The default politeness (2 requests/s per domain) would hide the protocol, it is loosened on the command line
+    ws.DOMAIN_RATE = args.domain_rate
+    ws.DOMAIN_BURST = ws.DOMAIN_INITIAL_CONCURRENCY = ws.DOMAIN_MAX_CONCURRENCY = args.domain_concurrency
+    urls = [site_url(site_id, args.port) for site_id in range(args.sites)]
+    fetch_log = FetchLog()
+    start = time.perf_counter()
+    rows = len(ws.scrape_urls(pd.DataFrame({'web': urls}), fetch_log=fetch_log))
+    elapsed = time.perf_counter() - start
+    log = fetch_log.close()
+
+    log['finished_at'] = log['started_at'] + log['total_s']
+    sites = log.groupby('host').agg(started_at=('started_at', 'min'), finished_at=('finished_at', 'max'))
+    sites['latency'] = sites['finished_at'] - sites['started_at']
+    sites['portal'] = [site_kind(site_id_from_host(host)) == 'portal' for host in sites.index]
+    latencies = sites['latency'].tolist()
+    portal = sites.loc[sites['portal'], 'latency'].tolist()
+    print(json.dumps({
+        'config': args.config,
+        'sites': args.sites,
+        'rows': rows,
+        'pages': len(log),
+        # A fetch that opened a new connection spent time in connect
+        'connections': int((log['connect_s'] > 0).sum()),
+        'seconds': elapsed,
+        'site_p50_ms': percentile(latencies, 50) * 1000,
+        'site_p95_ms': percentile(latencies, 95) * 1000,
+        'portal_p50_ms': percentile(portal, 50) * 1000,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Doba zpracovani webu pres HTTP/1.1 s keep-alive a pres HTTP/2 proti lokalnimu fake_web.py.')
+    parser.add_argument('--sites', type=int, default=100, help='pocet webu')
+    parser.add_argument('--configs', nargs='+', default=list(CONFIGS), choices=list(CONFIGS))
+    parser.add_argument('--top-k', type=int, default=20,
+                        help='CONTACT_TOP_K, kolik kontaktnich stranek se z webu stahne (portaly jich odkazuji 40)')
+    parser.add_argument('--concurrent-sites', type=int, default=5, help='ASYNC_MAX_SITES')
+    parser.add_argument('--latency', type=float, default=0.08,
+                        help='zdrzeni kazde odpovedi serveru v sekundach (round-trip)')
+    parser.add_argument('--connect-delay', type=float, default=0.2,
+                        help='zdrzeni noveho spojeni v sekundach (TCP a TLS handshake, 2-3 round-tripy)')
+    parser.add_argument('--domain-rate', type=float, default=100.0, help='DOMAIN_RATE, pozadavku za sekundu na web')
+    parser.add_argument('--domain-concurrency', type=int, default=16,
+                        help='soubeznych pozadavku na web (DOMAIN_BURST a limity AIMD), HTTP/1.1 jich posle nejvyse '
+                             'ASYNC_MAX_PER_HOST')
+    parser.add_argument('--timeout', type=float, default=2.0,
+                        help='REQUEST_TIMEOUT skriptu, weby druhu timeout odpovidaji o sekundu pozdeji')
+    parser.add_argument('--port', type=int, default=None, help='port serveru, bez zadani se vybere volny')
+    parser.add_argument('--config', help=argparse.SUPPRESS)
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_config(args)
+        return
+
+    if args.port is None:
+        args.port = free_port()
+    server = start_server(args)
+    results = []
+    try:
+        for config in args.configs:
+            command = [sys.executable, os.path.abspath(__file__), '--child', '--config', config,
+                       '--sites', str(args.sites), '--top-k', str(args.top_k),
+                       '--concurrent-sites', str(args.concurrent_sites), '--timeout', str(args.timeout),
+                       '--domain-rate', str(args.domain_rate), '--domain-concurrency', str(args.domain_concurrency),
+                       '--port', str(args.port)]
+            output = subprocess.run(command, stdout=subprocess.PIPE, text=True, check=True,
+                                    env=dict(os.environ, TQDM_DISABLE='1')).stdout
+            results.append(json.loads(output.strip().splitlines()[-1]))
+    finally:
+        server.terminate()
+        server.wait()
+
+    print(f"{'config':16s} {'pages':>6s} {'conns':>6s} {'seconds':>8s} {'site p50 ms':>11s} {'site p95 ms':>11s} "
+          f"{'portal p50 ms':>13s}")
+    for result in results:
+        print(f"{result['config']:16s} {result['pages']:6d} {result['connections']:6d} {result['seconds']:8.2f} "
+              f"{result['site_p50_ms']:11.1f} {result['site_p95_ms']:11.1f} {result['portal_p50_ms']:13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'keboola'))
+
+from page_parsers import PARSER_BACKENDS, extract_text_and_links  # noqa: E402
+from contact_extractor import EMAIL_REGEX, PHONE_REGEX  # noqa: E402
+from web_scraper import find_contact_links  # noqa: E402
+
+
+def synthetic_page(seed):
+    """
+    Vygeneruje stranku podobnou webum neziskovych organizaci (menu, kontakty, skripty, komentare).
+
+    Parametry:
+    seed (int): Seminko generatoru, stejne seminko vrati stejnou stranku
+
+    Navratova hodnota:
+    str: HTML obsah stranky
+    """
+    rnd = random.Random(seed)
+    menu = ''.join(f"<li><a href='/{slug}'>{label}</a></li>" for slug, label in rnd.sample(
+        [('kontakt', 'Kontakt'), ('o-nas', 'O nás'), ('sluzby', 'Služby'), ('kontakty', 'Kontakty &amp; mapa'),
+         ('en/contact', '<span>Contact</span> us'), ('kdo-jsem', 'kdo-jsem'), ('aktuality', 'Aktuality')], 5))
+    paragraphs = []
+    for i in range(rnd.randint(20, 200)):
+        paragraphs.append(
+            f"<p class='p{i}'>Poradna č. {i} &ndash; tel.&nbsp;+420 {rnd.randint(600, 799)} {rnd.randint(100, 999)} {rnd.randint(100, 999)}"
+            f"<br>e-mail: <a href='mailto:info{i}@poradna{seed}.cz'>info{i}@poradna{seed}.cz</a>"
+            f"<!-- stary@poradna{seed}.cz --> ordinace {rnd.randint(100, 999)}-{rnd.randint(10, 99)}-{rnd.randint(10, 99)}-{rnd.randint(10, 99)}</p>")
+    return (f"<!DOCTYPE html><html><head><meta charset='utf-8'><title>Poradna {seed}</title>"
+            f"<style>.x{{content:'css@poradna{seed}.cz'}}</style>"
+            f"<script>var tracking = 'skript@poradna{seed}.cz 777 888 999';</script></head>"
+            f"<body><nav><ul>{menu}</ul></nav>{''.join(paragraphs)}"
+            f"<footer>IČ: 12345678 <b>Adresa</b> Praha 2, 120 00<a href='?page=kontakt#mapa'>kontakt</a></footer></body></html>")
+
+
+def load_corpus(cache_path=None, html_dir=None, synthetic=0):
+    """
+    Nacte korpus HTML stranek z cache odpovedi, z adresare .html souboru nebo ho vygeneruje.
+
+    Parametry:
+    cache_path (str): Cesta k SQLite cache odpovedi z web_scraper.py
+    html_dir (str): Adresar s ulozenymi .html soubory
+    synthetic (int): Pocet generovanych stranek, pokud neni zadan jiny zdroj
+
+    Navratova hodnota:
+    list: List dvojic (url, html)
+    """
+    if cache_path:
+        with sqlite3.connect(cache_path) as conn:
+            return conn.execute('SELECT url, body FROM responses WHERE body IS NOT NULL').fetchall()
+    if html_dir:
+        corpus = []
+        for name in sorted(os.listdir(html_dir)):
+            if name.endswith(('.html', '.htm')):
+                with open(os.path.join(html_dir, name), encoding='utf-8', errors='replace') as f:
+                    corpus.append((f'https://{name}/', f.read()))
+        return corpus
+    return [(f'https://www.poradna{seed}.cz/', synthetic_page(seed)) for seed in range(synthetic)]
+
+
+def extract(url, html, backend):
+    """
+    Vytahne emaily, telefonni cisla a kontaktni odkazy stejne jako parse_page ve web_scraper.py.
+    """
+    text, anchors = extract_text_and_links(html, backend)
+    return set(EMAIL_REGEX.findall(text)), set(PHONE_REGEX.findall(text)), sorted(find_contact_links(anchors, url, set()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Porovnani backendu parsovani HTML.')
+    parser.add_argument('--cache', help='SQLite cache odpovedi (RESPONSE_CACHE_PATH)')
+    parser.add_argument('--html-dir', help='adresar s ulozenymi .html soubory')
+    parser.add_argument('--synthetic', type=int, default=500,
+                        help='pocet generovanych stranek bez --cache/--html-dir')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.cache, args.html_dir, args.synthetic)
+    megabytes = sum(len(html.encode('utf-8')) for _, html in corpus) / 1e6
+    print(f"Corpus: {len(corpus)} pages, {megabytes:.1f} MB")
+
+    reference = None
+    for backend in PARSER_BACKENDS:
+        best = None
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            results = [extract(url, html, backend) for url, html in corpus]
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        if reference is None:
+            reference = results
+        mismatches = sum(result != expected for result, expected in zip(results, reference))
+        print(f"{backend:12s} {len(corpus) / best:9.1f} pages/s {megabytes / best:7.2f} MB/s  mismatches: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
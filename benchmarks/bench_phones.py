@@ -0,0 +1,73 @@
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'keboola'))
+
+from phone_normalizer import parse_phone_cached, py_parse_phonenumber  # noqa: E402
+from web_scraper import clean_scraped_phones, explode_df, has_more_than_3_consecutive_zeros  # noqa: E402
+
+
+def clean_scraped_phones_rowwise(df, phone_scraped_column, web_column, scraped_web_column):
+    """
+    Puvodni clean_scraped_phones, py_parse_phonenumber se vola pro kazdy radek pres Series.apply.
+    """
+    phones_exp = explode_df(df, phone_scraped_column, web_column, scraped_web_column)
+    results = phones_exp[f"{phone_scraped_column}_scraped"].apply(py_parse_phonenumber)
+    ress_df = pd.DataFrame(results.tolist())
+    phones_exp["formated_number"] = ress_df["formated_number"]
+    phones_exp.drop(columns=[f"{phone_scraped_column}_scraped"], inplace=True)
+    phones_deduped = phones_exp.drop_duplicates(subset=[web_column, 'formated_number'])
+    filtered_df = phones_deduped[~phones_deduped['formated_number'].apply(
+        has_more_than_3_consecutive_zeros)]
+    return filtered_df.sort_values(by="formated_number", ascending=True)
+
+
+def measure(func, df, repeat, clear_cache):
+    best = None
+    for _ in range(repeat):
+        if clear_cache:
+            parse_phone_cached.cache_clear()
+        frame = df.copy()
+        start = time.perf_counter()
+        result = func(frame)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Porovnani radkoveho a davkoveho parsovani telefonnich cisel.')
+    parser.add_argument('--scraped', default=os.path.join(os.path.dirname(__file__), '..', 'data', 'df_scraped.csv'),
+                        help='CSV s vysledky skriptovani')
+    parser.add_argument('--phone-column', default='Phone Numbers')
+    parser.add_argument('--web-column', default='Website')
+    parser.add_argument('--page-column', default=None,
+                        help='sloupec se skriptovanou strankou, bez nej se pouzije web-column')
+    parser.add_argument('--scale', type=int, default=1, help='kolikrat zopakovat vstupni radky')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.scraped)
+    df = pd.concat([df] * args.scale, ignore_index=True)
+    page_column = args.page_column or args.web_column
+    columns = dict(phone_scraped_column=args.phone_column, web_column=args.web_column,
+                   scraped_web_column=page_column)
+    exploded = explode_df(df.copy(), args.phone_column, args.web_column, page_column)
+    print(f"Input: {len(df)} rows, {len(exploded)} phone candidates, "
+          f"{exploded[f'{args.phone_column}_scraped'].nunique()} distinct")
+
+    rowwise_time, expected = measure(
+        lambda frame: clean_scraped_phones_rowwise(frame, **columns), df, args.repeat, True)
+    print(f"{'row-wise apply':18s} {rowwise_time:8.3f} s")
+    for name, clear_cache in [('batch, cold cache', True), ('batch, warm cache', False)]:
+        elapsed, result = measure(lambda frame: clean_scraped_phones(frame, **columns), df, args.repeat, clear_cache)
+        identical = result.reset_index(drop=True).equals(expected.reset_index(drop=True))
+        print(f"{name:18s} {elapsed:8.3f} s  {rowwise_time / elapsed:6.1f}x  identical: {identical}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+import argparse
+import json
+import os
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, '..', 'keboola'))
+
+from fake_web import site_url  # noqa: E402
+
+
+def percentile(values, q):
+    if not values:
+        return float('nan')
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q / 100 * len(values)))]
+
+
+def wait_for_server(server, port, timeout=10):
+    deadline = time.time() + timeout
+    while time.time() < deadline and server.poll() is None:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Fake web server did not start on port {port}")
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(args):
+    """
+    Spusti fake_web.py v samostatnem procesu, aby server nesdilel GIL ani CPU cas s merenym skriptem.
+
+    Navratova hodnota:
+    subprocess.Popen: Proces serveru
+    """
+    server = subprocess.Popen([sys.executable, os.path.join(BENCH_DIR, 'fake_web.py'), '--port', str(args.port),
+                               '--paragraphs', str(args.paragraphs), '--timeout-delay', str(args.timeout + 1)])
+    wait_for_server(server, args.port)
+    return server
+
+
+def instrument(ws, latencies):
+    """
+    Obali funkce stahujici jednu stranku obou enginu a zaznamena dobu kazde stranky.
+    """
+    load_page = ws.load_page
+    scrape_page_async = ws.scrape_page_async
+
+    def timed_load_page(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return load_page(*args, **kwargs)
+        finally:
+            latencies.append(time.perf_counter() - start)
+
+    async def timed_scrape_page_async(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await scrape_page_async(*args, **kwargs)
+        finally:
+            latencies.append(time.perf_counter() - start)
+
+    ws.load_page = timed_load_page
+    ws.scrape_page_async = timed_scrape_page_async
+
+
+def run_config(args):
+    """
+    Jedno mereni v samostatnem procesu (peak RSS je za cely proces), vysledek vypise jako JSON.
+    """
+    import web_scraper as ws
+
+    ws.SCRAPER_ENGINE = args.engine
+    ws.PARSER_BACKEND = args.parser
+    ws.MAX_WORKERS = args.max_workers
+    ws.REQUEST_TIMEOUT = args.timeout
+    ws.SITE_DISCOVERY = args.discovery
+    latencies = []
+    instrument(ws, latencies)
+    urls = [site_url(site_id, args.port) for site_id in range(args.sites)]
+
+    with tempfile.TemporaryDirectory() as workdir:
+        usage_before = resource.getrusage(resource.RUSAGE_SELF)
+        start = time.perf_counter()
+        if args.target == 'process_data':
+            # Every path process_data reads or writes points into workdir, nothing of the pipeline data is touched
+            workdir_paths = {
+                'DB_POMOCI_PATH': 'db_pomoci.csv',
+                'CHECKPOINT_PATH': 'scrape_checkpoint.jsonl',
+                'URL_MAP_PATH': 'url_frontier.csv',
+                'SCRAPE_STATE_INPUT_PATH': 'scrape_state.csv',
+                'SCRAPE_STATE_PATH': 'scrape_state.csv',
+                'PREVIOUS_SCRAPED_PATH': 'df_scraped.csv',
+                'SCRAPED_OUTPUT_PATH': 'df_scraped.csv',
+                'SCRAPED_PARQUET_PATH': 'df_scraped.parquet',
+                'FETCH_LOG_PATH': 'fetch_log.csv',
+                'PROFILE_REPORT_PATH': 'pipeline_profile_scraper',
+                'PROFILE_DUMP_DIR': 'profile',
+            }
+            for name, file_name in workdir_paths.items():
+                setattr(ws, name, os.path.join(workdir, file_name))
+            ws.RESPONSE_CACHE_PATH = None
+            pd.DataFrame({'Nazev': [f"Spolek {i}" for i in range(args.sites)], 'Webova_stranka': urls,
+                          'E_mail': None}).to_csv(ws.DB_POMOCI_PATH, index=False)
+            rows = len(ws.process_data(max_iterations=0, incremental=False))
+        else:
+            rows = len(ws.scrape_urls(pd.DataFrame({'web': urls})))
+        elapsed = time.perf_counter() - start
+        usage_after = resource.getrusage(resource.RUSAGE_SELF)
+
+    cpu = (usage_after.ru_utime - usage_before.ru_utime) + (usage_after.ru_stime - usage_before.ru_stime)
+    pages = len(latencies)
+    print(json.dumps({
+        'config': f"{args.target} {args.engine}/{args.parser}{' +discovery' if args.discovery else ''}",
+        'sites': args.sites,
+        'rows': rows,
+        'pages': pages,
+        'seconds': elapsed,
+        'pages_per_sec': pages / elapsed if elapsed else float('nan'),
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        # ru_maxrss is in kilobytes on Linux
+        'peak_rss_mb': usage_after.ru_maxrss / 1024,
+        'cpu_ms_per_page': cpu * 1000 / pages if pages else float('nan'),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark skriptovani proti lokalnimu syntetickemu webu (benchmarks/fake_web.py).')
+    parser.add_argument('--sites', type=int, default=1000, help='pocet webu (1k az 100k)')
+    parser.add_argument('--configs', nargs='+', default=['threads:html.parser', 'asyncio:html.parser'],
+                        help='konfigurace enginu ve tvaru engine:parser, napr. threads:lxml')
+    parser.add_argument('--target', choices=['scrape_urls', 'process_data'], default='scrape_urls',
+                        help='merena funkce web_scraper.py')
+    parser.add_argument('--max-workers', type=int, default=8, help='MAX_WORKERS vlaknoveho enginu')
+    parser.add_argument('--timeout', type=float, default=2.0,
+                        help='REQUEST_TIMEOUT skriptu, weby druhu timeout odpovidaji o sekundu pozdeji')
+    parser.add_argument('--paragraphs', type=int, default=20, help='odstavcu textu na domovske strance')
+    parser.add_argument('--port', type=int, default=None, help='port serveru, bez zadani se vybere volny')
+    parser.add_argument('--discovery', action='store_true',
+                        help='zapnout SITE_DISCOVERY (robots.txt, sitemap a bezne cesty kontaktu)')
+    parser.add_argument('--engine', help=argparse.SUPPRESS)
+    parser.add_argument('--parser', help=argparse.SUPPRESS)
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_config(args)
+        return
+
+    if args.port is None:
+        args.port = free_port()
+    server = start_server(args)
+    results = []
+    try:
+        for config in args.configs:
+            engine, _, backend = config.partition(':')
+            command = [sys.executable, os.path.abspath(__file__), '--child', '--engine', engine,
+                       '--parser', backend or 'html.parser', '--sites', str(args.sites), '--target', args.target,
+                       '--max-workers', str(args.max_workers), '--timeout', str(args.timeout),
+                       '--port', str(args.port)] + (['--discovery'] if args.discovery else [])
+            output = subprocess.run(command, stdout=subprocess.PIPE, text=True, check=True,
+                                    env=dict(os.environ, TQDM_DISABLE='1')).stdout
+            results.append(json.loads(output.strip().splitlines()[-1]))
+    finally:
+        server.terminate()
+        server.wait()
+
+    print(f"{'config':36s} {'pages':>7s} {'pages/s':>8s} {'p50 ms':>8s} {'p99 ms':>8s} {'RSS MB':>7s} {'CPU ms/page':>11s}")
+    for result in results:
+        print(f"{result['config']:36s} {result['pages']:7d} {result['pages_per_sec']:8.1f} {result['p50_ms']:8.1f} "
+              f"{result['p99_ms']:8.1f} {result['peak_rss_mb']:7.1f} {result['cpu_ms_per_page']:11.2f}")
+
+
+if __name__ == "__main__":
+    main()
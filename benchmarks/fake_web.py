@@ -0,0 +1,364 @@
+import argparse
+import asyncio
+import random
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    import h2.config
+    import h2.connection
+    import h2.events
+except ImportError:
+    h2 = None
+
+# Every site has its own loopback address, so per-host pools and the domain scheduler see distinct hosts
+FIRST_HOST_OCTET = 1
+DEFAULT_PORT = 8765
+# Site kinds by site_id % SITE_KIND_PERIOD, the remaining ids are regular sites
+SITE_KIND_PERIOD = 20
+SITE_KINDS = {0: 'missing', 1: 'redirect', 2: 'slow', 3: 'timeout', 4: 'moved_contact', 5: 'portal',
+              6: 'unlinked_contact', 7: 'binary_contact', 8: 'huge_page', 9: 'legacy_charset'}
+SLOW_DELAY = 0.5
+# A portal (hospital, university) links a contact page of every department from its homepage
+PORTAL_DEPARTMENTS = 40
+# A 'binary_contact' site serves a PDF as its contact page, a 'huge_page' homepage carries an inline gallery
+BINARY_CONTACT_BYTES = 300 * 1024
+HUGE_PAGE_BYTES = 3 * 1024 * 1024
+# Connection preface of HTTP/2 with prior knowledge (h2c), anything else on the socket is HTTP/1.1
+H2_PREFACE = b'PRI * HTTP/2.0\r\n\r\nSM\r\n\r\n'
+
+
+def site_host(site_id):
+    """
+    Vrati loopback adresu webu (127.x.y.z), cely rozsah 127.0.0.0/8 konci na lokalnim rozhrani.
+
+    Parametry:
+    site_id (int): Cislo webu od 0
+
+    Navratova hodnota:
+    str: IP adresa webu
+    """
+    n = site_id + 1
+    return f"127.{FIRST_HOST_OCTET + (n >> 16)}.{(n >> 8) & 255}.{n & 255}"
+
+
+def site_id_from_host(host):
+    """
+    Opak site_host, pro neznamy host vrati None.
+
+    Parametry:
+    host (str): Hlavicka Host bez portu
+
+    Navratova hodnota:
+    int: Cislo webu nebo None
+    """
+    try:
+        first, a, b, c = (int(part) for part in host.split('.'))
+    except ValueError:
+        return None
+    if first != 127 or a < FIRST_HOST_OCTET:
+        return None
+    return (((a - FIRST_HOST_OCTET) << 16) | (b << 8) | c) - 1
+
+
+def site_url(site_id, port=DEFAULT_PORT):
+    return f"http://{site_host(site_id)}:{port}/"
+
+
+def site_kind(site_id):
+    return SITE_KINDS.get(site_id % SITE_KIND_PERIOD, 'regular')
+
+
+def paragraphs(rnd, site_id, count):
+    return ''.join(
+        f"<p>Poradna {site_id}-{i} &ndash; tel.&nbsp;+420 {rnd.randint(600, 799)} {rnd.randint(100, 999)} "
+        f"{rnd.randint(100, 999)}, <a href='/sluzby/{i}'>služba {i}</a> pro klienty v kraji.</p>"
+        for i in range(count))
+
+
+def render_page(site_id, path, page_paragraphs):
+    """
+    Vygeneruje stranku webu podobneho webum neziskovych organizaci. Stejny web a cesta vraci
+    vzdy stejny obsah.
+
+    Parametry:
+    site_id (int): Cislo webu
+    path (str): Cesta pozadavku bez query
+    page_paragraphs (int): Pocet odstavcu textu na domovske strance
+
+    Navratova hodnota:
+    tuple: Status, hlavicky (dict) a telo odpovedi (str, nebo bytes u jineho kodovani nez UTF-8)
+    """
+    kind = site_kind(site_id)
+    rnd = random.Random(f"{site_id}{path}")
+    if kind == 'missing' and path == '/':
+        return 404, {}, 'Not Found'
+    if kind == 'redirect' and path == '/':
+        return 301, {'Location': '/uvod'}, ''
+    if kind == 'moved_contact' and path == '/kontakt':
+        return 301, {'Location': '/kontakty'}, ''
+    if kind == 'binary_contact' and path == '/kontakt':
+        return 200, {'Content-Type': 'application/pdf'}, b'%PDF-1.4\n' + bytes(BINARY_CONTACT_BYTES)
+    if path == '/robots.txt':
+        return 200, {'Content-Type': 'text/plain'}, "User-agent: *\nDisallow: /admin\nSitemap: /sitemap.xml\n"
+    if path == '/sitemap.xml':
+        locs = ''.join(f"<url><loc>{loc}</loc></url>" for loc in ('/', '/o-nas', '/aktuality', '/kontaktni-udaje'))
+        return 200, {'Content-Type': 'application/xml'}, (
+            f"<?xml version='1.0' encoding='UTF-8'?>"
+            f"<urlset xmlns='http://www.sitemaps.org/schemas/sitemap/0.9'>{locs}</urlset>")
+    if path in ('/', '/uvod'):
+        # Only the sitemap and the common paths lead to the contact page of an 'unlinked_contact' site
+        contact_links = ("<a href='/kontakt'>Kontakt</a> <a href='/stary-kontakt'>starý kontakt</a> "
+                         if kind != 'unlinked_contact' else '')
+        departments = ''
+        if kind == 'portal':
+            departments = ''.join(f"<a href='/oddeleni-{i}/kontakt#mapa'>Kontakt oddělení {i}</a> "
+                                  f"<a href='/oddeleni-{i}/kontakt?lang=en'>Contact</a> " for i in range(PORTAL_DEPARTMENTS))
+        gallery = ''
+        if kind == 'huge_page':
+            gallery = f"<img src='data:image/png;base64,{'A' * HUGE_PAGE_BYTES}'>"
+        body = (f"<nav><a href='/'>Úvod</a> {contact_links}<a href='/o-nas'>O nás</a> "
+                f"<a href='/aktuality'>Aktuality</a></nav>"
+                f"<h1>Spolek {site_id}</h1>{departments}{paragraphs(rnd, site_id, page_paragraphs)}{gallery}")
+    elif path in ('/kontakt', '/kontakty', '/kontaktni-udaje') or (kind == 'portal' and path.endswith('/kontakt')):
+        body = (f"<h1>Kontakt</h1><p>email: info@spolek{site_id}.cz, tel. {rnd.randint(600, 799)} "
+                f"{rnd.randint(100, 999)} {rnd.randint(100, 999)}</p><a href='/o-nas'>O nás</a>")
+    elif path == '/o-nas':
+        body = f"<h1>O nás</h1><p>reditel@spolek{site_id}.cz</p>{paragraphs(rnd, site_id, 5)}"
+    else:
+        return 404, {}, 'Not Found'
+    if kind == 'legacy_charset':
+        # Old sites declare their charset only in the page itself
+        return 200, {'Content-Type': 'text/html'}, (
+            f"<!DOCTYPE html><html><head><meta http-equiv='Content-Type' content='text/html; charset=windows-1250'>"
+            f"<title>Spolek {site_id}</title></head><body>{body}</body></html>").encode('windows-1250')
+    return 200, {'Content-Type': 'text/html; charset=utf-8'}, (
+        f"<!DOCTYPE html><html><head><meta charset='utf-8'><title>Spolek {site_id}</title></head>"
+        f"<body>{body}</body></html>")
+
+
+def response_delay(host, timeout_delay):
+    site_id = site_id_from_host(host.split(':')[0])
+    kind = site_kind(site_id) if site_id is not None else None
+    if kind == 'slow':
+        return SLOW_DELAY
+    if kind == 'timeout':
+        return timeout_delay
+    return 0.0
+
+
+def respond(host, target, page_paragraphs):
+    """
+    Odpoved na GET pozadavek, spolecna pro HTTP/1.1 i HTTP/2.
+
+    Parametry:
+    host (str): Hlavicka Host (u HTTP/2 :authority), muze obsahovat port
+    target (str): Cesta pozadavku vcetne query
+    page_paragraphs (int): Pocet odstavcu textu na domovske strance
+
+    Navratova hodnota:
+    tuple: Status, hlavicky (dict) a telo odpovedi v bajtech
+    """
+    site_id = site_id_from_host(host.split(':')[0])
+    path = target.split('?')[0].split('#')[0]
+    if site_id is None:
+        status, headers, body = 404, {}, 'Unknown site'
+    else:
+        status, headers, body = render_page(site_id, path, page_paragraphs)
+    return status, headers, body if isinstance(body, bytes) else body.encode('utf-8')
+
+
+class FakeWebHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately, without this delayed ACKs add 40 ms to every response
+    disable_nagle_algorithm = True
+    page_paragraphs = 20
+    timeout_delay = 5.0
+    latency = 0.0
+    connect_delay = 0.0
+
+    def log_message(self, format, *args):
+        pass
+
+    def setup(self):
+        time.sleep(self.connect_delay)
+        super().setup()
+
+    def do_GET(self):
+        host = self.headers.get('Host', '')
+        time.sleep(self.latency + response_delay(host, self.timeout_delay))
+        status, headers, payload = respond(host, self.path, self.page_paragraphs)
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class FakeWebServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def handle_error(self, request, client_address):
+        # Clients hang up on the 'timeout' sites, that is the expected outcome and not worth a traceback
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+def serve(port=DEFAULT_PORT, page_paragraphs=20, timeout_delay=5.0, latency=0.0, connect_delay=0.0):
+    """
+    Spusti server syntetickeho webu na vsech loopback adresach, bezi do preruseni.
+
+    Parametry:
+    port (int): Port serveru
+    page_paragraphs (int): Pocet odstavcu textu na domovske strance
+    timeout_delay (float): Jak dlouho odpovida web druhu 'timeout', ma byt delsi nez timeout klienta
+    latency (float): Zdrzeni kazde odpovedi v sekundach (simulovany round-trip)
+    connect_delay (float): Zdrzeni kazdeho noveho spojeni v sekundach (simulovany TCP a TLS handshake)
+    """
+    FakeWebHandler.page_paragraphs = page_paragraphs
+    FakeWebHandler.timeout_delay = timeout_delay
+    FakeWebHandler.latency = latency
+    FakeWebHandler.connect_delay = connect_delay
+    with FakeWebServer(('0.0.0.0', port), FakeWebHandler) as server:
+        server.serve_forever()
+
+
+class AsyncFakeWeb:
+    """
+    Asyncio varianta serveru, na jednom portu mluvi HTTP/1.1 s keep-alive i HTTP/2 s prior knowledge (h2c),
+    aby se protokoly daly porovnat nad stejnym serverem. Pozadavky jednoho HTTP/2 spojeni se vyrizuji soubezne.
+    """
+
+    def __init__(self, page_paragraphs=20, timeout_delay=5.0, latency=0.0, connect_delay=0.0):
+        self.page_paragraphs = page_paragraphs
+        self.timeout_delay = timeout_delay
+        self.latency = latency
+        self.connect_delay = connect_delay
+
+    async def response(self, host, target):
+        await asyncio.sleep(self.latency + response_delay(host, self.timeout_delay))
+        return respond(host, target, self.page_paragraphs)
+
+    async def handle(self, reader, writer):
+        try:
+            await asyncio.sleep(self.connect_delay)
+            start = await reader.readexactly(3)
+            if start == H2_PREFACE[:3]:
+                await self.handle_h2(start, reader, writer)
+            else:
+                await self.handle_http11(start, reader, writer)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def handle_http11(self, start, reader, writer):
+        head = start + await reader.readuntil(b'\r\n\r\n')
+        while True:
+            request_line, *header_lines = head.decode('latin-1').split('\r\n')
+            target = request_line.split(' ')[1]
+            headers = {name.strip().lower(): value.strip()
+                       for name, _, value in (line.partition(':') for line in header_lines if line)}
+            status, response_headers, payload = await self.response(headers.get('host', ''), target)
+            lines = [f"HTTP/1.1 {status} {'OK' if status < 400 else 'Error'}", f"Content-Length: {len(payload)}"]
+            lines.extend(f"{name}: {value}" for name, value in response_headers.items())
+            writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + payload)
+            await writer.drain()
+            if headers.get('connection', '').lower() == 'close':
+                return
+            head = await reader.readuntil(b'\r\n\r\n')
+
+    async def handle_h2(self, start, reader, writer):
+        connection = h2.connection.H2Connection(config=h2.config.H2Configuration(client_side=False))
+        connection.initiate_connection()
+        writer.write(connection.data_to_send())
+        # Streams waiting for the client to open its flow control window
+        window_open = {}
+        streams = set()
+        data = start
+        while True:
+            for event in connection.receive_data(data):
+                if isinstance(event, h2.events.RequestReceived):
+                    headers = dict((name.decode(), value.decode()) for name, value in event.headers)
+                    window_open[event.stream_id] = asyncio.Event()
+                    streams.add(asyncio.ensure_future(self.send_h2_response(
+                        connection, writer, event.stream_id, headers, window_open)))
+                elif isinstance(event, h2.events.WindowUpdated):
+                    waiting = window_open.values() if event.stream_id == 0 else [window_open.get(event.stream_id)]
+                    for opened in waiting:
+                        if opened is not None:
+                            opened.set()
+                elif isinstance(event, h2.events.StreamReset):
+                    opened = window_open.pop(event.stream_id, None)
+                    if opened is not None:
+                        opened.set()
+                elif isinstance(event, h2.events.ConnectionTerminated):
+                    for stream in streams:
+                        stream.cancel()
+                    return
+            writer.write(connection.data_to_send())
+            await writer.drain()
+            data = await reader.read(65536)
+            if not data:
+                for stream in streams:
+                    stream.cancel()
+                return
+
+    async def send_h2_response(self, connection, writer, stream_id, headers, window_open):
+        status, response_headers, payload = await self.response(headers.get(':authority', ''), headers[':path'])
+        if stream_id not in window_open:
+            return
+        connection.send_headers(stream_id, [(':status', str(status)), ('content-length', str(len(payload)))] +
+                                [(name.lower(), value) for name, value in response_headers.items()],
+                                end_stream=not payload)
+        while payload and stream_id in window_open:
+            size = min(connection.local_flow_control_window(stream_id), connection.max_outbound_frame_size,
+                       len(payload))
+            if size == 0:
+                window_open[stream_id].clear()
+                writer.write(connection.data_to_send())
+                await window_open[stream_id].wait()
+                continue
+            connection.send_data(stream_id, payload[:size], end_stream=size == len(payload))
+            payload = payload[size:]
+            writer.write(connection.data_to_send())
+            await writer.drain()
+        window_open.pop(stream_id, None)
+        writer.write(connection.data_to_send())
+
+
+async def serve_async(port=DEFAULT_PORT, page_paragraphs=20, timeout_delay=5.0, latency=0.0, connect_delay=0.0):
+    """
+    Spusti asyncio server syntetickeho webu (HTTP/1.1 a h2c), bezi do preruseni. Parametry jako serve.
+    """
+    if h2 is None:
+        raise ImportError("fake_web --h2 requires the h2 package")
+    web = AsyncFakeWeb(page_paragraphs, timeout_delay, latency, connect_delay)
+    server = await asyncio.start_server(web.handle, '0.0.0.0', port, backlog=1024)
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Lokalni synteticky web pro benchmarky skriptovani.')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--paragraphs', type=int, default=20, help='odstavcu textu na domovske strance')
+    parser.add_argument('--timeout-delay', type=float, default=5.0,
+                        help='zdrzeni odpovedi webu druhu timeout v sekundach')
+    parser.add_argument('--latency', type=float, default=0.0, help='zdrzeni kazde odpovedi v sekundach')
+    parser.add_argument('--connect-delay', type=float, default=0.0,
+                        help='zdrzeni kazdeho noveho spojeni v sekundach (handshake)')
+    parser.add_argument('--h2', action='store_true',
+                        help='asyncio server, ktery krome HTTP/1.1 mluvi i HTTP/2 s prior knowledge (h2c)')
+    args = parser.parse_args()
+    if args.h2:
+        asyncio.run(serve_async(args.port, args.paragraphs, args.timeout_delay, args.latency, args.connect_delay))
+    else:
+        serve(args.port, args.paragraphs, args.timeout_delay, args.latency, args.connect_delay)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+import codecs
+import re
+import threading
+
+# The HTML standard looks for <meta charset> in the first 1024 bytes
+SNIFF_BYTES = 1024
+META_CHARSET_REGEX = re.compile(rb'<meta[^>]+?charset\s*=\s*["\']?\s*([A-Za-z0-9_:.-]+)', re.IGNORECASE)
+BOMS = [(codecs.BOM_UTF8, 'utf-8-sig'), (codecs.BOM_UTF16_LE, 'utf-16'), (codecs.BOM_UTF16_BE, 'utf-16')]
+# Content types worth parsing: HTML pages, robots.txt and sitemaps
+ACCEPTED_CONTENT_TYPES = ('text/', 'application/xhtml+xml', 'application/xml')
+
+_body_stats = None
+_body_stats_lock = threading.Lock()
+
+
+class UnsupportedContentType(ValueError):
+    """
+    Odpoved neni HTML ani text, telo se nestahuje.
+    """
+
+
+def accepts_content_type(content_type):
+    """
+    Overi, zda ma smysl stahovat telo odpovedi daneho typu. Odpoved bez Content-Type se stahuje.
+
+    Parametry:
+    content_type (str): Hlavicka Content-Type nebo None
+
+    Navratova hodnota:
+    bool: True pro HTML, text a XML
+    """
+    if not content_type:
+        return True
+    media_type = content_type.split(';')[0].strip().lower()
+    return media_type.startswith(ACCEPTED_CONTENT_TYPES)
+
+
+def header_charset(content_type):
+    """
+    Vrati parametr charset z hlavicky Content-Type.
+
+    Parametry:
+    content_type (str): Hlavicka Content-Type nebo None
+
+    Navratova hodnota:
+    str: Charset bez uvozovek, nebo None pokud neni uveden
+    """
+    if not content_type:
+        return None
+    for parameter in content_type.split(';')[1:]:
+        name, _, value = parameter.partition('=')
+        if name.strip().lower() == 'charset':
+            return value.strip().strip('"\'') or None
+    return None
+
+
+def known_encoding(name):
+    """
+    Prevede nazev kodovani z hlavicky nebo <meta> na kanonicky nazev codecs.
+
+    Parametry:
+    name (str | bytes): Nazev kodovani nebo None
+
+    Navratova hodnota:
+    str: Nazev kodovani pro codecs, nebo None pro neznamy nazev
+    """
+    if not name:
+        return None
+    try:
+        return codecs.lookup(name.decode('ascii', 'ignore') if isinstance(name, bytes) else name).name
+    except LookupError:
+        return None
+
+
+def sniff_charset(head, declared=None):
+    """
+    Urci kodovani tela podle poradi z HTML standardu: BOM, charset z hlavicky, <meta charset>, jinak UTF-8.
+
+    Parametry:
+    head (bytes): Zacatek tela odpovedi
+    declared (str): Charset z hlavicky Content-Type nebo None
+
+    Navratova hodnota:
+    str: Nazev kodovani pro codecs
+    """
+    for bom, encoding in BOMS:
+        if head.startswith(bom):
+            return encoding
+    encoding = known_encoding(declared)
+    if encoding is None:
+        match = META_CHARSET_REGEX.search(head[:SNIFF_BYTES])
+        encoding = known_encoding(match.group(1)) if match else None
+    return encoding or 'utf-8'
+
+
+class BodyReader:
+    """
+    Cte telo odpovedi po castech: dekoduje prubezne a po max_bytes bajtech cteni ukonci.
+    Kodovani se urci z prvnich SNIFF_BYTES bajtu.
+    """
+
+    def __init__(self, max_bytes, declared_charset=None):
+        """
+        Parametry:
+        max_bytes (int): Maximalni pocet prectenych bajtu tela
+        declared_charset (str): Charset z hlavicky Content-Type nebo None
+        """
+        self.max_bytes = max_bytes
+        self.declared_charset = declared_charset
+        self.size = 0
+        self.truncated = False
+        self.encoding = None
+        self._head = b''
+        self._decoder = None
+        self._parts = []
+
+    def feed(self, chunk):
+        """
+        Prida dalsi cast tela.
+
+        Parametry:
+        chunk (bytes): Cast tela
+
+        Navratova hodnota:
+        bool: False, pokud bylo dosazeno limitu a dalsi cteni nema smysl
+        """
+        if self.size + len(chunk) > self.max_bytes:
+            chunk = chunk[:self.max_bytes - self.size]
+            self.truncated = True
+        self.size += len(chunk)
+        if self._decoder is None:
+            self._head += chunk
+            if len(self._head) >= SNIFF_BYTES or self.truncated:
+                self._start_decoding()
+        else:
+            self._parts.append(self._decoder.decode(chunk))
+        return not self.truncated
+
+    def _start_decoding(self):
+        self.encoding = sniff_charset(self._head, self.declared_charset)
+        self._decoder = codecs.getincrementaldecoder(self.encoding)(errors='replace')
+        self._parts.append(self._decoder.decode(self._head))
+        self._head = b''
+
+    def finish(self):
+        """
+        Navratova hodnota:
+        str: Dekodovane telo (u oriznuteho tela bez nedokonceneho posledniho znaku a tagu)
+        """
+        if self._decoder is None:
+            self._start_decoding()
+        # A truncated body may end inside a multi-byte character, drop it instead of a replacement character
+        self._parts.append(self._decoder.decode(b'', final=not self.truncated))
+        body = ''.join(self._parts)
+        if self.truncated and body.rfind('<') > body.rfind('>'):
+            # A tag cut in half would be parsed as text (e.g. a megabyte of inline base64 image)
+            body = body[:body.rfind('<')]
+        return body
+
+
+class BodyStats:
+    """
+    Pocty odpovedi podle zpusobu precteni tela, pro souhrn behu.
+    """
+
+    def __init__(self):
+        """
+        Vytvori prazdna pocitadla, sdili je vsechna vlakna i asyncio engine.
+        """
+        self.complete = 0
+        self.truncated = 0
+        self.skipped_content_type = 0
+        self.bytes = 0
+        self._lock = threading.Lock()
+
+    def add(self, reader):
+        """
+        Zapocita prectene telo odpovedi.
+
+        Parametry:
+        reader (BodyReader): Dokonceny reader tela
+        """
+        with self._lock:
+            self.bytes += reader.size
+            if reader.truncated:
+                self.truncated += 1
+            else:
+                self.complete += 1
+
+    def add_skipped(self):
+        """
+        Zapocita odpoved, jejiz telo se kvuli Content-Type nestahovalo.
+        """
+        with self._lock:
+            self.skipped_content_type += 1
+
+    def stats(self):
+        """
+        Navratova hodnota:
+        dict: Pocet celych a oriznutych tel, preskocenych odpovedi a prectenych bajtu
+        """
+        with self._lock:
+            return {'complete': self.complete, 'truncated': self.truncated,
+                    'skipped_content_type': self.skipped_content_type, 'bytes': self.bytes}
+
+
+def get_body_stats():
+    """
+    Navratova hodnota:
+    BodyStats: Pocitadla aktualniho behu, bez predchoziho set_body_stats se vytvori nova
+    """
+    global _body_stats
+    with _body_stats_lock:
+        if _body_stats is None:
+            _body_stats = BodyStats()
+        return _body_stats
+
+
+def set_body_stats(stats):
+    """
+    Parametry:
+    stats (BodyStats): Nova pocitadla, do kterych zapisuji oba enginy
+    """
+    global _body_stats
+    with _body_stats_lock:
+        _body_stats = stats
@@ -0,0 +1,77 @@
+import json
+import os
+import threading
+
+
+class ScrapeCheckpoint:
+    """
+    Append-only checkpoint vysledku skriptovani. Kazdy dokonceny web se hned zapise jako jeden
+    JSON radek, takze po padu behu lze pokracovat bez opakovani hotovych webu. Checkpoint prezije
+    jen lokalni beh, Keboola vystupy ani stav preruseneho jobu neuklada.
+    """
+
+    def __init__(self, path):
+        """
+        Parametry:
+        path (str): Cesta k JSONL souboru checkpointu
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+    def load(self):
+        """
+        Nacte dokoncene weby z checkpointu. Neuplny posledni radek (pad pri zapisu) se preskoci a odrizne,
+        aby se na nej dalsi append nepripojil a nerozbil i nasledujici web.
+
+        Navratova hodnota:
+        dict: Zakladni URL adresa -> list radku vysledku
+        """
+        completed = {}
+        if not os.path.exists(self.path):
+            return completed
+        complete_size = 0
+        with open(self.path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                complete_size += len(line)
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                completed[record['url']] = record['rows']
+        if complete_size < os.path.getsize(self.path):
+            with open(self.path, 'r+b') as f:
+                f.truncate(complete_size)
+        return completed
+
+    def reset(self):
+        """
+        Zahodi checkpoint predchoziho behu a pripravi prazdny soubor.
+        """
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        open(self.path, 'w', encoding='utf-8').close()
+
+    def append(self, rows):
+        """
+        Zapise radky jednoho dokonceneho webu na konec checkpointu a hned je propise na disk.
+
+        Parametry:
+        rows (list): Radky vysledku jednoho webu (vystup process_url)
+        """
+        if not rows:
+            return
+        line = json.dumps({'url': rows[0]['Base Website'], 'rows': rows}, ensure_ascii=False)
+        with self._lock, open(self.path, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def remove(self):
+        """
+        Smaze checkpoint po uspesnem dokonceni behu.
+        """
+        if os.path.exists(self.path):
+            os.remove(self.path)
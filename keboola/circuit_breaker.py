@@ -0,0 +1,97 @@
+import threading
+
+from domain_scheduler import domain_key
+
+
+class CircuitOpenError(ConnectionError):
+    """
+    Pozadavek nebyl odeslan, jistic hostu je rozpojeny.
+    """
+
+
+class HostCircuitBreaker:
+    """
+    Jistic pro kazdy host: po failure_threshold po sobe jdoucich selhanich na urovni spojeni
+    (DNS, spojeni, TLS, timeout) se rozpoji a host zustane do konce behu nedostupny, dalsi
+    pozadavky na nej se vubec neposilaji. Odpoved serveru (i 4xx/5xx) pocitadlo selhani nuluje.
+    """
+
+    def __init__(self, failure_threshold=2):
+        """
+        Parametry:
+        failure_threshold (int): Pocet po sobe jdoucich selhani spojeni, po kterem se jistic rozpoji
+        """
+        self.failure_threshold = failure_threshold
+        self.short_circuited = 0
+        self._failures = {}
+        self._open = {}
+        self._lock = threading.Lock()
+
+    def is_open(self, url):
+        """
+        Overi, zda je jistic hostu URL adresy rozpojeny, a pocita tak preskocene pozadavky.
+
+        Parametry:
+        url (str): URL adresa pozadavku
+
+        Navratova hodnota:
+        bool: True, pokud se pozadavek nema posilat
+        """
+        host = domain_key(url)
+        with self._lock:
+            if host not in self._open:
+                return False
+            self.short_circuited += 1
+            return True
+
+    def open_error(self, url):
+        """
+        Navratova hodnota:
+        CircuitOpenError: Chyba pro log stahovani, nebo None pokud je jistic hostu sepnuty
+        """
+        if not self.is_open(url):
+            return None
+        return CircuitOpenError(f"Circuit open for {domain_key(url)}")
+
+    def record_success(self, url):
+        """
+        Zapocita odpoved serveru, pocitadlo selhani hostu se vynuluje. Rozpojeny jistic zustava rozpojeny.
+
+        Parametry:
+        url (str): URL adresa pozadavku
+        """
+        with self._lock:
+            self._failures.pop(domain_key(url), None)
+
+    def record_failure(self, url, reason):
+        """
+        Zapocita selhani spojeni, pri dosazeni limitu jistic hostu rozpoji.
+
+        Parametry:
+        url (str): URL adresa pozadavku
+        reason (str): Kategorie chyby (fetch_metrics.error_category)
+        """
+        host = domain_key(url)
+        with self._lock:
+            failures = self._failures.get(host, 0) + 1
+            self._failures[host] = failures
+            if failures >= self.failure_threshold and host not in self._open:
+                self._open[host] = {'host': host, 'failures': failures, 'reason': reason}
+
+    def unreachable_hosts(self):
+        """
+        Navratova hodnota:
+        list: Slovniky rozpojenych hostu (host, pocet selhani a kategorie posledni chyby pred rozpojenim)
+        """
+        with self._lock:
+            return list(self._open.values())
+
+    def stats(self):
+        """
+        Navratova hodnota:
+        dict: Pocet rozpojenych hostu (open), hostu se selhanim pod limitem (failing)
+              a preskocenych pozadavku (short_circuited)
+        """
+        with self._lock:
+            return {'open': len(self._open), 'failing': sum(1 for host in self._failures if host not in self._open),
+                    'short_circuited': self.short_circuited}
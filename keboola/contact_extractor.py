@@ -0,0 +1,70 @@
+import re
+
+import pandas as pd
+
+EMAIL_PATTERN = r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}"
+# Phone regex V2, the common first group is factored out of the alternation (same matches, fewer retries)
+PHONE_PATTERN = r"""
+    \+420[-\s]?            # Country code +420 followed by an optional space or dash
+    \d{3}[-\s]?            # First part of the phone number (3 digits) followed by an optional space or dash
+    (?:
+        \d{3}[-\s]?\d{3}     # Two more parts of 3 digits
+        |                  # OR
+        \d{2}[-\s]?\d{2}[-\s]?\d{2}  # Three more parts of 2 digits
+    )
+    |                      # OR the same number without the country code
+    \d{3}[-\s]?
+    (?:
+        \d{3}[-\s]?\d{3}
+        |
+        \d{2}[-\s]?\d{2}[-\s]?\d{2}
+    )
+"""
+
+EMAIL_REGEX = re.compile(EMAIL_PATTERN)
+PHONE_REGEX = re.compile(PHONE_PATTERN, re.VERBOSE)
+CLEAN_EMAIL_REGEX = re.compile(
+    r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,7}\b')
+# Same patterns as the former re.sub(f'{domain}.*', domain, email), compiled once
+EMAIL_DOMAIN_SUFFIXES = [(domain, re.compile(f'{domain}.*'))
+                         for domain in ['.cz', '.com', '.eu', '.org']]
+
+
+def extract_contacts(text):
+    """
+    Vrati sadu emailu a sadu telefonnich cisel z textu stranky. Pozice nejsou potreba, takze
+    staci dva predkompilovane findall, v re jsou rychlejsi nez jeden pruchod spojenym vyrazem
+    (viz scan_contacts v benchmarks/bench_extractor.py).
+
+    Parametry:
+    text (str): Text stranky
+
+    Navratova hodnota:
+    tuple: Sada emailu a sada telefonnich cisel
+    """
+    return set(EMAIL_REGEX.findall(text)), set(PHONE_REGEX.findall(text))
+
+
+def clean_email(email):
+    """
+    Cisti a formatuje emailove adresy.
+
+    Parametry:
+    email (str): Emailova adresa k cisteni
+
+    Navratova hodnota:
+    str: Cistena a formatovana emailova adresa
+    """
+    if pd.isna(email):
+        return email
+    # Find all valid email addresses in the string and convert them to lowercase
+    valid_emails = [e.lower() for e in CLEAN_EMAIL_REGEX.findall(email)]
+    # Fix emails that have additional symbols after specified domains
+    cleaned_emails = []
+    for email in valid_emails:
+        for domain, suffix_regex in EMAIL_DOMAIN_SUFFIXES:
+            if email.endswith(domain):
+                email = suffix_regex.sub(domain, email)
+                break
+        cleaned_emails.append(email)
+    return ', '.join(cleaned_emails)
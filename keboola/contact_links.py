@@ -0,0 +1,166 @@
+import posixpath
+from urllib.parse import urljoin, urlsplit, urlunsplit
+
+# Score of a candidate link by the strongest keyword in its anchor text and in its URL path
+LINK_TEXT_WEIGHTS = {'kontakt': 10, 'contact': 10, 'spojte se': 8, 'o nás': 6, 'o-nas': 6, 'kdo jsme': 5,
+                     'kdo-jsem': 5, 'about': 4}
+LINK_PATH_WEIGHTS = {'kontakt': 8, 'contact': 8, 'o-nas': 5, 'onas': 5, 'kdo-jsme': 4, 'about': 3}
+SAME_HOST_BONUS = 6
+SAME_DOMAIN_BONUS = 3
+# Deeper paths are usually per-department pages, each extra path segment costs a point
+PATH_DEPTH_PENALTY = 1
+# Downloads that never contain an HTML contact page
+SKIPPED_EXTENSIONS = {'.pdf', '.doc', '.docx', '.xls', '.xlsx', '.jpg', '.jpeg', '.png', '.gif', '.svg', '.zip',
+                      '.mp3', '.mp4'}
+
+
+def link_key(url):
+    """
+    Vrati klic odkazu pro deduplikaci: bez fragmentu a query, host bez 'www.' a bez koncoveho lomitka.
+
+    Parametry:
+    url (str): Absolutni URL adresa
+
+    Navratova hodnota:
+    str: Klic odkazu
+    """
+    parts = urlsplit(url)
+    host = (parts.hostname or '').lower()
+    host = host[4:] if host.startswith('www.') else host
+    return f"{host}{parts.path.rstrip('/')}"
+
+
+def strip_fragment(url):
+    parts = urlsplit(url)
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, parts.query, ''))
+
+
+def site_domain(host):
+    return '.'.join(host.split('.')[-2:])
+
+
+def score_contact_link(url, link_text, base_url):
+    """
+    Ohodnoti kandidata na kontaktni stranku podle textu odkazu, cesty URL a shody originu s webem.
+
+    Parametry:
+    url (str): Absolutni URL adresa odkazu
+    link_text (str): Text odkazu
+    base_url (str): URL adresa stranky, na ktere odkaz je
+
+    Navratova hodnota:
+    int: Skore, 0 pro odkaz, ktery neni kandidatem na kontaktni stranku
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in ('http', 'https') or not parts.hostname:
+        return 0
+    path = parts.path.lower()
+    if posixpath.splitext(path)[1] in SKIPPED_EXTENSIONS:
+        return 0
+    link_text = link_text.lower()
+    text_score = max((weight for keyword, weight in LINK_TEXT_WEIGHTS.items() if keyword in link_text), default=0)
+    path_score = max((weight for keyword, weight in LINK_PATH_WEIGHTS.items() if keyword in path), default=0)
+    if text_score == 0 and path_score == 0:
+        return 0
+    host = parts.hostname.lower()
+    base_host = (urlsplit(base_url).hostname or '').lower()
+    if host == base_host:
+        origin_score = SAME_HOST_BONUS
+    elif site_domain(host) == site_domain(base_host):
+        origin_score = SAME_DOMAIN_BONUS
+    else:
+        origin_score = 0
+    depth = len([segment for segment in path.split('/') if segment])
+    return text_score + path_score + origin_score - PATH_DEPTH_PENALTY * max(0, depth - 1)
+
+
+def rank_contact_links(anchors, base_url, visited_urls=()):
+    """
+    Seradi odkazy stranky podle skore kontaktni stranky, varianty lisici se fragmentem nebo query
+    se slouci do jednoho kandidata (prednost ma varianta bez query).
+
+    Parametry:
+    anchors (list): List dvojic (href, text odkazu)
+    base_url (str): URL adresa stranky, vuci ktere se resi relativni odkazy
+    visited_urls (iterable): URL adresy, ktere se preskoci
+
+    Navratova hodnota:
+    list: URL adresy kandidatu od nejlepsiho, pri shode skore v poradi na strance
+    """
+    skipped = {link_key(url) for url in visited_urls}
+    skipped.add(link_key(base_url))
+    best = {}
+    for position, (href, link_text) in enumerate(anchors):
+        if not href:
+            continue
+        try:
+            url = strip_fragment(urljoin(base_url, href.strip()))
+            score = score_contact_link(url, link_text or '', base_url)
+        except ValueError:
+            continue
+        key = link_key(url)
+        if score == 0 or key in skipped:
+            continue
+        if key not in best:
+            best[key] = (score, position, url)
+        else:
+            # Keep the first position, the best score and a variant without query if there is one
+            best_score, first_position, best_url = best[key]
+            best[key] = (max(score, best_score), first_position,
+                         url if urlsplit(best_url).query and not urlsplit(url).query else best_url)
+    ranked = sorted(best.values(), key=lambda item: (-item[0], item[1]))
+    return [url for _, _, url in ranked]
+
+
+class SiteBudget:
+    """
+    Rozpocet jednoho webu: maximalni pocet stazenych stranek (vcetne hlavni) a bajtu.
+    """
+
+    def __init__(self, max_pages, max_bytes):
+        """
+        Parametry:
+        max_pages (int): Maximalni pocet stranek webu vcetne hlavni stranky
+        max_bytes (int): Maximalni soucet velikosti stranek webu, stranka pres limit se jeste dokonci
+        """
+        self.max_pages = max_pages
+        self.max_bytes = max_bytes
+        self.pages = 0
+        self.bytes = 0
+
+    def spend(self, size):
+        # A failed fetch (size None) still costs a page
+        self.pages += 1
+        self.bytes += size or 0
+
+    def pages_left(self):
+        if self.bytes >= self.max_bytes:
+            return 0
+        return max(0, self.max_pages - self.pages)
+
+
+def next_contact_pages(candidates, visited_urls, budget, top_k):
+    """
+    Vybere kontaktni stranky dalsi urovne prochazeni webu: nejlepsich top_k dosud nenavstivenych
+    kandidatu, kolik jich rozpocet webu dovoli.
+
+    Parametry:
+    candidates (list): Serazene URL adresy kandidatu (vystup rank_contact_links), pripadne z vice stranek
+    visited_urls (iterable): Jiz stazene nebo naplanovane URL adresy webu
+    budget (SiteBudget): Rozpocet webu
+    top_k (int): Maximalni pocet stranek na uroven
+
+    Navratova hodnota:
+    list: URL adresy ke stazeni
+    """
+    seen = {link_key(url) for url in visited_urls}
+    pages = []
+    limit = min(top_k, budget.pages_left())
+    for url in candidates:
+        if len(pages) >= limit:
+            break
+        key = link_key(url)
+        if key not in seen:
+            seen.add(key)
+            pages.append(url)
+    return pages
@@ -1,12 +1,16 @@
 import pandas as pd
 import numpy as np
 import re
-import phonenumbers
-import phonenumbers.geocoder
-from urllib.parse import urljoin
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urljoin, urlsplit
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 import time
 import datetime
+import os
+
+from contact_extractor import clean_email
+from phone_normalizer import normalize_phones
+from pipeline_profiler import PipelineProfiler, get_profiler, set_profiler
 
 RUN_EVIRONMENT = "keboola"
 
@@ -17,6 +21,9 @@ if RUN_EVIRONMENT == "local":
     MAPS_SCRAPED = "../data/maps_results.csv"
     FLAGGED_DATA_PATH = f'../data/{datetime.datetime.now().day}_{datetime.datetime.now().strftime("%m")}/db_pomoci_flagged.csv'
     SCRAPED_DATA_PATH = f'../data/{datetime.datetime.now().day}_{datetime.datetime.now().strftime("%m")}/scraped_data.csv'
+    URL_MAP_PATH = "../data/url_frontier.csv"
+    PROFILE_REPORT_PATH = "../data/pipeline_profile_validation"
+    PROFILE_DUMP_DIR = "../data/profile"
     if not os.path.exists("../data"):
         os.makedirs("../data")
     if not os.path.exists(f'../data/{datetime.datetime.now().day}_{datetime.datetime.now().strftime("%m")}'):
@@ -28,10 +35,24 @@ elif RUN_EVIRONMENT == "keboola":
     SAVE_FILES_PATH = "out/tables/"
     MAPS_SCRAPED = "in/tables/maps_scraped.csv"
     SCRAPED_DATA_PATH = "in/tables/df_scraped.csv"
+    # Frontier mapping written by web_scraper.py, db_pomoci webs -> scraped Base Website
+    URL_MAP_PATH = "in/tables/url_frontier.csv"
     FLAGGED_DATA_PATH = "out/tables/df_flagged.csv"
+    PROFILE_REPORT_PATH = "out/tables/pipeline_profile_validation"
+    PROFILE_DUMP_DIR = "out/files/profile"
 else:
     raise EnvironmentError("this environment is not supported")
 
+# Rows of df_scraped read at once, only the exploded contacts of all chunks are kept in memory
+SCRAPED_CHUNKSIZE = 50000
+# Worker processes for phone parsing and email cleaning, 1 keeps the work in the main process
+CLEANING_PROCESSES = 1
+# Distinct values sent to a worker in one task
+CLEANING_SHARD_SIZE = 5000
+# Wrap the stages in cProfile (.prof for flamegraph tools) and tracemalloc, both slow the run down
+PROFILE_CPROFILE = False
+PROFILE_TRACEMALLOC = False
+
 
 def has_more_than_3_consecutive_zeros(number):
     """
@@ -46,46 +67,54 @@ def has_more_than_3_consecutive_zeros(number):
     return bool(re.search(r'0{4,}', str(number)))
 
 
-def py_parse_phonenumber(num):
+def format_phones_shard(values):
     """
-    Funkce parsuje telefonni cislo a vraci informace o nem.
+    Funkce naformatuje shard telefonnich cisel, bezi i v pracovnim procesu.
     
     Parametry:
-    num (str): Telefonni cislo ve forme retezce.
+    values (list): Surova telefonni cisla.
     
     Navratova hodnota:
-    dict: Slovnik obsahujici informace o telefonim cisle.
+    list: Cisla ve formatu E164, pro neparsovatelna NaN.
     """
-    try:
-        parsed_num = phonenumbers.parse(num, 'CZ')
-        phonenumbers.is_possible_number_with_reason(parsed_num)
-        return {
-            'formated_number': phonenumbers.format_number(parsed_num, phonenumbers.PhoneNumberFormat.E164),
-            'number': parsed_num.national_number,
-            'prefix': parsed_num.country_code,
-            'country_code': phonenumbers.region_code_for_number(parsed_num),
-            'valid': phonenumbers.is_valid_number(parsed_num),
-            'possible': phonenumbers.is_possible_number(parsed_num),
-            'parsed': True
-        }
-    except Exception as e:
-        return {'number': num, 'prefix': None, 'country_code': None, 'valid': False, 'possible': False, 'parsed': False}
+    return normalize_phones(pd.Series(values, dtype=object))['formated_number'].tolist()
 
 
-def udf(df: pd.DataFrame, column_name: str):
+def clean_emails_shard(values):
     """
-    Funkce aplikuje parsovani telefonich cisel na sloupec dataframe.
+    Funkce vycisti shard emailovych adres, bezi i v pracovnim procesu.
     
     Parametry:
-    df (pd.DataFrame): Vstupni dataframe.
-    column_name (str): Nazev sloupce obsahujiciho telefonni cisla.
+    values (list): Surove emailove adresy.
     
     Navratova hodnota:
-    pd.DataFrame: Dataframe obsahujici parsovana telefonni cisla.
+    list: Vycistene emailove adresy.
     """
-    results = df[column_name].apply(py_parse_phonenumber)
-    parsed_df = pd.DataFrame(results.tolist())
-    return parsed_df
+    return [clean_email(value) for value in values]
+
+
+def map_unique(shard_func, values: pd.Series, executor=None, shard_size=CLEANING_SHARD_SIZE) -> pd.Series:
+    """
+    Funkce aplikuje shard_func na ruzne hodnoty sloupce. S executorem se hodnoty rozdeli na shardy,
+    do procesu se posilaji jen listy retezcu a executor.map vraci vysledky ve stejnem poradi,
+    takze vystup je stejny jako bez nej. NaN zustava NaN.
+    
+    Parametry:
+    shard_func (function): Funkce list -> list stejne delky definovana na urovni modulu.
+    values (pd.Series): Vstupni hodnoty.
+    executor (ProcessPoolExecutor): Pool procesu nebo None.
+    shard_size (int): Pocet hodnot v jednom shardu.
+    
+    Navratova hodnota:
+    pd.Series: Vysledky se stejnym indexem jako values.
+    """
+    unique = pd.unique(values.dropna()).tolist()
+    if executor is None:
+        results = shard_func(unique)
+    else:
+        shards = [unique[start:start + shard_size] for start in range(0, len(unique), shard_size)]
+        results = [result for shard in executor.map(shard_func, shards) for result in shard]
+    return values.map(dict(zip(unique, results)))
 
 
 def explode_df(df: pd.DataFrame, column_name: str, web_column="Base_Website", scraped_web_column="Scraped_Page") -> pd.DataFrame:
@@ -115,24 +144,39 @@ def explode_df(df: pd.DataFrame, column_name: str, web_column="Base_Website", sc
     return df_res_exp
 
 
-def clean_scraped_phones(df: pd.DataFrame, phone_scraped_column="Phone_Numbers", web_column="Base_Website", scraped_web_column="Scraped_Page") -> pd.DataFrame:
+def explode_scraped_phones(df: pd.DataFrame, phone_scraped_column="Phone_Numbers", web_column="Base_Website", scraped_web_column="Scraped_Page", executor=None) -> pd.DataFrame:
     """
-    Funkce cisti scrapovana telefonni cisla.
+    Funkce rozdeli a naformatuje scrapovana telefonni cisla, bez deduplikace.
     
     Parametry:
-    df (pd.DataFrame): Vstupni dataframe.
+    df (pd.DataFrame): Vstupni dataframe nebo jedna davka scrapovanych dat.
     phone_scraped_column (str): Nazev sloupce obsahujiciho scrapovana telefonni cisla.
     web_column (str): Nazev sloupce obsahujiciho zakladni webovou adresu.
     scraped_web_column (str): Nazev sloupce obsahujiciho scrapovanou stranku.
+    executor (ProcessPoolExecutor): Pool procesu pro parsovani nebo None.
     
     Navratova hodnota:
-    pd.DataFrame: Dataframe s cistymi telefonimi cisly.
+    pd.DataFrame: Dataframe s naformatovanymi telefonimi cisly.
     """
     phones_exp = explode_df(df, phone_scraped_column,
                             web_column, scraped_web_column)
-    ress_df = udf(phones_exp, f"{phone_scraped_column}_scraped")
-    phones_exp["formated_number"] = ress_df["formated_number"]
+    phones_exp["formated_number"] = map_unique(
+        format_phones_shard, phones_exp[f"{phone_scraped_column}_scraped"], executor)
     phones_exp.drop(columns=[f"{phone_scraped_column}_scraped"], inplace=True)
+    return phones_exp
+
+
+def dedupe_scraped_phones(phones_exp: pd.DataFrame, web_column="Base_Website") -> pd.DataFrame:
+    """
+    Funkce odstrani duplicitni a neplatna telefonni cisla a seradi je.
+    
+    Parametry:
+    phones_exp (pd.DataFrame): Vystup explode_scraped_phones.
+    web_column (str): Nazev sloupce obsahujiciho zakladni webovou adresu.
+    
+    Navratova hodnota:
+    pd.DataFrame: Dataframe s cistymi telefonimi cisly.
+    """
     phones_deduped = phones_exp.drop_duplicates(
         subset=[web_column, 'formated_number'])
     filtered_df = phones_deduped[~phones_deduped['formated_number'].apply(
@@ -140,39 +184,47 @@ def clean_scraped_phones(df: pd.DataFrame, phone_scraped_column="Phone_Numbers",
     phones_df = filtered_df.sort_values(by="formated_number", ascending=True)
     return phones_df
 
+
+def clean_scraped_phones(df: pd.DataFrame, phone_scraped_column="Phone_Numbers", web_column="Base_Website", scraped_web_column="Scraped_Page", executor=None) -> pd.DataFrame:
+    """
+    Funkce cisti scrapovana telefonni cisla.
+    
+    Parametry:
+    df (pd.DataFrame): Vstupni dataframe.
+    phone_scraped_column (str): Nazev sloupce obsahujiciho scrapovana telefonni cisla.
+    web_column (str): Nazev sloupce obsahujiciho zakladni webovou adresu.
+    scraped_web_column (str): Nazev sloupce obsahujiciho scrapovanou stranku.
+    executor (ProcessPoolExecutor): Pool procesu pro parsovani nebo None.
+    
+    Navratova hodnota:
+    pd.DataFrame: Dataframe s cistymi telefonimi cisly.
+    """
+    phones_exp = explode_scraped_phones(df, phone_scraped_column,
+                                        web_column, scraped_web_column, executor)
+    return dedupe_scraped_phones(phones_exp, web_column)
+
 # Emails Part
 
 
-def clean_email(email):
+def explode_scraped_emails(df: pd.DataFrame, email_scraped_column="Emails", executor=None) -> pd.DataFrame:
     """
-    Funkce cisti emailove adresy.
+    Funkce rozdeli a vycisti scrapovane emailove adresy, bez deduplikace.
     
     Parametry:
-    email (str): Emailova adresa ve forme retezce.
+    df (pd.DataFrame): Vstupni dataframe nebo jedna davka scrapovanych dat.
+    email_scraped_column (str): Nazev sloupce obsahujiciho scrapovane emailove adresy.
+    executor (ProcessPoolExecutor): Pool procesu pro cisteni nebo None.
     
     Navratova hodnota:
-    str: Cista emailova adresa.
-    """
-    if pd.isna(email):
-        return email
-    # Regular expression to find valid email addresses
-    email_pattern = re.compile(
-        r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,7}\b')
-    # Find all valid email addresses in the string and convert them to lowercase
-    valid_emails = [e.lower() for e in email_pattern.findall(email)]
-    # Fix emails that have additional symbols after specified domains
-    domains = ['.cz', '.com', '.eu', '.org']
-    cleaned_emails = []
-    for email in valid_emails:
-        for domain in domains:
-            if email.endswith(domain):
-                email = re.sub(f'{domain}.*', domain, email)
-                break
-        cleaned_emails.append(email)
-    return ', '.join(cleaned_emails)
-
-
-def clean_scraped_emails(df: pd.DataFrame, email_scraped_column="Emails", web_column="Base_Website") -> pd.DataFrame:
+    pd.DataFrame: Dataframe s vycistenymi emailovymi adresami.
+    """
+    emails_exp = explode_df(df, email_scraped_column)
+    emails_exp[f'{email_scraped_column}_scraped'] = map_unique(
+        clean_emails_shard, emails_exp[f'{email_scraped_column}_scraped'], executor)
+    return emails_exp
+
+
+def clean_scraped_emails(df: pd.DataFrame, email_scraped_column="Emails", web_column="Base_Website", executor=None) -> pd.DataFrame:
     """
     Funkce cisti scrapovane emailove adresy.
     
@@ -180,56 +232,268 @@ def clean_scraped_emails(df: pd.DataFrame, email_scraped_column="Emails", web_co
     df (pd.DataFrame): Vstupni dataframe.
     email_scraped_column (str): Nazev sloupce obsahujiciho scrapovane emailove adresy.
     web_column (str): Nazev sloupce obsahujiciho zakladni webovou adresu.
+    executor (ProcessPoolExecutor): Pool procesu pro cisteni nebo None.
     
     Navratova hodnota:
     pd.DataFrame: Dataframe s cistymi emailovymi adresami.
     """
-    emails_exp = explode_df(df, email_scraped_column)
-    emails_exp[f'{email_scraped_column}_scraped'] = emails_exp[f'{email_scraped_column}_scraped'].apply(
-        clean_email)
+    emails_exp = explode_scraped_emails(df, email_scraped_column, executor)
     emails_deduped = emails_exp.drop_duplicates(
         subset=[web_column, f'{email_scraped_column}_scraped'])
     # emails_sorted = emails_deduped.sort_values(by="Emails_scraped", ascending=False)
     return emails_deduped
 
 
-def db_pomoci_transform(df: pd.DataFrame) -> pd.DataFrame:
+def load_scraped_contacts(path, chunksize=SCRAPED_CHUNKSIZE, executor=None):
+    """
+    Funkce cte scrapovana data po davkach a z kazde davky hned vytahne telefony a emaily,
+    cela tabulka df_scraped se do pameti nenacita.
+    
+    Parametry:
+    path (str): Cesta k df_scraped.csv.
+    chunksize (int): Pocet radku v jedne davce.
+    executor (ProcessPoolExecutor): Pool procesu pro parsovani a cisteni nebo None.
+    
+    Navratova hodnota:
+    tuple: Dataframe telefonu, dataframe emailu a pocet nactenych radku.
+    """
+    phones_parts = []
+    emails_parts = []
+    rows = 0
+    # dtype=str keeps chunks without any value in a column usable with the .str accessor
+    profiler = get_profiler()
+    for chunk in pd.read_csv(path, chunksize=chunksize, dtype=str):
+        rows += len(chunk)
+        with profiler.measure('clean_scraped_phones') as stage:
+            phones_parts.append(explode_scraped_phones(chunk, executor=executor))
+            stage.add_rows(rows_in=len(chunk))
+        with profiler.measure('clean_scraped_emails') as stage:
+            emails_parts.append(explode_scraped_emails(chunk, executor=executor))
+            stage.add_rows(rows_in=len(chunk))
+    if not phones_parts:
+        return pd.DataFrame(columns=['Base_Website', 'Scraped_Page', 'formated_number']), \
+            pd.DataFrame(columns=['Base_Website', 'Scraped_Page', 'Emails_scraped']), rows
+    # Deduplication runs over all chunks so the first occurrence wins as in a single read
+    with profiler.measure('clean_scraped_phones') as stage:
+        df_phones_scraped = dedupe_scraped_phones(
+            pd.concat(phones_parts, ignore_index=True))
+        stage.add_rows(rows_out=len(df_phones_scraped))
+    with profiler.measure('clean_scraped_emails') as stage:
+        df_emails_scraped = pd.concat(emails_parts, ignore_index=True).drop_duplicates(
+            subset=['Base_Website', 'Emails_scraped'])
+        stage.add_rows(rows_out=len(df_emails_scraped))
+    return df_phones_scraped, df_emails_scraped, rows
+
+
+def db_pomoci_transform(df: pd.DataFrame, executor=None) -> pd.DataFrame:
     """
     Funkce pripravuje data pro validaci.
     
     Parametry:
     df (pd.DataFrame): Vstupni dataframe.
+    executor (ProcessPoolExecutor): Pool procesu pro parsovani a cisteni nebo None.
     
     Navratova hodnota:
     pd.DataFrame: Upraveny dataframe pripraveny k validaci.
     """
-    df['E_mail'] = df['E_mail'].apply(clean_email)
-    ress_df = udf(df, "Telefon")
-    df['Telefon'] = ress_df["formated_number"]
+    df['E_mail'] = map_unique(clean_emails_shard, df['E_mail'], executor)
+    df['Telefon'] = map_unique(format_phones_shard, df['Telefon'], executor)
     df = df[~df["Webova_stranka"].isna()]
     df.loc[df['Webova_stranka'].str.startswith(
         'www'), 'web'] = df['Webova_stranka'].str.replace('^www', 'https://www', regex=True)
     return df
 
 
+def match_contacts(db_pomoci: pd.DataFrame, maps_contacts: pd.DataFrame, scraped_contacts: pd.DataFrame):
+    """
+    Funkce porovna kontakty databaze se znamymi zdroji hashovym isin pro cely sloupec najednou.
+    Zdroje jsou ve Source vzdy ve stejnem poradi, chybejici (NaN) kontakt se neshoduje nikdy.
+    
+    Parametry:
+    db_pomoci (pd.DataFrame): Dataframe se sloupci E_mail a Telefon.
+    maps_contacts (pd.DataFrame): Dataframe obsahujici kontakty z maps.cz.
+    scraped_contacts (pd.DataFrame): Dataframe obsahujici scrapovane kontakty.
+    
+    Navratova hodnota:
+    tuple: Pole hodnot 'matched'/'unmatched' a pole zdroju (None pro nesparovane radky).
+    """
+    checks = [
+        ('maps_contacts_telefon', 'Telefon', maps_contacts),
+        ('scraped_contacts_email', 'E_mail', scraped_contacts),
+        ('scraped_contacts_telefon', 'Telefon', scraped_contacts),
+    ]
+    sources = np.full(len(db_pomoci), '', dtype=object)
+    for source_name, column, contacts_df in checks:
+        found = (db_pomoci[column].notna() & db_pomoci[column].isin(
+            contacts_df['Contact'].dropna())).to_numpy()
+        sources = np.where(found, np.where(sources == '', source_name,
+                                           sources + ', ' + source_name), sources)
+    matched = sources != ''
+    return np.where(matched, 'matched', 'unmatched'), np.where(matched, sources, None)
+
+
+def registrable_domain(url):
+    """
+    Funkce vrati normalizovany klic domeny (posledni dve casti hostname bez ohledu na velikost pismen).
+    
+    Parametry:
+    url (str): URL adresa, schema muze chybet.
+    
+    Navratova hodnota:
+    str: Klic domeny, pro neplatnou adresu prazdny retezec.
+    """
+    url = url.strip()
+    try:
+        host = urlsplit(url if '://' in url else 'http://' + url).hostname or ''
+    except ValueError:
+        return ''
+    return '.'.join(host.rstrip('.').split('.')[-2:])
+
+
+def load_url_map(path):
+    """
+    Funkce nacte mapovani fronty webu z web_scraper.py (url_frontier.csv). Scrapovane Base Website
+    jsou kanonicke URL adresy fronty, ne puvodni zapis webu v db_pomoci.
+    
+    Parametry:
+    path (str): Cesta k url_frontier.csv.
+    
+    Navratova hodnota:
+    dict: Web z db_pomoci -> stazena URL adresa samotneho webu (bez pridaneho korene), bez souboru prazdny.
+    """
+    if not os.path.exists(path):
+        return {}
+    url_map = pd.read_csv(path, dtype=str)
+    # build_frontier lists the URL itself before its site root
+    url_map = url_map.drop_duplicates('source_web')
+    return dict(zip(url_map['source_web'], url_map['web']))
+
+
+def build_domain_index(df, web_column, columns):
+    """
+    Funkce seskupi radky s vyplnenym kontaktem podle klice domeny webu.
+    
+    Parametry:
+    df (pd.DataFrame): Dataframe s kontakty.
+    web_column (str): Nazev sloupce s webem.
+    columns (list): Sloupce ulozene do indexu (prvni musi byt web_column).
+    
+    Navratova hodnota:
+    dict: Klic domeny -> list n-tic hodnot columns v poradi radku df.
+    """
+    index = defaultdict(list)
+    rows = df.loc[df['Contact'].notna() & df[web_column].map(
+        lambda web: isinstance(web, str)), columns]
+    for row in rows.itertuples(index=False, name=None):
+        index[registrable_domain(row[0])].append(row)
+    return index
+
+
+def find_new_contacts(db_pomoci, maps_contacts, combined_df, url_map=None):
+    """
+    Funkce hleda nove kontakty pro nesparovane radky. Kandidati se berou jen z radku se stejnou
+    domenou a web se v nich hleda jako obycejny podretezec (ne jako regularni vyraz). Ve scrapovanych
+    datech se hleda stazena URL adresa webu z mapovani fronty, pokud v nem web je.
+    
+    Parametry:
+    db_pomoci (pd.DataFrame): Dataframe se sloupci Matched a Webova_stranka.
+    maps_contacts (pd.DataFrame): Dataframe obsahujici kontakty z maps.cz.
+    combined_df (pd.DataFrame): Dataframe obsahujici scrapovane kontakty.
+    url_map (dict): Web z db_pomoci -> stazena URL adresa (load_url_map) nebo None.
+    
+    Navratova hodnota:
+    tuple: List novych kontaktu a list typu shody (None pro radky bez noveho kontaktu).
+    """
+    maps_index = build_domain_index(maps_contacts, 'Web', ['Web', 'Contact'])
+    scraped_index = build_domain_index(
+        combined_df, 'Base_Website', ['Base_Website', 'Contact', 'Contact_type'])
+    new_contacts = []
+    new_matched = []
+    for matched, web in zip(db_pomoci['Matched'], db_pomoci['Webova_stranka']):
+        new_contact, match_type = None, None
+        if matched == 'unmatched':
+            key = registrable_domain(web)
+            maps_contact = [contact for maps_web, contact in maps_index.get(key, [])
+                            if web in maps_web]
+            scraped_web = url_map.get(web, web) if url_map else web
+            scraped_contact = [(contact, contact_type) for base_website, contact, contact_type
+                               in scraped_index.get(registrable_domain(scraped_web), [])
+                               if scraped_web in base_website]
+            # Inner join on Contact, every maps row repeats once per matching scraped row
+            scraped_counts = Counter(
+                contact for contact, contact_type in scraped_contact)
+            common_contacts = [contact for contact in maps_contact
+                               for _ in range(scraped_counts[contact])]
+            scraped_email_contact = [contact for contact, contact_type in scraped_contact
+                                     if contact_type == 'Email']
+            scraped_phone_contact = [contact for contact, contact_type in scraped_contact
+                                     if contact_type == 'Phone']
+            if common_contacts and scraped_email_contact:
+                new_contact, match_type = common_contacts + \
+                    scraped_email_contact, 'new_contact_both_match_with_email'
+            elif common_contacts:
+                new_contact, match_type = common_contacts, 'new_contact_both_match'
+            elif scraped_email_contact:
+                new_contact, match_type = scraped_email_contact, 'new_email_match'
+            elif scraped_phone_contact:
+                new_contact, match_type = scraped_phone_contact, 'new_phone_match'
+        new_contacts.append(new_contact)
+        new_matched.append(match_type)
+    return new_contacts, new_matched
+
+
+def apply_new_contacts(db_pomoci):
+    """
+    Funkce prepise Matched typem nove shody a prazdne E_mail a Telefon prvnim novym kontaktem.
+    
+    Parametry:
+    db_pomoci (pd.DataFrame): Dataframe se sloupci New Contact a New Matched.
+    
+    Navratova hodnota:
+    pd.DataFrame: Dataframe s aktualizovanymi sloupci Matched, E_mail a Telefon.
+    """
+    db_pomoci = db_pomoci.copy()
+    has_new = db_pomoci['New Matched'].notna()
+    db_pomoci['Matched'] = db_pomoci['New Matched'].where(
+        has_new, db_pomoci['Matched'])
+    # First non-empty contact of every list, rows without new contacts stay NaN
+    first_contact = db_pomoci.loc[has_new, 'New Contact'].explode().dropna().groupby(
+        level=0, sort=False).first().reindex(db_pomoci.index)
+    for column in ['E_mail', 'Telefon']:
+        db_pomoci[column] = db_pomoci[column].mask(
+            db_pomoci[column].isna() & first_contact.notna(), first_contact)
+    return db_pomoci
+
+
 def main():
     """
     Hlavni funkce skriptu, ktera zpracovava data.
     """
     start_time = time.time()
-    db_pomoci = pd.read_csv(DB_POMOCI_PATH)
-    result_scraper = pd.read_csv(SCRAPED_DATA_PATH)
-    maps_results = pd.read_csv(MAPS_SCRAPED, sep=",")
+    profiler = PipelineProfiler(use_cprofile=PROFILE_CPROFILE, use_tracemalloc=PROFILE_TRACEMALLOC,
+                                dump_dir=PROFILE_DUMP_DIR)
+    set_profiler(profiler)
+    executor = ProcessPoolExecutor(
+        max_workers=CLEANING_PROCESSES) if CLEANING_PROCESSES > 1 else None
+    with profiler.stage('load') as stage:
+        db_pomoci = pd.read_csv(DB_POMOCI_PATH)
+        maps_results = pd.read_csv(MAPS_SCRAPED, sep=",")
+        url_map = load_url_map(URL_MAP_PATH)
+        stage.rows_out = len(db_pomoci) + len(maps_results)
 
     print("Data were loaded ")
     print("")
 
     print("db_pomoci ", db_pomoci.shape)
-    print("df_scraped_2_06 ", result_scraper.shape)
     print("maps_results ", maps_results.shape)
-
-    df_phones_scraped = clean_scraped_phones(result_scraper)
-    df_emails_scraped = clean_scraped_emails(result_scraper)
+    print("url_map ", len(url_map))
+
+    with profiler.stage('load_scraped') as stage:
+        df_phones_scraped, df_emails_scraped, scraped_rows = load_scraped_contacts(
+            SCRAPED_DATA_PATH, executor=executor)
+        stage.rows_in = scraped_rows
+        stage.rows_out = len(df_phones_scraped) + len(df_emails_scraped)
+    print("df_scraped ", scraped_rows)
     df_emails_scraped = df_emails_scraped[[
         'Base_Website', 'Scraped_Page', 'Emails_scraped']]
     df_emails_scraped['Contact_type'] = 'Email'
@@ -249,12 +513,18 @@ def main():
     print("Scraped data are ready ")
     print("")
 
-    db_pomoci = db_pomoci_transform(db_pomoci)
+    with profiler.stage('db_pomoci_transform', rows_in=len(db_pomoci)) as stage:
+        db_pomoci = db_pomoci_transform(db_pomoci, executor)
+        stage.rows_out = len(db_pomoci)
     print("DB data are ready ")
     print("")
     print(maps_results.head())
-    maps_results = clean_scraped_phones(
-        maps_results, phone_scraped_column="API_Phone", web_column="Web", scraped_web_column="Web")
+    with profiler.stage('clean_maps_phones', rows_in=len(maps_results)) as stage:
+        maps_results = clean_scraped_phones(
+            maps_results, phone_scraped_column="API_Phone", web_column="Web", scraped_web_column="Web", executor=executor)
+        stage.rows_out = len(maps_results)
+    if executor is not None:
+        executor.shutdown()
     # maps_results = clean_scraped_emails(maps_results, "Email")
 
     maps_contacts = pd.concat([
@@ -269,52 +539,10 @@ def main():
     # Extract contacts from combined_df
     scraped_contacts = combined_df[['Contact']].dropna().drop_duplicates()
 
-    def check_contact(contact, contacts_df, source_name):
-        """
-        Funkce kontroluje, zda kontakt existuje v danych kontaktech.
-        
-        Parametry:
-        contact (str): Kontakt k overeni.
-        contacts_df (pd.DataFrame): Dataframe obsahujici kontakty.
-        source_name (str): Nazev zdroje kontaktu.
-        
-        Navratova hodnota:
-        str: Nazev zdroje, pokud kontakt existuje, jinak None.
-        """
-        if contact in contacts_df['Contact'].values:
-            return source_name
-        return None
-
-    def match_contact(row, maps_contacts, scraped_contacts):
-        """
-        Funkce porovnava kontaktni udaje s znamymi zdroji.
-        
-        Parametry:
-        row (pd.Series): Radek dataframe obsahujici kontaktni udaje.
-        maps_contacts (pd.DataFrame): Dataframe obsahujici kontakty z maps.cz.
-        scraped_contacts (pd.DataFrame): Dataframe obsahujici scrapovane kontakty.
-        
-        Navratova hodnota:
-        tuple: Tuple obsahujici informace o shode a zdrojich.
-        """
-        sources = set()
-
-        # Check against maps contacts
-        if check_contact(row['Telefon'], maps_contacts, 'maps_contacts'):
-            sources.add('maps_contacts_telefon')
-
-        # Check against scraped contacts
-        if check_contact(row['E_mail'], scraped_contacts, 'scraped_contacts'):
-            sources.add('scraped_contacts_email')
-        if check_contact(row['Telefon'], scraped_contacts, 'scraped_contacts'):
-            sources.add('scraped_contacts_telefon')
-
-        if sources:
-            return 'matched', ', '.join(sources)
-        return 'unmatched', None
-
-    db_pomoci[['Matched', 'Source']] = db_pomoci.apply(
-        lambda row: pd.Series(match_contact(row, maps_contacts, scraped_contacts)), axis=1)
+    with profiler.stage('match_contact', rows_in=len(db_pomoci)) as stage:
+        db_pomoci['Matched'], db_pomoci['Source'] = match_contacts(
+            db_pomoci, maps_contacts, scraped_contacts)
+        stage.rows_out = int((db_pomoci['Matched'] == 'matched').sum())
 
     matched_num = db_pomoci[db_pomoci["Matched"] == "matched"].shape[0]
     unmatched_num = db_pomoci[db_pomoci["Matched"] == "unmatched"].shape[0]
@@ -322,72 +550,27 @@ def main():
         f"Data baze obsahuje {matched_num} schodnych kontaktu a {unmatched_num} neschodnych kontaktu")
     print("")
 
-    def find_new_contact(row):
-        """
-        Funkce hleda nove kontakty pro nesparovane radky.
-        
-        Parametry:
-        row (pd.Series): Radek dataframe k overeni.
-        
-        Navratova hodnota:
-        pd.Series: Serie obsahujici nove kontakty a typ shody.
-        """
-        if row['Matched'] == 'unmatched':
-            web = row['Webova_stranka']
-            maps_contact = maps_contacts[maps_contacts['Web'].str.contains(
-                web, na=False) & ~(maps_contacts["Contact"].isna())]
-            scraped_contact = combined_df[combined_df['Base_Website'].str.contains(
-                web, na=False) & ~(combined_df["Contact"].isna())]
-
-            # Find common contacts in both maps_contact and scraped_contact
-            common_contacts = pd.merge(
-                maps_contact, scraped_contact, on='Contact')
-            scraped_email_contact = combined_df[(combined_df['Base_Website'].str.contains(web, na=False)) & (
-                combined_df["Contact_type"] == "Email") & ~(combined_df["Contact"].isna())]
-            scraped_phone_contact = combined_df[(combined_df['Base_Website'].str.contains(web, na=False)) & (
-                combined_df["Contact_type"] == "Phone") & ~(combined_df["Contact"].isna())]
-            new_contact = []
-            if not common_contacts.empty and not scraped_email_contact.empty:
-                new_contact.extend(common_contacts['Contact'].values)
-                new_contact.extend(scraped_email_contact['Contact'].values)
-                return pd.Series([new_contact, 'new_contact_both_match_with_email'])
-            if not common_contacts.empty and scraped_email_contact.empty:
-                new_contact.extend(common_contacts['Contact'].values)
-                return pd.Series([new_contact, 'new_contact_both_match'])
-            if common_contacts.empty and not scraped_email_contact.empty:
-                new_contact.extend(scraped_email_contact['Contact'].values)
-                return pd.Series([new_contact, 'new_email_match'])
-            if common_contacts.empty and not scraped_phone_contact.empty:
-                new_contact.extend(scraped_phone_contact['Contact'].values)
-                return pd.Series([new_contact, 'new_phone_match'])
-
-        return pd.Series([None, None])
-    find_new_contact_start = time.time()
-
-    db_pomoci[['New Contact', 'New Matched']
-              ] = db_pomoci.apply(find_new_contact, axis=1)
-
-    find_new_contact_end = time.time()
-    find_new_contact_time = find_new_contact_end - find_new_contact_start
-    print(f"Time taken: {find_new_contact_time:.2f} seconds")
-    # Update the contact information and flag accordingly
-    db_pomoci['Matched'] = db_pomoci.apply(
-        lambda row: row['New Matched'] if pd.notna(row['New Matched']) else row['Matched'], axis=1)
-
-    db_pomoci['E_mail'] = db_pomoci.apply(
-        lambda row: next((contact for contact in row['New Contact'] if pd.isna(
-            row['E_mail']) and pd.notna(contact)), row['E_mail'])
-        if row['New Contact'] is not None else row['E_mail'], axis=1)
+    with profiler.stage('find_new_contact', rows_in=unmatched_num) as stage:
+        new_contacts, new_matched = find_new_contacts(
+            db_pomoci, maps_contacts, combined_df, url_map)
+        db_pomoci['New Contact'] = pd.Series(
+            new_contacts, index=db_pomoci.index, dtype=object)
+        db_pomoci['New Matched'] = pd.Series(
+            new_matched, index=db_pomoci.index, dtype=object)
+        stage.rows_out = int(db_pomoci['New Matched'].notna().sum())
 
-    db_pomoci['Telefon'] = db_pomoci.apply(
-        lambda row: next((contact for contact in row['New Contact'] if pd.isna(
-            row['Telefon']) and pd.notna(contact)), row['Telefon'])
-        if row['New Contact'] is not None else row['Telefon'], axis=1)
+    print(f"Time taken: {stage.wall:.2f} seconds")
+    # Update the contact information and flag accordingly
+    with profiler.stage('apply_new_contacts', rows_in=len(db_pomoci)) as stage:
+        db_pomoci = apply_new_contacts(db_pomoci)
+        stage.rows_out = len(db_pomoci)
 
     # Drop the helper columns
 
-    db_pomoci.drop(columns=["web"], inplace=True)
-    db_pomoci.to_csv('out/tables/db_pomoci_flagged.csv', index=False)
+    with profiler.stage('output', rows_in=len(db_pomoci)) as stage:
+        db_pomoci.drop(columns=["web"], inplace=True)
+        db_pomoci.to_csv('out/tables/db_pomoci_flagged.csv', index=False)
+        stage.rows_out = len(db_pomoci)
 
     matched_num = db_pomoci[db_pomoci["Matched"] == "matched"].shape[0]
     unmatched_num = db_pomoci[db_pomoci["Matched"] == "unmatched"].shape[0]
@@ -400,6 +583,9 @@ def main():
     end_time = time.time()
     elapsed_time = end_time - start_time
     print(f"Time taken: {elapsed_time:.2f} seconds")
+    report = profiler.write_report(PROFILE_REPORT_PATH, processes=CLEANING_PROCESSES)
+    print(report.to_string(index=False))
 
 
-main()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+import asyncio
+import ipaddress
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+try:
+    import dns.exception
+    import dns.resolver
+except ImportError:
+    dns = None
+
+try:
+    import aiohttp
+    from aiohttp.abc import AbstractResolver
+except ImportError:
+    aiohttp = None
+    AbstractResolver = object
+
+# Record TTLs need dnspython, without it every entry is kept for default_ttl
+DNS_TTL_AVAILABLE = dns is not None
+
+_dns_cache = None
+_dns_cache_lock = threading.Lock()
+
+
+def is_ip_address(host):
+    """
+    Parametry:
+    host (str): Hostname nebo IP adresa
+
+    Navratova hodnota:
+    bool: True pro IPv4 i IPv6 adresu, ta se neprekladaji
+    """
+    try:
+        ipaddress.ip_address(host)
+        return True
+    except ValueError:
+        return False
+
+
+class DNSCache:
+    """
+    Procesni cache DNS zaznamu. S balickem dnspython drzi kazdy zaznam po dobu jeho TTL, bez nej
+    po default_ttl. Neexistujici domeny (NXDOMAIN, zadna adresa) se pamatuji po negative_ttl,
+    chyby resolveru (timeout, SERVFAIL) se nepamatuji.
+    """
+
+    def __init__(self, default_ttl=300, negative_ttl=600, timeout=5.0, clock=time.monotonic):
+        """
+        Parametry:
+        default_ttl (float): TTL v sekundach, pokud ho resolver nevraci (bez dnspython)
+        negative_ttl (float): Jak dlouho se pamatuje neexistujici domena
+        timeout (float): Maximalni doba jednoho dotazu dnspython
+        clock (callable): Zdroj casu v sekundach, testy podstrci vlastni hodiny
+        """
+        self.clock = clock
+        self.default_ttl = default_ttl
+        self.negative_ttl = negative_ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._resolver = None
+        if dns is not None:
+            self._resolver = dns.resolver.Resolver()
+            self._resolver.lifetime = timeout
+
+    def _lookup_dnspython(self, host):
+        """
+        Prelozi host dotazy na zaznamy A a AAAA pres dnspython.
+
+        Navratova hodnota:
+        tuple: Adresy a nejmensi TTL obou zaznamu, nebo None pokud domena zadnou adresu nema
+        """
+        addresses = []
+        ttls = []
+        for record_type in ('A', 'AAAA'):
+            try:
+                answer = self._resolver.resolve(host, record_type)
+            except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer):
+                continue
+            addresses.extend(item.address for item in answer)
+            ttls.append(answer.rrset.ttl)
+        if not addresses:
+            return None
+        return addresses, min(ttls)
+
+    def _lookup_system(self, host):
+        """
+        Prelozi host systemovym resolverem (getaddrinfo, vcetne /etc/hosts), TTL je default_ttl.
+
+        Navratova hodnota:
+        tuple: Adresy a TTL, nebo None pro neexistujici domenu
+        """
+        try:
+            infos = socket.getaddrinfo(host, None, 0, socket.SOCK_STREAM)
+        except socket.gaierror as e:
+            if e.errno in (socket.EAI_NONAME, getattr(socket, 'EAI_NODATA', socket.EAI_NONAME)):
+                return None
+            raise
+        return list(dict.fromkeys(info[4][0] for info in infos)), self.default_ttl
+
+    def _lookup(self, host):
+        """
+        Navratova hodnota:
+        tuple: Adresy a TTL, nebo None pro neexistujici domenu
+        """
+        if self._resolver is not None:
+            try:
+                result = self._lookup_dnspython(host)
+            except dns.exception.DNSException as e:
+                raise socket.gaierror(socket.EAI_AGAIN, f"DNS lookup of {host} failed: {e}") from e
+            # NXDOMAIN from DNS is final, only single-label names (localhost) may still be in /etc/hosts
+            if result is not None or '.' in host:
+                return result
+        return self._lookup_system(host)
+
+    def resolve(self, host):
+        """
+        Vrati IP adresy hostu, z cache nebo novym dotazem.
+
+        Parametry:
+        host (str): Hostname nebo IP adresa
+
+        Navratova hodnota:
+        list: IP adresy jako retezce
+
+        Vyjimky:
+        socket.gaierror: Domena neexistuje nebo dotaz selhal
+        """
+        if is_ip_address(host):
+            return [host]
+        host = host.lower()
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(host)
+            if entry is not None and entry[1] > now:
+                self.hits += 1
+                addresses = entry[0]
+                if addresses is None:
+                    raise socket.gaierror(socket.EAI_NONAME, f"Unknown host {host} (cached)")
+                return addresses
+            self.misses += 1
+        result = self._lookup(host)
+        with self._lock:
+            if result is None:
+                self._entries[host] = (None, now + self.negative_ttl)
+            else:
+                self._entries[host] = (result[0], now + result[1])
+        if result is None:
+            raise socket.gaierror(socket.EAI_NONAME, f"Unknown host {host}")
+        return result[0]
+
+    def is_dead(self, host):
+        """
+        Parametry:
+        host (str): Hostname
+
+        Navratova hodnota:
+        bool: True, pokud je host v cache jako neexistujici domena
+        """
+        if not host:
+            return False
+        with self._lock:
+            entry = self._entries.get(host.lower())
+        return entry is not None and entry[0] is None and entry[1] > self.clock()
+
+    def prefetch(self, hosts, max_workers=64):
+        """
+        Paralelne prelozi vsechny hosty dopredu.
+
+        Parametry:
+        hosts (iterable): Hostnamy
+        max_workers (int): Pocet soucasnych dotazu
+
+        Navratova hodnota:
+        dict: Pocty hostu podle vysledku ('resolved', 'dead', 'failed')
+        """
+        def resolve_one(host):
+            try:
+                self.resolve(host)
+                return 'resolved'
+            except socket.gaierror:
+                return 'dead' if self.is_dead(host) else 'failed'
+
+        hosts = {host for host in hosts if host}
+        counts = {'resolved': 0, 'dead': 0, 'failed': 0}
+        if not hosts:
+            return counts
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(hosts))) as executor:
+            for outcome in executor.map(resolve_one, hosts):
+                counts[outcome] += 1
+        return counts
+
+    def stats(self):
+        """
+        Navratova hodnota:
+        dict: Zasahy a vypadky cache, pocet hostu v cache a z nich neexistujicich domen
+        """
+        with self._lock:
+            dead = sum(1 for addresses, _ in self._entries.values() if addresses is None)
+            return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._entries), 'dead': dead}
+
+
+class CachedResolver(AbstractResolver):
+    """
+    Resolver aiohttp nad DNSCache, asyncio engine tak sdili cache s vlaknovym enginem.
+    """
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    async def resolve(self, host, port=0, family=socket.AF_INET):
+        # A miss blocks on the resolver, keep it off the event loop
+        addresses = await asyncio.to_thread(self.cache.resolve, host)
+        return [{'hostname': host, 'host': address, 'port': port,
+                 'family': socket.AF_INET6 if ':' in address else socket.AF_INET,
+                 'proto': 0, 'flags': socket.AI_NUMERICHOST}
+                for address in addresses
+                if family in (socket.AF_UNSPEC, socket.AF_INET6 if ':' in address else socket.AF_INET)]
+
+    async def close(self):
+        pass
+
+
+def host_of(url):
+    """
+    Parametry:
+    url (str): URL adresa
+
+    Navratova hodnota:
+    str: Hostname URL adresy, pro neplatnou adresu None
+    """
+    try:
+        return urlsplit(url).hostname
+    except ValueError:
+        return None
+
+
+def dead_host_error(url):
+    """
+    Overi, zda procesni cache nezna host URL jako neexistujici domenu, pozadavek se pak vubec neposila.
+
+    Parametry:
+    url (str): URL adresa
+
+    Navratova hodnota:
+    socket.gaierror: Chyba pro log stahovani, nebo None pokud host muze existovat
+    """
+    cache = _dns_cache
+    host = host_of(url)
+    if cache is None or not cache.is_dead(host):
+        return None
+    return socket.gaierror(socket.EAI_NONAME, f"Unknown host {host} (cached)")
+
+
+def get_dns_cache():
+    """
+    Navratova hodnota:
+    DNSCache: Procesni DNS cache, nebo None pokud neni zapnuta
+    """
+    return _dns_cache
+
+
+def set_dns_cache(cache):
+    """
+    Zapne procesni DNS cache pro vsechna spojeni urllib3 (pres fetch_metrics) a asyncio engine.
+
+    Parametry:
+    cache (DNSCache): Cache nebo None pro vypnuti
+    """
+    global _dns_cache
+    with _dns_cache_lock:
+        _dns_cache = cache
+
+
+def resolve_addresses(host, port):
+    """
+    Prelozi host pro nove spojeni, pres procesni cache, pokud je zapnuta.
+
+    Parametry:
+    host (str): Hostname
+    port (int): Port
+
+    Navratova hodnota:
+    list: IP adresy jako retezce
+    """
+    cache = _dns_cache
+    if cache is not None:
+        return cache.resolve(host)
+    return list(dict.fromkeys(info[4][0] for info in socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)))
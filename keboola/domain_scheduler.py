@@ -0,0 +1,147 @@
+import asyncio
+import threading
+import time
+from urllib.parse import urlsplit
+
+# Poll interval while a domain has all its concurrency slots taken
+SLOT_POLL_INTERVAL = 0.05
+
+
+def domain_key(url):
+    """
+    Vrati klic domeny pro planovani pozadavku (host bez 'www.' a portu).
+
+    Parametry:
+    url (str): URL adresa
+
+    Navratova hodnota:
+    str: Klic domeny
+    """
+    host = (urlsplit(url).hostname or '').lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+def interleave_by_domain(urls):
+    """
+    Seradi URL adresy round-robin podle domeny, aby po sobe jdouci ulohy mirily na ruzne hosty.
+
+    Parametry:
+    urls (iterable): URL adresy
+
+    Navratova hodnota:
+    list: URL adresy prokladane podle domeny
+    """
+    by_domain = {}
+    for url in sorted(urls):
+        by_domain.setdefault(domain_key(url), []).append(url)
+    queues = list(by_domain.values())
+    ordered = []
+    while queues:
+        ordered.extend(queue.pop(0) for queue in queues)
+        queues = [queue for queue in queues if queue]
+    return ordered
+
+
+class DomainScheduler:
+    """
+    Planovac zdvorilosti pro kazdou domenu: token bucket omezuje rychlost pozadavku a AIMD
+    limit soubeznych pozadavku se pri 429/5xx nebo timeoutu snizi na polovinu a pri
+    uspechu pomalu roste.
+    """
+
+    def __init__(self, rate=2.0, burst=4, initial_concurrency=2, max_concurrency=4, clock=time.monotonic):
+        """
+        Parametry:
+        rate (float): Pocet pozadavku za sekundu na domenu
+        burst (int): Kapacita token bucketu
+        initial_concurrency (int): Pocatecni limit soubeznych pozadavku na domenu
+        max_concurrency (int): Maximalni limit soubeznych pozadavku na domenu
+        clock (callable): Zdroj casu v sekundach, testy podstrci vlastni hodiny
+        """
+        self.clock = clock
+        self.rate = rate
+        self.burst = burst
+        self.initial_concurrency = initial_concurrency
+        self.max_concurrency = max_concurrency
+        self.backoffs = 0
+        self._domains = {}
+        self._cond = threading.Condition()
+
+    def _state(self, domain, now):
+        state = self._domains.get(domain)
+        if state is None:
+            state = self._domains[domain] = {
+                'tokens': float(self.burst), 'updated': now,
+                'limit': float(self.initial_concurrency), 'in_flight': 0}
+        return state
+
+    def try_acquire(self, url):
+        """
+        Pokusi se ziskat slot pro pozadavek na domenu URL adresy.
+
+        Parametry:
+        url (str): URL adresa pozadavku
+
+        Navratova hodnota:
+        float: 0 pokud byl slot ziskan, jinak doba v sekundach, po ktere to ma smysl zkusit znovu
+        """
+        now = self.clock()
+        with self._cond:
+            state = self._state(domain_key(url), now)
+            state['tokens'] = min(
+                self.burst, state['tokens'] + (now - state['updated']) * self.rate)
+            state['updated'] = now
+            if state['in_flight'] >= int(state['limit']):
+                return SLOT_POLL_INTERVAL
+            if state['tokens'] < 1:
+                return (1 - state['tokens']) / self.rate
+            state['tokens'] -= 1
+            state['in_flight'] += 1
+            return 0
+
+    def acquire(self, url):
+        """
+        Blokujici ziskani slotu pro vlaknovy engine.
+
+        Parametry:
+        url (str): URL adresa pozadavku
+        """
+        while True:
+            wait = self.try_acquire(url)
+            if wait == 0:
+                return
+            with self._cond:
+                self._cond.wait(wait)
+
+    async def acquire_async(self, url):
+        """
+        Ziskani slotu pro asyncio engine, cekani neblokuje event loop.
+
+        Parametry:
+        url (str): URL adresa pozadavku
+        """
+        while True:
+            wait = self.try_acquire(url)
+            if wait == 0:
+                return
+            await asyncio.sleep(wait)
+
+    def release(self, url, backoff=False):
+        """
+        Uvolni slot a upravi limit soubeznosti domeny (AIMD).
+
+        Parametry:
+        url (str): URL adresa pozadavku
+        backoff (bool): True pokud server odpovedel 429/5xx nebo pozadavek vyprsel
+        """
+        with self._cond:
+            state = self._state(domain_key(url), self.clock())
+            state['in_flight'] = max(0, state['in_flight'] - 1)
+            if backoff:
+                self.backoffs += 1
+                state['limit'] = max(1.0, state['limit'] / 2)
+                state['tokens'] = 0.0
+            else:
+                state['limit'] = min(
+                    float(self.max_concurrency), state['limit'] + 1 / state['limit'])
+            self._cond.notify_all()
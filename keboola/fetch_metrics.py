@@ -0,0 +1,357 @@
+import csv
+import os
+import socket
+import ssl
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+import pandas as pd
+import requests
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NameResolutionError, NewConnectionError
+from urllib3.exceptions import TimeoutError as Urllib3TimeoutError
+from urllib3.util.retry import Retry
+
+from body_reader import UnsupportedContentType
+from circuit_breaker import CircuitOpenError
+from dns_cache import get_dns_cache, resolve_addresses
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+FETCH_LOG_COLUMNS = ['started_at', 'url', 'host', 'status', 'error', 'error_class', 'retries', 'dns_s',
+                     'connect_s', 'tls_s', 'ttfb_s', 'download_s', 'total_s', 'bytes']
+TIMING_COLUMNS = ['dns_s', 'connect_s', 'tls_s', 'ttfb_s', 'download_s']
+
+# Record of the fetch running in the current thread, filled in by the urllib3 connection classes below
+_current = threading.local()
+
+
+def new_fetch_record(url):
+    """
+    Vytvori prazdny zaznam stazeni s nulovymi casy.
+
+    Parametry:
+    url (str): URL adresa stranky
+
+    Navratova hodnota:
+    dict: Zaznam se sloupci FETCH_LOG_COLUMNS
+    """
+    record = {column: None for column in FETCH_LOG_COLUMNS}
+    record.update({column: 0.0 for column in TIMING_COLUMNS})
+    record.update(started_at=time.time(), url=url, host=urlsplit(url).hostname, retries=0, bytes=0)
+    return record
+
+
+def current_fetch():
+    """
+    Navratova hodnota:
+    dict: Zaznam stazeni bezici v aktualnim vlakne (track_fetch), nebo None
+    """
+    return getattr(_current, 'record', None)
+
+
+@contextmanager
+def track_fetch(fetch_log, url, thread_local=True):
+    """
+    Zaznamena jedno stazeni stranky (vcetne opakovani) do logu stahovani.
+
+    Parametry:
+    fetch_log (FetchLog): Log stahovani, None mereni vypne
+    url (str): URL adresa stranky
+    thread_local (bool): Zpristupnit zaznam urllib3 spojenim aktualniho vlakna, u korutin vypnout
+
+    Navratova hodnota:
+    dict: Zaznam stazeni (sloupce FETCH_LOG_COLUMNS) nebo None
+    """
+    if fetch_log is None:
+        yield None
+        return
+    record = new_fetch_record(url)
+    if thread_local:
+        _current.record = record
+    start = time.perf_counter()
+    try:
+        yield record
+    except Exception as e:
+        set_error(record, e)
+        raise
+    finally:
+        if thread_local:
+            _current.record = None
+        record['total_s'] = time.perf_counter() - start
+        fetch_log.write(record)
+
+
+def exception_chain(exc):
+    """
+    Vrati vyjimku a vsechny vyjimky, ktere obaluje (args, reason urllib3, __cause__ a __context__).
+    """
+    pending = [exc]
+    seen = set()
+    while pending:
+        exc = pending.pop(0)
+        if not isinstance(exc, BaseException) or id(exc) in seen:
+            continue
+        seen.add(id(exc))
+        yield exc
+        pending.extend([getattr(exc, 'reason', None), exc.__cause__, exc.__context__])
+        pending.extend(arg for arg in exc.args if isinstance(arg, BaseException))
+
+
+def error_category(exc):
+    """
+    Zaradi chybu stahovani do kategorie circuit_open, content_type, dns, tls, timeout, connect nebo other,
+    pro requests i aiohttp.
+
+    Parametry:
+    exc (BaseException): Vyjimka stahovani
+
+    Navratova hodnota:
+    str: Kategorie chyby
+    """
+    chain = list(exception_chain(exc))
+    categories = [
+        ('circuit_open', (CircuitOpenError,)),
+        ('content_type', (UnsupportedContentType,)),
+        ('dns', (NameResolutionError, socket.gaierror) +
+         ((aiohttp.ClientConnectorDNSError,) if aiohttp is not None else ())),
+        ('tls', (ssl.SSLError, requests.exceptions.SSLError) +
+         ((aiohttp.ClientSSLError,) if aiohttp is not None else ())),
+        # urllib3 NewConnectionError subclasses ConnectTimeoutError, a refused connection is not a timeout
+        ('connect', (NewConnectionError, ConnectionRefusedError)),
+        ('timeout', (TimeoutError, Urllib3TimeoutError, requests.Timeout)),
+        ('connect', (ConnectionError, requests.ConnectionError) +
+         ((aiohttp.ClientConnectionError,) if aiohttp is not None else ())),
+    ]
+    for category, types in categories:
+        if any(isinstance(item, types) for item in chain):
+            return category
+    return 'other'
+
+
+def set_error(record, exc):
+    """
+    Zapise do zaznamu kategorii a tridu chyby.
+
+    Parametry:
+    record (dict): Zaznam stazeni nebo None
+    exc (BaseException): Vyjimka stahovani
+    """
+    # The last attempt decides, an earlier failed attempt is only counted in retries
+    if record is not None:
+        record['error'] = error_category(exc)
+        record['error_class'] = type(exc).__name__
+
+
+def set_status(record, status):
+    """
+    Zapise do zaznamu HTTP status, 4xx a 5xx jako chybu http_4xx/http_5xx, jinak chybu smaze.
+
+    Parametry:
+    record (dict): Zaznam stazeni nebo None
+    status (int): HTTP status odpovedi
+    """
+    if record is not None:
+        record['status'] = status
+        failed = status >= 400
+        record['error'] = f"http_{status // 100}xx" if failed else None
+        record['error_class'] = 'HTTPError' if failed else None
+
+
+class TimedConnectionMixin:
+    """
+    Meri DNS, navazani spojeni a cas do prvniho bajtu odpovedi pro zaznam stazeni aktualniho vlakna
+    a preklada hosty pres procesni DNS cache. Bez zaznamu a cache se chova presne jako puvodni trida urllib3.
+    """
+
+    def _new_conn(self):
+        """
+        Prelozi host (pres DNS cache, pokud je zapnuta) a otevre TCP spojeni na prvni dostupnou adresu.
+
+        Navratova hodnota:
+        socket.socket: Otevreny socket
+        """
+        record = current_fetch()
+        if record is None and get_dns_cache() is None:
+            return super()._new_conn()
+        start = time.perf_counter()
+        try:
+            addresses = resolve_addresses(self._dns_host, self.port)
+        except socket.gaierror as e:
+            raise NameResolutionError(self.host, self, e) from e
+        finally:
+            if record is not None:
+                record['dns_s'] += time.perf_counter() - start
+        # Connect to the resolved addresses in order, the resolution above is not repeated
+        dns_host = self._dns_host
+        start = time.perf_counter()
+        try:
+            for index, address in enumerate(addresses):
+                self._dns_host = address
+                try:
+                    return super()._new_conn()
+                except (NewConnectionError, ConnectTimeoutError):
+                    if index == len(addresses) - 1:
+                        raise
+        finally:
+            self._dns_host = dns_host
+            if record is not None:
+                record['connect_s'] += time.perf_counter() - start
+
+    def getresponse(self):
+        """
+        Ceka na hlavicky odpovedi, doba se pricita do ttfb_s.
+        """
+        record = current_fetch()
+        start = time.perf_counter()
+        try:
+            return super().getresponse()
+        finally:
+            if record is not None:
+                record['ttfb_s'] += time.perf_counter() - start
+
+
+class TimedHTTPConnection(TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(TimedConnectionMixin, HTTPSConnection):
+
+    def connect(self):
+        """
+        Navaze spojeni vcetne TLS, do tls_s se pricita jen TLS handshake.
+        """
+        record = current_fetch()
+        if record is None:
+            return super().connect()
+        start = time.perf_counter()
+        socket_time = record['dns_s'] + record['connect_s']
+        try:
+            return super().connect()
+        finally:
+            # TLS is what remains of connect() after resolution and the TCP connection
+            record['tls_s'] += time.perf_counter() - start - (record['dns_s'] + record['connect_s'] - socket_time)
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+TIMED_POOL_CLASSES = {'http': TimedHTTPConnectionPool, 'https': TimedHTTPSConnectionPool}
+
+
+class CountingRetry(Retry):
+    """
+    Retry, ktery pocet opakovani zapisuje do zaznamu stazeni aktualniho vlakna.
+    """
+
+    def increment(self, *args, **kwargs):
+        retry = super().increment(*args, **kwargs)
+        record = current_fetch()
+        if record is not None:
+            record['retries'] += 1
+        return retry
+
+
+def create_trace_config():
+    """
+    Vytvori aiohttp TraceConfig, ktery meri DNS, spojeni (vcetne TLS, aiohttp je neoddeluje) a cas
+    do prvniho bajtu. Zaznam stazeni se predava jako trace_request_ctx pozadavku.
+
+    Navratova hodnota:
+    aiohttp.TraceConfig: Konfigurace trasovani pro ClientSession
+    """
+    trace_config = aiohttp.TraceConfig()
+
+    def timer(start_attr, column):
+        async def on_start(session, ctx, params):
+            setattr(ctx, start_attr, time.perf_counter())
+
+        async def on_end(session, ctx, params):
+            record = ctx.trace_request_ctx
+            if record is not None and hasattr(ctx, start_attr):
+                record[column] += time.perf_counter() - getattr(ctx, start_attr)
+        return on_start, on_end
+
+    for start_signal, end_signal, column in [
+            (trace_config.on_dns_resolvehost_start, trace_config.on_dns_resolvehost_end, 'dns_s'),
+            (trace_config.on_connection_create_start, trace_config.on_connection_create_end, 'connect_s'),
+            (trace_config.on_request_headers_sent, trace_config.on_request_end, 'ttfb_s')]:
+        on_start, on_end = timer(f"_{column}_start", column)
+        start_signal.append(on_start)
+        end_signal.append(on_end)
+    return trace_config
+
+
+class FetchLog:
+    """
+    Log stahovani, kazdy pozadavek se hned pripise jako jeden radek CSV souboru (nebo do pameti).
+    """
+
+    def __init__(self, path=None):
+        """
+        Parametry:
+        path (str): Cesta k CSV logu, None drzi radky v pameti
+        """
+        self.path = path
+        self._rows = []
+        self._lock = threading.Lock()
+        self._file = None
+        if path is not None:
+            if os.path.dirname(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._file = open(path, 'w', newline='', encoding='utf-8')
+            self._writer = csv.writer(self._file)
+            self._writer.writerow(FETCH_LOG_COLUMNS)
+
+    def write(self, record):
+        """
+        Parametry:
+        record (dict): Dokonceny zaznam stazeni
+        """
+        row = [record[column] for column in FETCH_LOG_COLUMNS]
+        with self._lock:
+            if self._file is not None:
+                self._writer.writerow(row)
+            else:
+                self._rows.append(row)
+
+    def close(self):
+        """
+        Navratova hodnota:
+        pd.DataFrame: Cely log stahovani
+        """
+        if self._file is None:
+            return pd.DataFrame(self._rows, columns=FETCH_LOG_COLUMNS)
+        self._file.close()
+        return pd.read_csv(self.path)
+
+
+def summarize_fetch_log(log, top=10):
+    """
+    Souhrn logu stahovani: nejpomalejsi hosty a pocty chyb podle kategorie.
+
+    Parametry:
+    log (pd.DataFrame): Log stahovani (vystup FetchLog.close)
+    top (int): Pocet nejpomalejsich hostu
+
+    Navratova hodnota:
+    tuple: DataFrame nejpomalejsich hostu a Series poctu chyb podle kategorie
+    """
+    hosts = log.groupby('host').agg(
+        requests=('url', 'size'), total_s=('total_s', 'sum'), p50_s=('total_s', 'median'),
+        max_s=('total_s', 'max'), dns_s=('dns_s', 'mean'), connect_s=('connect_s', 'mean'),
+        ttfb_s=('ttfb_s', 'mean'), errors=('error', 'count'))
+    slowest = hosts.sort_values('total_s', ascending=False).head(top)
+    failures = log['error'].fillna('ok').value_counts()
+    return slowest, failures
@@ -0,0 +1,156 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager, contextmanager
+
+try:
+    import aiohttp
+    from multidict import CIMultiDict, CIMultiDictProxy
+    from yarl import URL
+except ImportError:
+    aiohttp = None
+
+try:
+    # http2=True needs the h2 package, without it httpx fails only on the first request
+    import h2  # noqa: F401
+    import httpx
+except ImportError:
+    httpx = None
+
+# httpx trace events measured into the fetch record, httpx does not report DNS apart from the TCP connect
+TRACE_COLUMNS = {'connection.connect_tcp': 'connect_s', 'connection.start_tls': 'tls_s'}
+
+
+@contextmanager
+def aiohttp_errors(url):
+    """
+    Prevede chyby httpx na odpovidajici chyby aiohttp, aby je fetch_page_async a error_category zpracovaly
+    stejne jako u aiohttp. Puvodni chyba zustava v __cause__ (DNS a TLS chyby se tak poznaji i dal).
+
+    Parametry:
+    url (str): URL adresa pozadavku
+    """
+    try:
+        yield
+    except httpx.TimeoutException as e:
+        raise asyncio.TimeoutError(str(e)) from e
+    except httpx.InvalidURL as e:
+        raise aiohttp.InvalidURL(url) from e
+    except httpx.TransportError as e:
+        raise aiohttp.ClientConnectionError(str(e) or type(e).__name__) from e
+    except httpx.TooManyRedirects as e:
+        request_info = aiohttp.RequestInfo(URL(url), 'GET', CIMultiDictProxy(CIMultiDict()))
+        raise aiohttp.TooManyRedirects(request_info, (), message=str(e)) from e
+    except httpx.RequestError as e:
+        # DecodingError and any other request error httpx adds later
+        raise aiohttp.ClientError(str(e) or type(e).__name__) from e
+
+
+def create_trace(record):
+    """
+    Vytvori trace callback httpx, ktery meri spojeni, TLS a cas do prvniho bajtu do zaznamu stazeni.
+
+    Parametry:
+    record (dict): Zaznam stazeni (fetch_metrics.new_fetch_record) nebo None
+
+    Navratova hodnota:
+    callable: Async callback pro extensions={'trace': ...}, bez zaznamu None
+    """
+    if record is None:
+        return None
+    started = {}
+
+    async def trace(event_name, info):
+        name, _, phase = event_name.rpartition('.')
+        # http11.send_request_headers ... http2.receive_response_headers is the time to first byte
+        if name.endswith('.send_request_headers') and phase == 'started':
+            started['ttfb'] = time.perf_counter()
+        elif name.endswith('.receive_response_headers') and phase == 'complete' and 'ttfb' in started:
+            record['ttfb_s'] += time.perf_counter() - started.pop('ttfb')
+        elif name in TRACE_COLUMNS:
+            if phase == 'started':
+                started[name] = time.perf_counter()
+            elif phase == 'complete' and name in started:
+                record[TRACE_COLUMNS[name]] += time.perf_counter() - started.pop(name)
+    return trace
+
+
+class Http2Response:
+    """
+    Odpoved httpx s rozhranim odpovedi aiohttp, ktere pouziva fetch_page_async.
+    """
+
+    def __init__(self, response, url):
+        self._response = response
+        self._url = url
+        self.status = response.status_code
+        # Address after redirects, as aiohttp's ClientResponse.url
+        self.url = str(response.url)
+        self.version = response.http_version
+        self.headers = CIMultiDictProxy(CIMultiDict(response.headers.multi_items()))
+        self.content = self
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            request_info = aiohttp.RequestInfo(URL(self._url), 'GET', CIMultiDictProxy(CIMultiDict()))
+            raise aiohttp.ClientResponseError(request_info, (), status=self.status,
+                                              message=self._response.reason_phrase, headers=self.headers)
+
+    async def iter_chunked(self, size):
+        with aiohttp_errors(self._url):
+            async for chunk in self._response.aiter_bytes(size):
+                yield chunk
+
+
+class Http2Session:
+    """
+    Session nad httpx.AsyncClient s HTTP/2 s rozhranim aiohttp.ClientSession, ktere pouziva fetch_page_async.
+    HTTP/2 se vyjednava pres ALPN u https, vsechny soubezne pozadavky na jeden host se multiplexuji
+    jednim spojenim. Servery bez HTTP/2 dostanou HTTP/1.1.
+    """
+
+    def __init__(self, timeout=10, max_connections=1000, prior_knowledge=False):
+        """
+        Parametry:
+        timeout (float): Timeout spojeni, cteni a zapisu v sekundach
+        max_connections (int): Maximalni pocet otevrenych spojeni celkem
+        prior_knowledge (bool): Mluvit HTTP/2 bez vyjednani i na http:// (h2c), jen pro servery, o kterych
+                                se vi, ze ho podporuji
+        """
+        if httpx is None:
+            raise ImportError("HTTP2 requires the httpx package with the h2 extra (httpx[http2])")
+        if aiohttp is None:
+            # Responses and errors are translated to their aiohttp counterparts
+            raise ImportError("HTTP2 requires the aiohttp package as well")
+        self._client = httpx.AsyncClient(
+            http1=not prior_knowledge, http2=True, timeout=timeout, follow_redirects=True,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections))
+
+    async def __aenter__(self):
+        await self._client.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self._client.__aexit__(*exc_info)
+
+    @asynccontextmanager
+    async def get(self, url, headers=None, trace_request_ctx=None):
+        """
+        Posle GET pozadavek, telo odpovedi se cte az pres response.content.iter_chunked.
+
+        Parametry:
+        url (str): URL adresa
+        headers (dict): Hlavicky pozadavku nebo None
+        trace_request_ctx (dict): Zaznam stazeni pro mereni casu nebo None
+
+        Navratova hodnota:
+        Http2Response: Odpoved s rozhranim aiohttp
+        """
+        trace = create_trace(trace_request_ctx)
+        with aiohttp_errors(url):
+            request = self._client.build_request('GET', url, headers=headers,
+                                                 extensions={'trace': trace} if trace is not None else None)
+            response = await self._client.send(request, stream=True)
+        try:
+            yield Http2Response(response, url)
+        finally:
+            await response.aclose()
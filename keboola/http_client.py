@@ -0,0 +1,73 @@
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from fetch_metrics import CountingRetry, TIMED_POOL_CLASSES
+
+# Status codes worth another attempt, everything else is returned to the caller
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """
+    HTTPAdapter s poolem spojeni z fetch_metrics, ktery meri DNS, spojeni, TLS a cas do prvniho bajtu.
+    """
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = TIMED_POOL_CLASSES
+
+
+def create_session(pool_maxsize=10, pool_connections=100, max_retries=2, backoff_factor=0.3):
+    """
+    Vytvori requests session s keep-alive poolem spojeni pro kazdy host a automatickym opakovanim pozadavku.
+
+    Parametry:
+    pool_maxsize (int): Maximalni pocet otevrenych spojeni na jeden host, typicky pocet vlaken
+    pool_connections (int): Pocet hostu, pro ktere se drzi pool otevrenych spojeni
+    max_retries (int): Pocet opakovani pri chybe spojeni, timeoutu nebo statusu z RETRY_STATUS_CODES
+    backoff_factor (float): Faktor pro exponentialni cekani mezi pokusy
+
+    Navratova hodnota:
+    requests.Session: Nakonfigurovana session
+    """
+    retry = CountingRetry(
+        total=max_retries,
+        connect=max_retries,
+        read=max_retries,
+        status=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=frozenset(['GET', 'HEAD']),
+        respect_retry_after_header=True,
+        # Return the last response instead of raising, callers decide via raise_for_status
+        raise_on_status=False
+    )
+    adapter = TimedHTTPAdapter(pool_connections=pool_connections,
+                          pool_maxsize=pool_maxsize, max_retries=retry)
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def get_session(name='default', **session_kwargs):
+    """
+    Vrati sdilenou session pro dany nazev, pri prvnim volani ji vytvori. Pool spojeni
+    urllib3 je thread-safe, session lze sdilet mezi vlakny ThreadPoolExecutoru.
+
+    Parametry:
+    name (str): Nazev session, napr. 'scraper' nebo 'maps'
+    session_kwargs: Parametry pro create_session, pouziji se jen pri vytvoreni
+
+    Navratova hodnota:
+    requests.Session: Sdilena session
+    """
+    with _sessions_lock:
+        if name not in _sessions:
+            _sessions[name] = create_session(**session_kwargs)
+        return _sessions[name]
@@ -0,0 +1,132 @@
+import hashlib
+import os
+
+import pandas as pd
+
+STATE_COLUMNS = ['Base Website', 'Last Scraped', 'Content Hash', 'Status']
+
+
+def load_scrape_state(state_path, previous_scraped_path):
+    """
+    Nacte tabulku stavu predchoziho behu. Bez predchozich vysledku se stav ignoruje,
+    aby se neztratily radky webu, ktere by se jinak preskocily.
+
+    Parametry:
+    state_path (str): Cesta k tabulce stavu (Base Website, Last Scraped, Content Hash, Status)
+    previous_scraped_path (str): Cesta k df_scraped.csv z predchoziho behu
+
+    Navratova hodnota:
+    pd.DataFrame: DataFrame stavu
+    """
+    if not (state_path and previous_scraped_path and os.path.exists(state_path) and os.path.exists(previous_scraped_path)):
+        return pd.DataFrame(columns=STATE_COLUMNS)
+    state = pd.read_csv(state_path)
+    state['Last Scraped'] = pd.to_datetime(state['Last Scraped'])
+    return state
+
+
+def select_websites_to_scrape(df, state, max_age_days, now):
+    """
+    Vybere radky, jejichz web je novy (nebo zmeneny ve Webova_stranka), starsi nez max_age_days
+    nebo se ho minule nepodarilo stahnout. Weby bez nalezenych kontaktu se opakuji az po max_age_days.
+
+    Parametry:
+    df (pd.DataFrame): Vystup data_prep se sloupcem 'web'
+    state (pd.DataFrame): Tabulka stavu z predchoziho behu
+    max_age_days (float): Maximalni stari vysledku ve dnech
+    now (datetime.datetime): Cas aktualniho behu
+
+    Navratova hodnota:
+    pd.DataFrame: Radky df, ktere se maji skriptovat znovu
+    """
+    known = state.set_index('Base Website')
+    last_scraped = pd.to_datetime(df['web'].map(known['Last Scraped']))
+    status = df['web'].map(known['Status'])
+    is_new = last_scraped.isna()
+    is_stale = last_scraped < now - pd.Timedelta(days=max_age_days)
+    is_failed = status == 'failed'
+    print(f"Incremental scrape: {df.loc[is_new, 'web'].nunique()} new, {df.loc[is_stale, 'web'].nunique()} stale, "
+          f"{df.loc[is_failed & ~is_stale, 'web'].nunique()} failed, {df.loc[~(is_new | is_stale | is_failed), 'web'].nunique()} up to date websites")
+    return df[is_new | is_stale | is_failed]
+
+
+def is_empty_value(value):
+    """
+    Overi, zda je hodnota bunky vysledku prazdna (None, NaN nebo prazdny retezec).
+
+    Parametry:
+    value: Hodnota bunky radku vysledku
+
+    Navratova hodnota:
+    bool: True pro prazdnou hodnotu
+    """
+    return value is None or value != value or value == ''
+
+
+def sorted_values(value):
+    """
+    Seradi hodnoty seznamu oddeleneho carkami, aby poradi nalezenych emailu a cisel nemenilo hash webu.
+
+    Parametry:
+    value (str): Hodnoty oddelene ', ' (napr. sloupec Emails)
+
+    Navratova hodnota:
+    str: Tytez hodnoty serazene a oddelene ', '
+    """
+    return ', '.join(sorted(value.split(', ')))
+
+
+def summarize_website(rows):
+    """
+    Spocita hash vysledku a stav jednoho webu. Web je 'failed', pokud se hlavni stranku nepodarilo
+    stahnout (klic 'Fetched' hlavniho radku je False), 'no_contacts', pokud na hlavnim radku chybi
+    emaily nebo telefonni cisla, jinak 'ok'. 'missing' znamena chybejici data na kteremkoli radku
+    (stejne kriterium jako opakovani v process_data).
+
+    Parametry:
+    rows (list): Slovniky radku jednoho webu
+
+    Navratova hodnota:
+    dict: Klice hash, status a missing
+    """
+    rows = sorted(({column: '' if is_empty_value(value) else value for column, value in row.items()}
+                   for row in rows), key=lambda row: row['Scraped Page'])
+    content = '\n'.join(f"{row['Scraped Page']}|{row['Page Type']}|{sorted_values(row['Emails'])}|{sorted_values(row['Phone Numbers'])}"
+                        for row in rows)
+    main_row = next((row for row in rows if row['Page Type'] == 'main'), None)
+    # Rows of checkpoints written before the key existed count as fetched
+    if main_row is None or not main_row.get('Fetched', True):
+        status = 'failed'
+    elif main_row['Emails'] == '' or main_row['Phone Numbers'] == '':
+        status = 'no_contacts'
+    else:
+        status = 'ok'
+    return {
+        'hash': hashlib.sha1(content.encode('utf-8')).hexdigest(),
+        'status': status,
+        'missing': any(row['Emails'] == '' or row['Phone Numbers'] == '' for row in rows)
+    }
+
+
+def update_scrape_state(state, fresh, current_websites, now):
+    """
+    Zapise do stavu cas, hash a stav nove vytezenych webu a odstrani weby, ktere uz nejsou v datech.
+
+    Parametry:
+    state (pd.DataFrame): Tabulka stavu z predchoziho behu
+    fresh (pd.DataFrame): Souhrny nove vytezenych webu (vystup ResultSink.website_summaries)
+    current_websites (set): Weby v aktualnich datech
+    now (datetime.datetime): Cas aktualniho behu
+
+    Navratova hodnota:
+    pd.DataFrame: Aktualizovana tabulka stavu
+    """
+    fresh = fresh.copy()
+    changed = fresh.merge(state[['Base Website', 'Content Hash']], on='Base Website',
+                          how='inner', suffixes=('', '_old'))
+    changed = (changed['Content Hash'] != changed['Content Hash_old']).sum()
+    print(f"Incremental scrape: {len(fresh)} websites scraped, {changed} changed since the previous scrape")
+    fresh['Last Scraped'] = now
+    kept = state[~state['Base Website'].isin(fresh['Base Website'])]
+    updated = pd.concat([kept, fresh[STATE_COLUMNS]], ignore_index=True)
+    return updated[updated['Base Website'].isin(current_websites)].reset_index(drop=True)
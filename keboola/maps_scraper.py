@@ -4,6 +4,10 @@ import re
 import unicodedata
 from tqdm import tqdm
 import concurrent.futures
+from http_client import get_session
+
+MAX_WORKERS = 8
+REQUEST_TIMEOUT = 10
 
 # Load the Excel file
 def load_data(file_path):
@@ -21,7 +25,8 @@ def geocode(query):
     }
 
     try:
-        response = requests.get(url, params=params)
+        response = get_session('maps', pool_maxsize=MAX_WORKERS).get(
+            url, params=params, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
         data = response.json()
 
@@ -83,7 +88,8 @@ def google_maps_api(name, address, api_key, original_address):
         'key': api_key
     }
 
-    find_response = requests.get(find_place_url, params=find_params)
+    session = get_session('maps', pool_maxsize=MAX_WORKERS)
+    find_response = session.get(find_place_url, params=find_params, timeout=REQUEST_TIMEOUT)
     find_result = find_response.json()
 
     if find_result['status'] == 'OK':
@@ -98,7 +104,7 @@ def google_maps_api(name, address, api_key, original_address):
                 'key': api_key
             }
 
-            details_response = requests.get(details_url, params=details_params)
+            details_response = session.get(details_url, params=details_params, timeout=REQUEST_TIMEOUT)
             details_result = details_response.json()
 
             if details_result['status'] == 'OK':
@@ -155,7 +161,7 @@ def main(file_path, api_key):
         return compare_data(pd.DataFrame([row]), google_response)
 
     # Use ThreadPoolExecutor to process rows concurrently
-    with concurrent.futures.ThreadPoolExecutor(max_workers = 8) as executor:
+    with concurrent.futures.ThreadPoolExecutor(max_workers = MAX_WORKERS) as executor:
         futures = {executor.submit(process_row, index, row): index for index, row in data.iterrows()}
         for future in tqdm(concurrent.futures.as_completed(futures), total=len(futures)):
             all_results.append(future.result())
@@ -0,0 +1,153 @@
+import re
+
+from bs4 import BeautifulSoup
+
+try:
+    import lxml.etree
+except ImportError:
+    lxml = None
+
+# Tags whose text BeautifulSoup leaves out of soup.text, the lxml backend skips the same ones
+NON_TEXT_TAGS = {'script', 'style', 'template', 'rt', 'rp'}
+ANCHOR_TAG_REGEX = re.compile(r'<(/?)a[\s/>]', re.IGNORECASE)
+
+
+def parse_html_bs4(html):
+    """
+    Puvodni cesta pres BeautifulSoup a html.parser.
+
+    Parametry:
+    html (str): HTML obsah stranky
+
+    Navratova hodnota:
+    tuple: Text stranky (soup.text) a list dvojic (href, text odkazu)
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    anchors = [(link['href'], link.text) for link in soup.find_all('a', href=True)]
+    return soup.text, anchors
+
+
+def parse_html_lxml(html):
+    """
+    Rychla cesta pres libxml2. Text stranky i odkazy se sbiraji v jednom proudovem pruchodu udalostmi parseru,
+    text odpovida soup.text (bez skriptu, stylu a komentaru, vcetne CDATA a obsahu za </html>). Stranky
+    s vnorenymi odkazy, ktere libxml2 uzavira jinak nez html.parser, se parsuji pres BeautifulSoup.
+
+    Parametry:
+    html (str): HTML obsah stranky
+
+    Navratova hodnota:
+    tuple: Text stranky a list dvojic (href, text odkazu)
+    """
+    if lxml is None:
+        raise ImportError("PARSER_BACKEND 'lxml' requires the lxml package")
+    if has_nested_anchors(html):
+        return parse_html_bs4(html)
+    collector = TextCollector()
+    try:
+        # Bytes input avoids lxml refusing str documents with an encoding declaration
+        lxml.etree.fromstring(html.encode('utf-8', 'replace'),
+                              parser=lxml.etree.HTMLParser(encoding='utf-8', target=collector))
+    except (lxml.etree.LxmlError, ValueError):
+        # Empty or undecodable documents, the text read so far is kept
+        pass
+    return collector.result()
+
+
+def has_nested_anchors(html):
+    """
+    Overi, zda stranka otevira odkaz uvnitr jineho odkazu. html.parser je vnori do sebe, libxml2 vnejsi
+    odkaz uzavre, takze by se lisil text odkazu.
+
+    Parametry:
+    html (str): HTML obsah stranky
+
+    Navratova hodnota:
+    bool: True, pokud se <a> otevira uvnitr neuzavreneho <a>
+    """
+    depth = 0
+    for match in ANCHOR_TAG_REGEX.finditer(html):
+        if match.group(1):
+            depth = max(0, depth - 1)
+        else:
+            depth += 1
+            if depth > 1:
+                return True
+    return False
+
+
+class TextCollector:
+    """
+    Cil (target) parseru lxml, ktery misto stromu sbira text stranky a odkazy. Dostava i udalosti obsahu
+    za </html>, ktery by stavitel stromu zahodil, a sekce CDATA, ktere libxml2 hlasi jako komentare.
+    """
+
+    def __init__(self):
+        self.parts = []
+        self.anchors = []
+        # Open elements, each with the text parts of its anchor or None
+        self.stack = []
+        self.open_anchors = []
+        self.skipped_depth = 0
+
+    def start(self, tag, attrib):
+        if tag in NON_TEXT_TAGS:
+            self.skipped_depth += 1
+        anchor = None
+        if tag == 'a' and 'href' in attrib:
+            anchor = (attrib['href'], [])
+            self.open_anchors.append(anchor[1])
+        self.stack.append((tag, anchor))
+
+    def end(self, tag):
+        if not self.stack:
+            return
+        tag, anchor = self.stack.pop()
+        if tag in NON_TEXT_TAGS:
+            self.skipped_depth -= 1
+        if anchor is not None:
+            self.open_anchors.pop()
+            self.anchors.append((anchor[0], ''.join(anchor[1])))
+
+    def data(self, data):
+        if self.skipped_depth:
+            return
+        self.parts.append(data)
+        for anchor_parts in self.open_anchors:
+            anchor_parts.append(data)
+
+    def comment(self, text):
+        # html.parser keeps <![CDATA[...]]> as text, libxml2 reports it as the comment '[CDATA[...]]'
+        if text.startswith('[CDATA[') and text.endswith(']]'):
+            self.data(text[7:-2])
+
+    def close(self):
+        return None
+
+    def result(self):
+        # Elements left open when the parser stopped on an error
+        while self.stack:
+            self.end(self.stack[-1][0])
+        return ''.join(self.parts), self.anchors
+
+
+PARSER_BACKENDS = {
+    'html.parser': parse_html_bs4,
+    'lxml': parse_html_lxml,
+}
+
+
+def extract_text_and_links(html, backend='html.parser'):
+    """
+    Parsuje HTML zvolenym backendem a vrati text stranky a odkazy.
+
+    Parametry:
+    html (str): HTML obsah stranky
+    backend (str): Nazev backendu z PARSER_BACKENDS
+
+    Navratova hodnota:
+    tuple: Text stranky a list dvojic (href, text odkazu)
+    """
+    if backend not in PARSER_BACKENDS:
+        raise ValueError(f"Unknown parser backend: {backend}")
+    return PARSER_BACKENDS[backend](html)
@@ -0,0 +1,91 @@
+from functools import lru_cache
+
+import pandas as pd
+import phonenumbers
+
+PHONE_COLUMNS = ['formated_number', 'number', 'prefix',
+                 'country_code', 'valid', 'possible', 'parsed']
+# Distinct raw phone strings remembered between batches
+PHONE_CACHE_SIZE = 100000
+# phonenumbers rejects anything with fewer digits as not a number
+MIN_PHONE_DIGITS = 2
+
+
+def py_parse_phonenumber(num):
+    """
+    Analyzuje telefonni cislo a vraci informace o jeho formatu, platnosti a moznosti.
+
+    Parametry:
+    num (str): Telefonni cislo k analyzovani
+
+    Navratova hodnota:
+    dict: Slovnik s informacemi o telefonni cislo
+    """
+    try:
+        parsed_num = phonenumbers.parse(num, 'CZ')
+        phonenumbers.is_possible_number_with_reason(parsed_num)
+        return {
+            'formated_number': phonenumbers.format_number(parsed_num, phonenumbers.PhoneNumberFormat.E164),
+            'number': parsed_num.national_number,
+            'prefix': parsed_num.country_code,
+            'country_code': phonenumbers.region_code_for_number(parsed_num),
+            'valid': phonenumbers.is_valid_number(parsed_num),
+            'possible': phonenumbers.is_possible_number(parsed_num),
+            'parsed': True
+        }
+    except Exception:
+        return {'number': num, 'prefix': None, 'country_code': None, 'valid': False, 'possible': False, 'parsed': False}
+
+
+@lru_cache(maxsize=PHONE_CACHE_SIZE)
+def parse_phone_cached(num):
+    """
+    py_parse_phonenumber s pameti podle suroveho retezce.
+
+    Parametry:
+    num (str): Telefonni cislo k analyzovani
+
+    Navratova hodnota:
+    tuple: Hodnoty v poradi PHONE_COLUMNS
+    """
+    result = py_parse_phonenumber(num)
+    return tuple(result.get(column, float('nan')) for column in PHONE_COLUMNS)
+
+
+def failed_phone(num):
+    """
+    Vysledek pro hodnotu, kterou phonenumbers neprecte, bez volani phonenumbers. Odpovida vetvi
+    except v py_parse_phonenumber, formated_number chybi (NaN).
+
+    Parametry:
+    num (str): Telefonni cislo k analyzovani
+
+    Navratova hodnota:
+    tuple: Hodnoty v poradi PHONE_COLUMNS
+    """
+    return (float('nan'), num, None, None, False, False, False)
+
+
+def normalize_phones(values):
+    """
+    Davkove analyzuje telefonni cisla. Kazda ruzna hodnota se parsuje jen jednou (a mezi davkami
+    ji drzi LRU cache), hodnoty s mene nez dvema cislicemi se vyradi vektorove bez volani
+    phonenumbers. Vysledek odpovida py_parse_phonenumber radek po radku.
+
+    Parametry:
+    values (pd.Series): Surova telefonni cisla
+
+    Navratova hodnota:
+    pd.DataFrame: Sloupce PHONE_COLUMNS se stejnym indexem jako values
+    """
+    values = pd.Series(values)
+    try:
+        digits = values.str.count(r'\d')
+    except AttributeError:
+        # No string values at all (e.g. an empty or all-NaN column), none of them would parse
+        digits = pd.Series(0, index=values.index)
+    candidates = (digits >= MIN_PHONE_DIGITS).fillna(False).astype(bool)
+    parsed = {num: parse_phone_cached(num) for num in pd.unique(values[candidates])}
+    rows = [parsed[num] if is_candidate else failed_phone(num)
+            for num, is_candidate in zip(values, candidates)]
+    return pd.DataFrame(rows, columns=PHONE_COLUMNS, index=values.index)
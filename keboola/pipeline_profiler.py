@@ -0,0 +1,216 @@
+import cProfile
+import json
+import os
+import resource
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import pandas as pd
+
+REPORT_COLUMNS = ['stage', 'calls', 'wall_s', 'cpu_s', 'rows_in', 'rows_out', 'bytes', 'peak_rss_mb',
+                  'peak_traced_mb']
+
+_profiler = None
+_profiler_lock = threading.Lock()
+
+
+class StageRecord:
+    """
+    Namerene hodnoty jedne faze pipeline, volajici do nej zapisuje rows_in a rows_out, faze pracujici
+    s daty (stahovani) i pocet bajtu.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.rows_in = None
+        self.rows_out = None
+        self.bytes = None
+        self.peak_rss_mb = None
+        self.peak_traced_mb = None
+
+    def add_rows(self, rows_in=0, rows_out=0):
+        self.rows_in = (self.rows_in or 0) + rows_in
+        self.rows_out = (self.rows_out or 0) + rows_out
+
+    def add_bytes(self, size):
+        self.bytes = (self.bytes or 0) + size
+
+    def as_dict(self):
+        return {'stage': self.name, 'calls': self.calls, 'wall_s': round(self.wall, 6), 'cpu_s': round(self.cpu, 6),
+                'rows_in': self.rows_in, 'rows_out': self.rows_out, 'bytes': self.bytes,
+                'peak_rss_mb': self.peak_rss_mb, 'peak_traced_mb': self.peak_traced_mb}
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+class PipelineProfiler:
+    """
+    Meri faze pipeline: wall a CPU cas, pocty radku na vstupu a vystupu a spicku pameti.
+    Hlavni faze se meri pres stage(), kratke opakovane operace ve vlaknech (stahovani,
+    parsovani) pres measure(), ktere jejich cas scita.
+    """
+
+    def __init__(self, use_cprofile=False, use_tracemalloc=False, dump_dir=None):
+        """
+        Parametry:
+        use_cprofile (bool): Kazdou fazi stage() obalit cProfile a ulozit <faze>.prof do dump_dir
+        use_tracemalloc (bool): Merit spicku alokaci Pythonu v kazde fazi stage() a ulozit snapshot
+        dump_dir (str): Adresar pro .prof a tracemalloc snapshoty
+        """
+        self.use_cprofile = use_cprofile
+        self.use_tracemalloc = use_tracemalloc
+        self.dump_dir = dump_dir
+        self.stages = {}
+        self._lock = threading.Lock()
+        self._profiling = False
+        if use_tracemalloc and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def _record(self, name):
+        with self._lock:
+            if name not in self.stages:
+                self.stages[name] = StageRecord(name)
+            return self.stages[name]
+
+    def _dump_path(self, name, suffix):
+        os.makedirs(self.dump_dir, exist_ok=True)
+        return os.path.join(self.dump_dir, f"{name}{suffix}")
+
+    @contextmanager
+    def stage(self, name, rows_in=None):
+        """
+        Zmeri jednu hlavni fazi v aktualnim vlakne, CPU cas je za cely proces (vcetne vlaken faze).
+        cProfile vidi jen aktualni vlakno, prace ve vlaknech faze je v measure().
+
+        Parametry:
+        name (str): Nazev faze
+        rows_in (int): Pocet radku na vstupu, lze doplnit i pozdeji do vraceneho zaznamu
+
+        Navratova hodnota:
+        StageRecord: Zaznam faze, volajici do nej zapise rows_out
+        """
+        record = self._record(name)
+        if rows_in is not None:
+            record.rows_in = rows_in
+        profile = None
+        # Only one cProfile can be active, a nested stage is covered by the enclosing one
+        if self.use_cprofile and self.dump_dir and not self._profiling:
+            profile = cProfile.Profile()
+            self._profiling = True
+        if self.use_tracemalloc:
+            tracemalloc.reset_peak()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        if profile is not None:
+            profile.enable()
+        try:
+            yield record
+        finally:
+            if profile is not None:
+                profile.disable()
+                self._profiling = False
+            with self._lock:
+                record.calls += 1
+                record.wall += time.perf_counter() - wall_start
+                record.cpu += time.process_time() - cpu_start
+                record.peak_rss_mb = peak_rss_mb()
+            if profile is not None:
+                profile.dump_stats(self._dump_path(name, '.prof'))
+            if self.use_tracemalloc:
+                record.peak_traced_mb = round(tracemalloc.get_traced_memory()[1] / 1024 / 1024, 1)
+                if self.dump_dir:
+                    tracemalloc.take_snapshot().dump(self._dump_path(name, '.tracemalloc'))
+
+    @contextmanager
+    def measure(self, name, cpu=True):
+        """
+        Pricte jedno volani kratke operace k fazi, bezpecne z vice vlaken. CPU cas je cas vlakna.
+
+        Parametry:
+        name (str): Nazev faze
+        cpu (bool): Merit CPU cas, u korutin vypnout (cas vlakna smycky zahrnuje ostatni ulohy)
+
+        Navratova hodnota:
+        StageRecord: Zaznam volani, pocty radku se zapisuji pres add_rows a bajty pres add_bytes
+        """
+        record = self._record(name)
+        # Rows are counted on a private record and merged under the lock
+        call = StageRecord(name)
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time() if cpu else None
+        try:
+            yield call
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu_time = time.thread_time() - cpu_start if cpu else 0.0
+            with self._lock:
+                record.calls += 1
+                record.wall += wall
+                record.cpu += cpu_time
+                if call.rows_in is not None:
+                    record.add_rows(rows_in=call.rows_in, rows_out=call.rows_out)
+                if call.bytes is not None:
+                    record.add_bytes(call.bytes)
+
+    def report(self):
+        """
+        Navratova hodnota:
+        pd.DataFrame: Jeden radek na fazi v poradi prvniho mereni, sloupce REPORT_COLUMNS
+        """
+        with self._lock:
+            return pd.DataFrame([record.as_dict() for record in self.stages.values()], columns=REPORT_COLUMNS)
+
+    def write_report(self, path_prefix, **run_info):
+        """
+        Zapise report behu jako <path_prefix>.json a <path_prefix>.csv.
+
+        Parametry:
+        path_prefix (str): Cesta k reportu bez pripony, napr. 'out/tables/pipeline_profile'
+        run_info: Dalsi udaje o behu ulozene do JSON reportu (napr. engine)
+
+        Navratova hodnota:
+        pd.DataFrame: Zapsany report
+        """
+        report = self.report()
+        if os.path.dirname(path_prefix):
+            os.makedirs(os.path.dirname(path_prefix), exist_ok=True)
+        report.to_csv(f"{path_prefix}.csv", index=False)
+        with open(f"{path_prefix}.json", 'w', encoding='utf-8') as f:
+            json.dump({'run': run_info, 'peak_rss_mb': peak_rss_mb(),
+                       'stages': json.loads(report.to_json(orient='records'))}, f, indent=2)
+        return report
+
+
+def get_profiler():
+    """
+    Vrati profiler aktualniho behu. Bez predchoziho set_profiler vytvori vychozi profiler bez cProfile
+    a tracemalloc, jehoz mereni stoji jen par volani hodin.
+
+    Navratova hodnota:
+    PipelineProfiler: Sdileny profiler
+    """
+    global _profiler
+    with _profiler_lock:
+        if _profiler is None:
+            _profiler = PipelineProfiler()
+        return _profiler
+
+
+def set_profiler(profiler):
+    """
+    Nastavi profiler, do ktereho zapisuji vsechny moduly pipeline.
+
+    Parametry:
+    profiler (PipelineProfiler): Novy profiler
+    """
+    global _profiler
+    with _profiler_lock:
+        _profiler = profiler
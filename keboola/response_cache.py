@@ -0,0 +1,184 @@
+import json
+import sqlite3
+import threading
+import time
+from urllib.parse import urlsplit, urlunsplit
+
+
+def normalize_cache_key(url):
+    """
+    Normalizuje URL adresu na klic cache (mala pismena ve schematu a hostu, bez vychoziho portu a fragmentu).
+
+    Parametry:
+    url (str): URL adresa
+
+    Navratova hodnota:
+    str: Normalizovana URL adresa
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    netloc = parts.netloc.lower()
+    if (scheme == 'http' and netloc.endswith(':80')) or (scheme == 'https' and netloc.endswith(':443')):
+        netloc = netloc.rsplit(':', 1)[0]
+    return urlunsplit((scheme, netloc, parts.path or '/', parts.query, ''))
+
+
+class ResponseCache:
+    """
+    Perzistentni cache HTTP odpovedi v SQLite. Uklada telo stranky, ETag, Last-Modified
+    a vysledek parsovani, aby se pri odpovedi 304 stranka nemusela znovu parsovat.
+    """
+
+    def __init__(self, path, ttl_seconds=30 * 24 * 3600, max_bytes=512 * 1024 * 1024, clock=time.time):
+        """
+        Otevre (nebo vytvori) cache a odstrani zaznamy starsi nez TTL.
+
+        Parametry:
+        path (str): Cesta k SQLite souboru
+        ttl_seconds (int): Maximalni stari zaznamu, starsi zaznamy se stahuji znovu bez podminky
+        max_bytes (int): Maximalni celkova velikost ulozenych tel stranek
+        clock (callable): Zdroj casu v sekundach, testy podstrci vlastni hodiny
+        """
+        self.path = path
+        self.clock = clock
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                body TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                result TEXT,
+                size INTEGER,
+                fetched_at REAL,
+                accessed_at REAL
+            )""")
+        self._conn.commit()
+        self.evict()
+
+    def get(self, url):
+        """
+        Vrati zaznam cache pro URL adresu, pokud existuje a neni starsi nez TTL. Chybejici nebo
+        prosly zaznam se zapocita jako minuti.
+
+        Parametry:
+        url (str): URL adresa
+
+        Navratova hodnota:
+        dict: Zaznam s klici etag, last_modified a result, nebo None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT etag, last_modified, result, fetched_at FROM responses WHERE url = ?',
+                (normalize_cache_key(url),)).fetchone()
+            if row is None or row[3] < self.clock() - self.ttl_seconds:
+                self.misses += 1
+                return None
+        return {'etag': row[0], 'last_modified': row[1], 'result': json.loads(row[2])}
+
+    @staticmethod
+    def conditional_headers(entry):
+        """
+        Sestavi hlavicky podmineneho pozadavku pro zaznam cache.
+
+        Parametry:
+        entry (dict): Zaznam cache nebo None
+
+        Navratova hodnota:
+        dict: Hlavicky If-None-Match / If-Modified-Since
+        """
+        headers = {}
+        if entry is None:
+            return headers
+        if entry['etag']:
+            headers['If-None-Match'] = entry['etag']
+        if entry['last_modified']:
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def revalidated(self, url, entry):
+        """
+        Zaznamena odpoved 304 a vrati ulozeny vysledek parsovani.
+
+        Parametry:
+        url (str): URL adresa
+        entry (dict): Zaznam cache
+
+        Navratova hodnota:
+        dict: Ulozeny vysledek parsovani
+        """
+        now = self.clock()
+        with self._lock:
+            self.hits += 1
+            self._conn.execute(
+                'UPDATE responses SET fetched_at = ?, accessed_at = ? WHERE url = ?',
+                (now, now, normalize_cache_key(url)))
+            self._conn.commit()
+        return entry['result']
+
+    def store(self, url, body, etag, last_modified, result):
+        """
+        Ulozi nove stazenou stranku a jeji vysledek parsovani.
+
+        Parametry:
+        url (str): URL adresa
+        body (str): Telo stranky
+        etag (str): Hlavicka ETag odpovedi nebo None
+        last_modified (str): Hlavicka Last-Modified odpovedi nebo None
+        result (dict): Vysledek parsovani serializovatelny do JSON
+        """
+        now = self.clock()
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (normalize_cache_key(url), body, etag, last_modified, json.dumps(result),
+                 len(body.encode('utf-8')), now, now))
+            self._conn.commit()
+
+    def evict(self):
+        """
+        Odstrani zaznamy starsi nez TTL a nejdele nepouzite zaznamy nad limitem velikosti.
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                'DELETE FROM responses WHERE fetched_at < ?', (self.clock() - self.ttl_seconds,))
+            self.evictions += cursor.rowcount
+            total_size = self._conn.execute(
+                'SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+            if total_size > self.max_bytes:
+                rows = self._conn.execute(
+                    'SELECT url, size FROM responses ORDER BY accessed_at').fetchall()
+                expired = []
+                for url, size in rows:
+                    if total_size <= self.max_bytes:
+                        break
+                    expired.append((url,))
+                    total_size -= size
+                self._conn.executemany('DELETE FROM responses WHERE url = ?', expired)
+                self.evictions += len(expired)
+            self._conn.commit()
+
+    def stats(self):
+        """
+        Vrati citace cache za aktualni beh.
+
+        Navratova hodnota:
+        dict: Pocet zasahu (304), minuti (URL adresa bez platneho zaznamu), vyrazenych zaznamu a pocet zaznamu v cache
+        """
+        with self._lock:
+            entries = self._conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions, 'entries': entries}
+
+    def close(self):
+        """
+        Vyradi zaznamy nad limity a zavre spojeni.
+        """
+        self.evict()
+        self._conn.close()
@@ -0,0 +1,217 @@
+import csv
+import os
+import threading
+
+import pandas as pd
+
+from incremental import summarize_website
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+# Parquet output needs pyarrow, without it the results are written to CSV only
+PARQUET_AVAILABLE = pa is not None
+
+# Rows per chunk when the staged results are rewritten into the outputs or read back downstream
+READ_CHUNKSIZE = 50000
+# Column holding the write generation of a row in the staging file
+GENERATION_COLUMN = '_generation'
+
+
+def iter_result_chunks(path, chunksize=READ_CHUNKSIZE, **read_csv_kwargs):
+    """
+    Cte vysledky skriptovani po davkach, v pameti je vzdy jen jedna davka.
+
+    Parametry:
+    path (str): Cesta k CSV souboru s vysledky
+    chunksize (int): Pocet radku v jedne davce
+    read_csv_kwargs: Dalsi parametry pro pd.read_csv
+
+    Navratova hodnota:
+    iterator: Iterator DataFrame davek
+    """
+    return pd.read_csv(path, chunksize=chunksize, **read_csv_kwargs)
+
+
+class ResultSink:
+    """
+    Sink vysledku skriptovani drzeny v pameti. Radky se zapisuji po celych webech, pozdejsi zapis
+    stejneho webu (opakovani pri chybejicich datech) nahradi radky predchoziho zapisu.
+    """
+
+    def __init__(self, columns):
+        """
+        Parametry:
+        columns (list): Sloupce vysledku, prvni musi byt 'Base Website'
+        """
+        self.columns = list(columns)
+        self.summaries = {}
+        self._generation = 0
+        self._rows = []
+        self._lock = threading.Lock()
+
+    def write(self, rows):
+        """
+        Zapise radky jednoho dokonceneho webu a zapamatuje si jejich souhrn.
+
+        Parametry:
+        rows (list): Radky vysledku jednoho webu (vystup build_rows)
+        """
+        if not rows:
+            return
+        summary = summarize_website(rows)
+        values = [[row.get(column) for column in self.columns] for row in rows]
+        with self._lock:
+            self._generation += 1
+            summary['generation'] = self._generation
+            self.summaries[rows[0]['Base Website']] = summary
+            self._append(values, self._generation)
+
+    def write_previous(self, frame):
+        """
+        Zapise radky prevzate z predchoziho behu. Do souhrnu se nepocitaji a pokud se web v tomto
+        behu vytezi znovu, jeho prevzate radky se vynechaji.
+
+        Parametry:
+        frame (pd.DataFrame): Davka radku predchozich vysledku
+        """
+        with self._lock:
+            self._append(frame[self.columns].values.tolist(), 0)
+
+    def missing_websites(self):
+        """
+        Vrati weby k opakovanemu skriptovani. Bere se posledni zapis webu, takze web, kteremu
+        opakovani data doplnilo, uz v seznamu neni. Radky prevzate z predchoziho behu se nepocitaji.
+
+        Navratova hodnota:
+        list: Weby zapsane v tomto behu, kterym na nekterem radku chybi emaily nebo telefonni cisla
+        """
+        return [website for website, summary in self.summaries.items() if summary['missing']]
+
+    def website_summaries(self):
+        """
+        Vrati souhrny webu pro stav inkrementalniho skriptovani (update_scrape_state), jeden radek
+        za web podle jeho posledniho zapisu.
+
+        Navratova hodnota:
+        pd.DataFrame: Sloupce Base Website, Content Hash a Status pro weby zapsane v tomto behu
+        """
+        return pd.DataFrame([
+            {'Base Website': website, 'Content Hash': summary['hash'], 'Status': summary['status']}
+            for website, summary in self.summaries.items()
+        ], columns=['Base Website', 'Content Hash', 'Status'])
+
+    def _append(self, values, generation):
+        """
+        Ulozi radky s cislem generace zapisu. Vola se pod zamkem, podtridy radky ukladaji jinam.
+
+        Parametry:
+        values (list): Radky jako listy hodnot v poradi self.columns
+        generation (int): Generace zapisu, 0 pro radky prevzate z predchoziho behu
+        """
+        self._rows.extend((generation, row) for row in values)
+
+    def _is_current(self, website, generation):
+        """
+        Rozhodne, zda radek webu patri do vystupu. Kazde volani write dostane novou, vyssi generaci
+        a souhrn webu si pamatuje generaci sveho posledniho zapisu. Platne jsou tak jen radky
+        s generaci posledniho zapisu, radky drivejsich zapisu stejneho webu jsou nahrazene.
+        Radky z predchoziho behu maji generaci 0 a platne jsou jen tehdy, kdyz se web v tomto behu
+        vubec nezapsal (nema souhrn). Jakmile se web vytezi znovu, jeho prevzate radky se vynechaji.
+
+        Parametry:
+        website (str): Base Website radku
+        generation (int): Generace zapisu radku
+
+        Navratova hodnota:
+        bool: True, pokud radek nebyl nahrazen pozdejsim zapisem
+        """
+        summary = self.summaries.get(website)
+        return generation == (summary['generation'] if summary is not None else 0)
+
+    def close(self):
+        """
+        Navratova hodnota:
+        pd.DataFrame: Aktualni radky vsech webu
+        """
+        return pd.DataFrame([row for generation, row in self._rows if self._is_current(row[0], generation)],
+                            columns=self.columns)
+
+
+class FileResultSink(ResultSink):
+    """
+    Sink, ktery radky kazdeho dokonceneho webu hned pripise do pracovniho CSV souboru, v pameti
+    zustava jen souhrn webu. Pri zavreni se pracovni soubor po davkach prepise do vystupniho CSV
+    a volitelne Parquetu, nahrazene radky se pri tom vynechaji.
+    """
+
+    def __init__(self, columns, csv_path, parquet_path=None, chunksize=READ_CHUNKSIZE):
+        """
+        Parametry:
+        columns (list): Sloupce vysledku, prvni musi byt 'Base Website'
+        csv_path (str): Cesta k vystupnimu CSV
+        parquet_path (str): Cesta k vystupnimu Parquet souboru, None Parquet vypne
+        chunksize (int): Pocet radku v jedne davce pri prepisu do vystupu
+        """
+        if parquet_path is not None and pa is None:
+            raise ImportError("Parquet output requires the pyarrow package")
+        super().__init__(columns)
+        self.csv_path = csv_path
+        self.parquet_path = parquet_path
+        self.chunksize = chunksize
+        self.staging_path = csv_path + '.partial'
+        for path in (csv_path, parquet_path):
+            if path and os.path.dirname(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._staging = open(self.staging_path, 'w', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._staging)
+        self._writer.writerow(self.columns + [GENERATION_COLUMN])
+
+    def _append(self, values, generation):
+        """
+        Pripise radky do pracovniho CSV, generace zapisu se uklada do sloupce GENERATION_COLUMN,
+        podle ktere close vynecha nahrazene radky.
+
+        Parametry:
+        values (list): Radky jako listy hodnot v poradi self.columns
+        generation (int): Generace zapisu, 0 pro radky prevzate z predchoziho behu
+        """
+        self._writer.writerows(row + [generation] for row in values)
+
+    def close(self):
+        """
+        Prepise pracovni soubor do vystupniho CSV (a Parquetu) a smaze ho.
+
+        Navratova hodnota:
+        int: Pocet zapsanych radku
+        """
+        self._staging.close()
+        parquet_writer = None
+        if self.parquet_path is not None:
+            schema = pa.schema([(column, pa.string()) for column in self.columns])
+            parquet_writer = pq.ParquetWriter(self.parquet_path, schema)
+        written = 0
+        header = True
+        try:
+            chunks = iter_result_chunks(self.staging_path, self.chunksize,
+                                        dtype=str, keep_default_na=False)
+            for chunk in chunks:
+                current = [self._is_current(website, int(generation)) for website, generation in
+                           zip(chunk[self.columns[0]], chunk[GENERATION_COLUMN])]
+                chunk = chunk.loc[current, self.columns]
+                chunk.to_csv(self.csv_path, mode='w' if header else 'a', header=header, index=False)
+                header = False
+                if parquet_writer is not None and not chunk.empty:
+                    parquet_writer.write_table(pa.Table.from_pandas(chunk, schema=parquet_writer.schema,
+                                                                    preserve_index=False))
+                written += len(chunk)
+        finally:
+            if parquet_writer is not None:
+                parquet_writer.close()
+        if header:
+            pd.DataFrame(columns=self.columns).to_csv(self.csv_path, index=False)
+        os.remove(self.staging_path)
+        return written
@@ -0,0 +1,144 @@
+import hashlib
+import html
+import re
+from urllib.parse import urljoin
+
+from contact_links import link_key, rank_contact_links
+
+SITEMAP_LINE_REGEX = re.compile(r'^\s*sitemap\s*:\s*(\S+)', re.IGNORECASE | re.MULTILINE)
+SITEMAP_LOC_REGEX = re.compile(r'<(?:\w+:)?loc>\s*(.*?)\s*</(?:\w+:)?loc>', re.IGNORECASE | re.DOTALL)
+SITEMAP_INDEX_REGEX = re.compile(r'<(?:\w+:)?sitemapindex[\s>]', re.IGNORECASE)
+
+
+def probe_urls(base_url, paths):
+    """
+    Vrati URL adresy beznych cest kontaktnich stranek na webu.
+
+    Parametry:
+    base_url (str): Zakladni URL adresa webu
+    paths (list): Cesty od korene webu, napr. ['/kontakt', '/o-nas']
+
+    Navratova hodnota:
+    list: Absolutni URL adresy
+    """
+    return [urljoin(base_url, path) for path in paths]
+
+
+def page_fingerprint(final_url, body):
+    """
+    Vrati otisk stazene stranky pro rozpoznani sond, na ktere web vraci hlavni stranku.
+
+    Parametry:
+    final_url (str): URL adresa stranky po presmerovani
+    body (str): Telo stranky
+
+    Navratova hodnota:
+    tuple: Klic konecne URL adresy (link_key) a SHA-1 tela stranky
+    """
+    return link_key(final_url), hashlib.sha1(body.encode('utf-8', 'replace')).hexdigest()
+
+
+def is_homepage_echo(probe_fingerprint, homepage_fingerprint):
+    """
+    Overi, zda sonda skoncila na hlavni strance webu (presmerovani na ni nebo stejne telo pro neznamou cestu).
+
+    Parametry:
+    probe_fingerprint (tuple): Otisk sondy (page_fingerprint) nebo None
+    homepage_fingerprint (tuple): Otisk hlavni stranky nebo None
+
+    Navratova hodnota:
+    bool: True, pokud sonda neni samostatna stranka webu
+    """
+    if probe_fingerprint is None or homepage_fingerprint is None:
+        return False
+    return any(probe_part == homepage_part for probe_part, homepage_part in zip(probe_fingerprint, homepage_fingerprint))
+
+
+def sitemaps_from_robots(robots_txt, base_url):
+    """
+    Najde v robots.txt adresy sitemap (radky 'Sitemap: ...').
+
+    Parametry:
+    robots_txt (str): Obsah robots.txt
+    base_url (str): Zakladni URL adresa webu, vuci ktere se resi relativni adresy
+
+    Navratova hodnota:
+    list: URL adresy sitemap v poradi v souboru
+    """
+    return list(dict.fromkeys(urljoin(base_url, url) for url in SITEMAP_LINE_REGEX.findall(robots_txt)))
+
+
+def parse_sitemap(xml):
+    """
+    Vytahne adresy ze sitemap. Parsuje se regularnim vyrazem, sitemapy webu casto nejsou validni XML.
+
+    Parametry:
+    xml (str): Obsah sitemap.xml
+
+    Navratova hodnota:
+    tuple: List URL adres stranek a list URL adres vnorenych sitemap (u indexu sitemap)
+    """
+    urls = [html.unescape(url) for url in SITEMAP_LOC_REGEX.findall(xml)]
+    if SITEMAP_INDEX_REGEX.search(xml):
+        return [], urls
+    return urls, []
+
+
+class SitemapWalk:
+    """
+    Fronta sitemap jednoho webu: sitemapy z robots.txt a vnorene sitemapy indexu sitemap se ctou postupne,
+    dokud to dovoli rozpocet.
+    """
+
+    def __init__(self, sitemap_urls, budget):
+        """
+        Parametry:
+        sitemap_urls (list): Pocatecni URL adresy sitemap (z robots.txt, jinak /sitemap.xml)
+        budget (SiteBudget): Rozpocet stazenych sitemap a bajtu, muze uz obsahovat stazeny robots.txt
+        """
+        self.queue = list(dict.fromkeys(sitemap_urls))
+        self.budget = budget
+        self.position = 0
+        self.page_urls = []
+
+    def next_sitemap(self):
+        """
+        Vrati dalsi sitemapu ke stazeni.
+
+        Navratova hodnota:
+        str: URL adresa sitemap, nebo None pokud je fronta prazdna nebo rozpocet vycerpany
+        """
+        if self.position >= len(self.queue) or self.budget.pages_left() == 0:
+            return None
+        self.position += 1
+        return self.queue[self.position - 1]
+
+    def add(self, xml, size):
+        """
+        Zapocita stazenou sitemapu, jeji stranky prida k vysledku a vnorene sitemapy na konec fronty.
+
+        Parametry:
+        xml (str): Obsah sitemap, nebo None pokud se ji nepodarilo stahnout
+        size (int): Pocet stazenych bajtu nebo None
+        """
+        self.budget.spend(size)
+        if xml is None:
+            return
+        urls, nested = parse_sitemap(xml)
+        self.page_urls.extend(urls)
+        # An index listing itself or a sitemap already queued is not read twice
+        self.queue.extend(url for url in dict.fromkeys(nested) if url not in self.queue)
+
+
+def sitemap_contact_links(page_urls, base_url):
+    """
+    Seradi stranky ze sitemap podle skore kontaktni stranky, bez textu odkazu rozhoduje cesta URL.
+
+    Parametry:
+    page_urls (list): URL adresy stranek ze sitemap
+    base_url (str): Zakladni URL adresa webu
+
+    Navratova hodnota:
+    list: URL adresy kandidatu na kontaktni stranku od nejlepsiho
+    """
+    return rank_contact_links([(url, '') for url in page_urls], base_url)
@@ -0,0 +1,142 @@
+import re
+from urllib.parse import unquote_plus, urlsplit, urlunsplit
+
+import pandas as pd
+
+# Query parameters added by ad and newsletter links, they never change the page content
+TRACKING_PARAM_PREFIXES = ('utm_',)
+TRACKING_PARAMS = {'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid', 'mc_cid', 'mc_eid', '_ga', '_gl'}
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+WHITESPACE_REGEX = re.compile(r'\s+')
+
+
+def is_tracking_param(name):
+    """
+    Overi, zda je parametr query trackovaci (utm_*, fbclid, gclid a podobne), tedy nemeni obsah stranky.
+
+    Parametry:
+    name (str): Nazev parametru, muze byt zakodovany v URL
+
+    Navratova hodnota:
+    bool: True pro trackovaci parametr
+    """
+    name = unquote_plus(name).lower()
+    return name.startswith(TRACKING_PARAM_PREFIXES) or name in TRACKING_PARAMS
+
+
+def idna_host(host):
+    """
+    Prevede host na ASCII tvar (IDNA), aby se 'žluťoučký.cz' a 'xn--luouk-uva4it5a4g.cz' shodovaly.
+
+    Parametry:
+    host (str): Hostname s malymi pismeny
+
+    Navratova hodnota:
+    str: Host v ASCII, host, ktery IDNA neprevede, se vrati beze zmeny
+    """
+    if host.isascii():
+        return host
+    try:
+        return host.encode('idna').decode('ascii')
+    except UnicodeError:
+        return host
+
+
+def canonical_url(url):
+    """
+    Vrati kanonicky tvar URL adresy ke stazeni: bez bilych znaku, s https:// (a 'www.' u holeho hostu
+    druheho radu bez schematu, jako driv ensure_url_format), host malymi pismeny v IDNA, bez vychoziho portu,
+    fragmentu a trackovacich parametru. Prazdna cesta je '/', zbytek query zustava v puvodnim zapisu.
+
+    Parametry:
+    url (str): URL adresa ze zdrojovych dat
+
+    Navratova hodnota:
+    str: Kanonicka URL adresa, nebo None pro adresu bez hostu
+    """
+    url = WHITESPACE_REGEX.sub('', url)
+    if '://' not in url:
+        host = url.split('/')[0]
+        # Only a bare registrable domain gets 'www.', a subdomain like 'poradna.x.cz' is kept
+        url = 'https://' + ('www.' + url if host.count('.') == 1 else url)
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return None
+    if not parts.hostname:
+        return None
+    scheme = parts.scheme.lower()
+    netloc = idna_host(parts.hostname.rstrip('.'))
+    if port is not None and port != DEFAULT_PORTS.get(scheme):
+        netloc = f"{netloc}:{port}"
+    # Only tracking segments are dropped, re-encoding would change '?/kontakt/' or '%20' on the server side
+    query = '&'.join(segment for segment in parts.query.split('&')
+                     if not is_tracking_param(segment.split('=', 1)[0]))
+    return urlunsplit((scheme, netloc, parts.path or '/', query, ''))
+
+
+def url_key(url):
+    """
+    Vrati klic pro deduplikaci URL adres: kanonicky tvar bez schematu, bez 'www.' a bez koncoveho lomitka,
+    'http://x.cz', 'https://www.x.cz/' a 'x.cz' maji stejny klic.
+
+    Parametry:
+    url (str): URL adresa, schema muze chybet
+
+    Navratova hodnota:
+    str: Klic URL adresy, pro neplatnou adresu prazdny retezec
+    """
+    url = canonical_url(url)
+    if url is None:
+        return ''
+    parts = urlsplit(url)
+    netloc = parts.netloc[4:] if parts.netloc.startswith('www.') else parts.netloc
+    key = f"{netloc}{parts.path.rstrip('/')}"
+    return f"{key}?{parts.query}" if parts.query else key
+
+
+def site_root(url):
+    """
+    Vrati korenovou stranku webu, stahuje se i k hlubokemu odkazu ze zdrojovych dat.
+
+    Parametry:
+    url (str): Kanonicka URL adresa (canonical_url)
+
+    Navratova hodnota:
+    str: Korenova stranka webu kanonicke URL adresy, napr. 'https://www.x.cz/'
+    """
+    parts = urlsplit(url)
+    return urlunsplit((parts.scheme, parts.netloc, '/', '', ''))
+
+
+def build_frontier(df, web_column='web'):
+    """
+    Z radku zdrojovych dat sestavi frontu webu ke stazeni: kazda URL adresa a koren jejiho webu
+    se prevede na kanonicky tvar a varianty se stejnym klicem (url_key) se stahuji jen jednou.
+    Ze skupiny variant se stahuje prvni adresa s https ze zdroje, jinak prvni adresa v poradi dat.
+
+    Parametry:
+    df (pd.DataFrame): Zdrojova data, index identifikuje zdrojovy radek
+    web_column (str): Sloupec s URL adresou webu
+
+    Navratova hodnota:
+    tuple: DataFrame fronty (sloupce web a source_rows) a DataFrame mapovani (source_row, source_web,
+           web - stahovana URL adresa, url_key) s radkem pro kazdy zdrojovy radek a jeho koren webu
+    """
+    mapping = []
+    for source_row, source_web in df[web_column].items():
+        url = canonical_url(source_web)
+        if url is None:
+            continue
+        # The homepage is scraped as well, a deep link alone may miss the site contacts
+        for candidate in dict.fromkeys([url, site_root(url)]):
+            mapping.append({'source_row': source_row, 'source_web': source_web, 'candidate': candidate,
+                            'url_key': url_key(candidate),
+                            'explicit_https': source_web.strip().lower().startswith('https://')})
+    mapping = pd.DataFrame(mapping, columns=['source_row', 'source_web', 'candidate', 'url_key', 'explicit_https'])
+    chosen = mapping.sort_values('explicit_https', ascending=False, kind='stable').drop_duplicates('url_key')
+    mapping['web'] = mapping['url_key'].map(chosen.set_index('url_key')['candidate'])
+    mapping = mapping.drop_duplicates(['source_row', 'url_key'])
+    frontier = mapping.groupby('web', sort=False).agg(source_rows=('source_row', 'nunique')).reset_index()
+    return frontier, mapping[['source_row', 'source_web', 'web', 'url_key']].reset_index(drop=True)
@@ -1,16 +1,44 @@
 import pandas as pd
-import numpy as np
 import requests
-from bs4 import BeautifulSoup
 import re
 from tqdm import tqdm
-import phonenumbers
-import phonenumbers.geocoder
-from urllib.parse import urljoin, urlparse
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urljoin
+from concurrent.futures import ThreadPoolExecutor, Future, as_completed
 import time
 import datetime
 import os
+import asyncio
+import threading
+import shutil
+import argparse
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+from response_cache import ResponseCache
+from http_client import get_session, RETRY_STATUS_CODES
+from domain_scheduler import DomainScheduler, interleave_by_domain
+from page_parsers import extract_text_and_links
+from incremental import load_scrape_state, select_websites_to_scrape, update_scrape_state
+from checkpoint import ScrapeCheckpoint
+from contact_extractor import extract_contacts, clean_email
+from phone_normalizer import normalize_phones
+from result_sink import PARQUET_AVAILABLE, ResultSink, FileResultSink, iter_result_chunks
+from pipeline_profiler import PipelineProfiler, get_profiler, set_profiler
+from fetch_metrics import (FetchLog, track_fetch, set_error, set_status, create_trace_config, summarize_fetch_log,
+                           error_category)
+from dns_cache import (DNS_TTL_AVAILABLE, DNSCache, CachedResolver, dead_host_error, get_dns_cache, host_of,
+                       set_dns_cache)
+from circuit_breaker import HostCircuitBreaker
+from contact_links import SiteBudget, next_contact_pages, rank_contact_links
+from site_discovery import (SitemapWalk, is_homepage_echo, page_fingerprint, probe_urls, sitemaps_from_robots,
+                            sitemap_contact_links)
+from body_reader import (BodyReader, BodyStats, UnsupportedContentType, accepts_content_type, get_body_stats,
+                         header_charset, set_body_stats)
+from url_normalizer import build_frontier
+from http2_client import Http2Session
 
 RUN_EVIRONMENT = "keboola"
 
@@ -26,232 +54,507 @@ if RUN_EVIRONMENT == "local":
     if not os.path.exists(f'../data/{datetime.datetime.now().day}_{datetime.datetime.now().strftime("%m")}'):
         os.makedirs(
             f'../data/{datetime.datetime.now().day}_{datetime.datetime.now().strftime("%m")}')
+    RESPONSE_CACHE_PATH = "../data/response_cache.sqlite"
+    RESPONSE_CACHE_INPUT_PATH = None
+    SCRAPE_STATE_INPUT_PATH = "../data/scrape_state.csv"
+    SCRAPE_STATE_PATH = "../data/scrape_state.csv"
+    # Local runs keep every output in ../data, the previous df_scraped.csv is the output of the last run
+    PREVIOUS_SCRAPED_PATH = "../data/df_scraped.csv"
+    CHECKPOINT_PATH = "../data/scrape_checkpoint.jsonl"
+    SCRAPED_OUTPUT_PATH = "../data/df_scraped.csv"
+    SCRAPED_PARQUET_PATH = "../data/df_scraped.parquet"
+    FETCH_LOG_PATH = "../data/fetch_log.csv"
+    URL_MAP_PATH = "../data/url_frontier.csv"
+    PROFILE_REPORT_PATH = "../data/pipeline_profile_scraper"
+    PROFILE_DUMP_DIR = "../data/profile"
     pass
 elif RUN_EVIRONMENT == "keboola":
     DB_POMOCI_PATH = "in/tables/db_pomoci.csv"
     MAX_WORKERS = 8
     SAVE_FILES_PATH = "out/tables/"
+    # The cache is kept between runs through file input/output mapping
+    RESPONSE_CACHE_PATH = "out/files/response_cache.sqlite"
+    RESPONSE_CACHE_INPUT_PATH = "in/files/response_cache.sqlite"
+    # Previous run outputs mapped back as inputs for the incremental mode
+    SCRAPE_STATE_INPUT_PATH = "in/tables/scrape_state.csv"
+    SCRAPE_STATE_PATH = "out/tables/scrape_state.csv"
+    PREVIOUS_SCRAPED_PATH = "in/tables/df_scraped.csv"
+    # Nothing of a killed job (out/files nor the state file) is kept, --resume only works for local runs
+    CHECKPOINT_PATH = "out/files/scrape_checkpoint.jsonl"
+    SCRAPED_OUTPUT_PATH = "out/tables/df_scraped.csv"
+    SCRAPED_PARQUET_PATH = "out/files/df_scraped.parquet"
+    # One row per fetched page with DNS/connect/TLS/TTFB/download timings, status and error category
+    FETCH_LOG_PATH = "out/tables/fetch_log.csv"
+    # Canonical URL crawled for every db_pomoci row, one row per source row and URL variant
+    URL_MAP_PATH = "out/tables/url_frontier.csv"
+    # Stage timings of the run, cProfile and tracemalloc dumps only when enabled below
+    PROFILE_REPORT_PATH = "out/tables/pipeline_profile_scraper"
+    PROFILE_DUMP_DIR = "out/files/profile"
     pass
 else:
     raise EnvironmentError("this environment is not supported")
 
+# Engine used by scrape_urls: "threads" (ThreadPoolExecutor) or "asyncio" (aiohttp)
+SCRAPER_ENGINE = "threads"
+# HTML parser backend: "html.parser" (BeautifulSoup) or "lxml" (C-backed, same text and links)
+PARSER_BACKEND = "html.parser"
+REQUEST_TIMEOUT = 10
+# Hosts kept in the keep-alive pool of the thread engine, each with up to MAX_WORKERS connections
+HTTP_POOL_HOSTS = 200
+# Limits of the asyncio engine
+ASYNC_MAX_CONNECTIONS = 1000
+ASYNC_MAX_PER_HOST = 4
+ASYNC_MAX_SITES = 2000
+# Politeness per domain: token bucket rate/burst and AIMD bounds of concurrent requests
+DOMAIN_RATE = 2.0
+DOMAIN_BURST = 4
+DOMAIN_INITIAL_CONCURRENCY = 2
+DOMAIN_MAX_CONCURRENCY = 4
+# Response cache entries older than TTL are downloaded again unconditionally
+RESPONSE_CACHE_TTL = 30 * 24 * 3600
+RESPONSE_CACHE_MAX_BYTES = 512 * 1024 * 1024
+# Incremental mode re-scrapes only new, failed to fetch or older than SCRAPE_MAX_AGE_DAYS websites
+INCREMENTAL_SCRAPE = True
+SCRAPE_MAX_AGE_DAYS = 7
+# Process-wide DNS cache, all hosts are resolved upfront and dead domains are never fetched
+DNS_CACHE = True
+# TTL used when the resolver does not return one (without dnspython) and how long a dead domain is remembered
+DNS_DEFAULT_TTL = 300
+DNS_NEGATIVE_TTL = 600
+DNS_PREFETCH_WORKERS = 64
+# A host is given up for the rest of the run after this many consecutive fetches failing to connect or time out
+BREAKER_FAILURE_THRESHOLD = 2
+# Per-site cost bound: best ranked contact pages fetched per level, pages (main page included) and bytes per site
+CONTACT_TOP_K = 3
+SITE_MAX_PAGES = 6
+SITE_MAX_BYTES = 2 * 1024 * 1024
+# Follow the best contact links found on the contact pages as well (one more hop)
+CONTACT_EXTRA_HOP = False
+# Bodies are read in chunks and cut off after RESPONSE_MAX_BYTES, non-HTML content types are not downloaded
+RESPONSE_MAX_BYTES = 1024 * 1024
+RESPONSE_CHUNK_BYTES = 64 * 1024
+# Fetch through httpx in the asyncio engine and negotiate HTTP/2 (ALPN on https), concurrent pages of one
+# host are then multiplexed over a single connection instead of up to ASYNC_MAX_PER_HOST HTTP/1.1 connections
+HTTP2 = False
+# Speak HTTP/2 without negotiation also on http:// (h2c), only for servers known to support it (benchmarks)
+HTTP2_PRIOR_KNOWLEDGE = False
+# Discovery mode: while the homepage downloads, probe common contact paths and read robots.txt and the sitemap
+SITE_DISCOVERY = False
+DISCOVERY_PATHS = ['/kontakt', '/kontakty', '/o-nas']
+# Discovery budget per site, separate from SITE_MAX_PAGES: robots.txt plus SITEMAP_MAX_FILES sitemap files
+# (the nested sitemaps of a sitemap index are read in turn and count too) and DISCOVERY_MAX_BYTES in total
+SITEMAP_MAX_FILES = 3
+DISCOVERY_MAX_BYTES = 2 * 1024 * 1024
+# Threads of the thread engine running the probes next to the MAX_WORKERS site workers
+DISCOVERY_WORKERS = 32
+# Wrap the main stages in cProfile (.prof for flamegraph tools) and tracemalloc, both slow the run down
+PROFILE_CPROFILE = False
+PROFILE_TRACEMALLOC = False
+RESULT_COLUMNS = ['Base Website', 'Scraped Page',
+                  'Page Type', 'Emails', 'Phone Numbers']
+
+
+def data_prep(subset: bool = False) -> tuple:
+    """
+    Pripravi data pro skript, odstrani nepouzitelne odkazy a sestavi frontu webu ke stazeni,
+    ve ktere je kazdy web (po kanonizaci URL adresy) jen jednou.
+
+    Parametry:
+    subset (bool): Pokud je True, vrati pouze prvnich 100 webu fronty, pouziva se pro trouble shooting
 
-def ensure_url_format(url):
+    Navratova hodnota:
+    tuple: DataFrame fronty se sloupci web a source_rows a DataFrame mapovani fronty na radky db_pomoci
+           (source_row, source_web, web, url_key)
     """
-    Zajisti, aby URL melo spravny format, pokud nezacina na 'www', 'http' nebo 'https', prida 'www.'
+
+    db_pomoci = pd.read_csv(DB_POMOCI_PATH)
+    df = db_pomoci.rename(
+        columns={"Webova_stranka": "web", "Nazev": "nazev", "E_mail": "email"})
+    black_list = ['http://www.dc-brno.cz', 'www.freeklub.cz', 'http://www.cszs.cz/',
+                  'http://www.fokustabor.cz/centrum-dusevniho-zdravi-_-komunitni-tym-tabor']
+    df = df[(~df["web"].isna()) & (~df['web'].isin(black_list))]
+    frontier, url_map = build_frontier(df, 'web')
+    if subset:
+        frontier = frontier.head(100)
+        url_map = url_map[url_map['web'].isin(frontier['web'])]
+    return frontier, url_map
+
+
+def find_contact_links(anchors, base_url, visited_urls):
+    """
+    Najde odkazy na kontaktni stranky mezi odkazy HTML dokumentu a seradi je od nejpravdepodobnejsi.
 
     Parametry:
-    url (str): URL adresa k overeni
+    anchors (list): List dvojic (href, text odkazu)
+    base_url (str): Zakladni URL adresa webu
+    visited_urls (set): Sada jiz navstivenych URL adres, ktere se preskoci
 
     Navratova hodnota:
-    str: URL adresa ve spravnem formatu
+    list: List URL adres kontaktnich stranek bez variant lisicich se fragmentem nebo query
     """
-    if not (url.startswith('www') or url.startswith('http') or url.startswith('https')):
-        return 'www.' + url
-    return url
+    return rank_contact_links(anchors, base_url, visited_urls)
 
 
-def data_prep(subset: bool = False) -> pd.DataFrame:
+def fetch_page(url, headers=None, scheduler=None, fetch_log=None, breaker=None):
     """
-    Pripravi data pro skript, odstrani nepouzitelne odkazy a upravi format webovych stranek.
+    Stahne stranku pres sdilenou session, opakovani s exponencialnim cekanim resi pool spojeni.
 
     Parametry:
-    subset (bool): Pokud je True, vrati pouze prvnich 100 radku, pouziva se pro trouble shooting
+    url (str): URL adresa ke stazeni
+    headers (dict): Dodatecne hlavicky pozadavku (napr. podminene hlavicky cache)
+    scheduler (DomainScheduler): Planovac pozadavku podle domeny nebo None
+    fetch_log (FetchLog): Log stahovani, do ktereho se zapise doba jednotlivych fazi pozadavku, nebo None
+    breaker (HostCircuitBreaker): Jistic hostu, pozadavky na nedostupny host se neposilaji, nebo None
 
     Navratova hodnota:
-    pd.DataFrame: Upraveny DataFrame s pripravenymi daty
+    tuple: Status, HTML obsah, hlavicky odpovedi, velikost tela v bajtech a URL adresa po presmerovani,
+           nebo None pokud se stranku nepodarilo stahnout
+    """
+    skipped = dead_host_error(url)
+    if skipped is None and breaker is not None:
+        skipped = breaker.open_error(url)
+    if skipped is not None:
+        with track_fetch(fetch_log, url) as record:
+            set_error(record, skipped)
+        return None
+    session = get_session('scraper', pool_maxsize=MAX_WORKERS,
+                          pool_connections=HTTP_POOL_HOSTS)
+    if scheduler is not None:
+        scheduler.acquire(url)
+    backoff = False
+    try:
+        # The breaker may have opened while this request waited for its slot
+        skipped = breaker.open_error(url) if breaker is not None else None
+        if skipped is not None:
+            with track_fetch(fetch_log, url) as record:
+                set_error(record, skipped)
+            return None
+        with track_fetch(fetch_log, url) as record, get_profiler().measure('fetch') as stage:
+            response = session.get(url, headers=headers, timeout=REQUEST_TIMEOUT, stream=True)
+            # Closing a partly read response drops its connection instead of draining the rest
+            with response:
+                set_status(record, response.status_code)
+                if breaker is not None:
+                    breaker.record_success(url)
+                backoff = response.status_code in RETRY_STATUS_CODES
+                # Error pages are not downloaded, raise_for_status below turns them into None
+                html, size = None, None
+                if response.status_code < 400:
+                    content_type = response.headers.get('Content-Type')
+                    if not accepts_content_type(content_type):
+                        # Logged as in the asyncio engine, the body is never downloaded
+                        set_error(record, UnsupportedContentType(content_type))
+                        get_body_stats().add_skipped()
+                        return None
+                    reader = BodyReader(RESPONSE_MAX_BYTES, header_charset(content_type))
+                    download_start = time.perf_counter()
+                    for chunk in response.iter_content(chunk_size=RESPONSE_CHUNK_BYTES):
+                        if not reader.feed(chunk):
+                            break
+                    html, size = reader.finish(), reader.size
+                    if record is not None:
+                        record['download_s'] = time.perf_counter() - download_start
+                        record['bytes'] = size
+                    get_body_stats().add(reader)
+                    stage.add_rows(rows_in=1, rows_out=1)
+                    stage.add_bytes(size)
+        # Raises an HTTPError if the response status code is 4XX or 5XX
+        response.raise_for_status()
+        return response.status_code, html, response.headers, size, response.url
+    except (requests.Timeout, requests.ConnectionError) as e:
+        backoff = True
+        if breaker is not None:
+            breaker.record_failure(url, error_category(e))
+        return None
+    except requests.RequestException:
+        return None
+    finally:
+        if scheduler is not None:
+            scheduler.release(url, backoff=backoff)
+
+
+def parse_page(html, url):
     """
+    Jednou parsuje HTML stranky a z jednoho dokumentu vytahne emaily, telefonni cisla i odkazy na kontakty.
 
-    db_pomoci = pd.read_csv(DB_POMOCI_PATH)
-    df = db_pomoci.rename(
-        columns={"Webova_stranka": "web", "Nazev": "nazev", "E_mail": "email"})
-    black_list = ['http://www.dc-brno.cz', 'www.freeklub.cz', 'http://www.cszs.cz/',
-                  'http://www.fokustabor.cz/centrum-dusevniho-zdravi-_-komunitni-tym-tabor']
-    df = df[(~df["web"].isna()) & (~df['web'].isin(black_list))]
-    df['web'] = df['web'].str.replace(r'\s+', '', regex=True)
-    df_replace = df.copy()
-    df_replace.loc[df_replace['web'].str.contains(
-        r'\.cz/.+'), 'web'] = df_replace['web'].str.replace(r'\.cz/.+', '.cz', regex=True)
-    # df.loc[df['web'].str.contains(r'\.cz/.+'), 'web'] = df['web'].str.replace(r'\.cz/.+', '.cz', regex=True)
-    # Apply the function to the 'web' column
-    df['web'] = df['web'].apply(ensure_url_format)
-    df.loc[df['web'].str.startswith('www'), 'web'] = df['web'].str.replace(
-        '^www', 'https://www', regex=True)
-    df = pd.concat([df, df_replace]).drop_duplicates().reset_index(drop=True)
-    if subset:
-        df = df.head(100)  # ubset first 300 rows
-    return df
+    Parametry:
+    html (str): HTML obsah stranky
+    url (str): URL adresa stranky, vuci ktere se resi relativni odkazy
+
+    Navratova hodnota:
+    tuple: Sada emailu, sada telefonnich cisel a list odkazu na kontaktni stranky
+    """
+    profiler = get_profiler()
+    with profiler.measure('parse') as stage:
+        text, anchors = extract_text_and_links(html, PARSER_BACKEND)
+        stage.add_rows(rows_in=1, rows_out=len(anchors))
+    with profiler.measure('extract') as stage:
+        emails, phones = extract_contacts(text)
+        stage.add_rows(rows_in=1, rows_out=len(emails) + len(phones))
+    return emails, phones, find_contact_links(anchors, url, set())
 
 
-def validate_url(url):
+def parse_and_store(url, html, headers, cache, final_url):
     """
-    Overi, zda URL obsahuje scheme (http/https), pokud ne, prida 'https://'
+    Parsuje stazenou stranku a pokud je zapnuta cache, ulozi do ni telo stranky i vysledek parsovani.
 
     Parametry:
-    url (str): URL adresa k overeni
+    url (str): URL adresa stranky
+    html (str): HTML obsah stranky
+    headers (Mapping): Hlavicky odpovedi
+    cache (ResponseCache): Cache odpovedi nebo None
+    final_url (str): URL adresa stranky po presmerovani
 
     Navratova hodnota:
-    str: URL adresa se spravnym schematem
+    tuple: Sada emailu, sada telefonnich cisel, list odkazu na kontaktni stranky a otisk stranky (page_fingerprint)
+    """
+    emails, phones, links = parse_page(html, url)
+    fingerprint = page_fingerprint(final_url, html)
+    if cache is not None:
+        cache.store(url, html, headers.get('ETag'), headers.get('Last-Modified'),
+                    {'emails': sorted(emails), 'phones': sorted(phones), 'links': links,
+                     'fingerprint': list(fingerprint)})
+    return emails, phones, links, fingerprint
+
+
+def cached_result(result):
     """
+    Prevede vysledek parsovani ulozeny v cache zpet na sady emailu a telefonnich cisel.
+
+    Parametry:
+    result (dict): Vysledek parsovani z cache
 
-    parsed_url = urlparse(url)
-    if not parsed_url.scheme:
-        return "https://" + url
-    return url
+    Navratova hodnota:
+    tuple: Sada emailu, sada telefonnich cisel, list odkazu na kontaktni stranky a otisk stranky
+           (None u zaznamu ulozenych bez otisku)
+    """
+    fingerprint = result.get('fingerprint')
+    return set(result['emails']), set(result['phones']), result['links'], tuple(fingerprint) if fingerprint else None
+
+
+def load_page(url, cache=None, scheduler=None, fetch_log=None, breaker=None):
+    """
+    Stahne a parsuje stranku, se zapnutou cache posle podmineny pozadavek a pri odpovedi 304 preskoci parsovani.
+
+    Parametry:
+    url (str): URL adresa k prohledani
+    cache (ResponseCache): Cache odpovedi nebo None
+    scheduler (DomainScheduler): Planovac pozadavku podle domeny nebo None
+    fetch_log (FetchLog): Log stahovani nebo None
+    breaker (HostCircuitBreaker): Jistic hostu nebo None
+
+    Navratova hodnota:
+    tuple: Sada emailu, sada telefonnich cisel, list odkazu na kontaktni stranky, pocet stazenych bajtu
+           (None, pokud se stranku nepodarilo stahnout) a otisk stranky (page_fingerprint) nebo None
+    """
+    entry = cache.get(url) if cache is not None else None
+    response = fetch_page(
+        url, headers=ResponseCache.conditional_headers(entry), scheduler=scheduler, fetch_log=fetch_log,
+        breaker=breaker)
+    if response is None:
+        return set(), set(), [], None, None
+    status, html, headers, size, final_url = response
+    if status == 304 and entry is not None:
+        emails, phones, links, fingerprint = cached_result(cache.revalidated(url, entry))
+    else:
+        emails, phones, links, fingerprint = parse_and_store(url, html, headers, cache, final_url)
+    return emails, phones, links, size, fingerprint
 
 
-def scrape_urls(df):
+def build_rows(url, emails, phones, contact_results, fetched=True):
     """
-    Skriptuje URL adresy z DataFrame a hleda emaily a telefonni cisla.
+    Sestavi vystupni radky pro jeden web, hlavni stranka obsahuje kontakty ze vsech stranek webu.
+
+    Parametry:
+    url (str): Zakladni URL adresa webu
+    emails (set): Sada emailu z hlavni a kontaktnich stranek
+    phones (set): Sada telefonnich cisel z hlavni a kontaktnich stranek
+    contact_results (dict): Slovnik kontaktni stranka -> (emaily, telefonni cisla)
+    fetched (bool): False, pokud se hlavni stranku nepodarilo stahnout
+
+    Navratova hodnota:
+    list: List slovniku s nalezenymi emaily a telefonni cisly, hlavni radek ma navic klic 'Fetched'
+          pro stav inkrementalniho skriptovani (do vystupu se nezapisuje)
+    """
+    all_results = [{
+        'Base Website': url,
+        'Scraped Page': url,
+        'Page Type': 'main',
+        'Emails': ', '.join(emails),
+        'Phone Numbers': ', '.join(phones),
+        'Fetched': fetched
+    }]
+    for contact_url, (contact_emails, contact_phones) in contact_results.items():
+        all_results.append({
+            'Base Website': url,
+            'Scraped Page': contact_url,
+            'Page Type': 'contact',
+            'Emails': ', '.join(contact_emails),
+            'Phone Numbers': ', '.join(contact_phones)
+        })
+    return all_results
+
+
+def discover_sitemap_links(base_url, scheduler=None, fetch_log=None, breaker=None):
+    """
+    Najde kandidaty na kontaktni stranky v sitemap webu (adresy z robots.txt, jinak /sitemap.xml).
+
+    Parametry:
+    base_url (str): Zakladni URL adresa webu
+    scheduler (DomainScheduler): Planovac pozadavku podle domeny nebo None
+    fetch_log (FetchLog): Log stahovani nebo None
+    breaker (HostCircuitBreaker): Jistic hostu nebo None
+
+    Navratova hodnota:
+    list: URL adresy kandidatu od nejlepsiho
+    """
+    # robots.txt and the sitemaps have their own budget, the page budget of the site is left to contact pages
+    budget = SiteBudget(1 + SITEMAP_MAX_FILES, DISCOVERY_MAX_BYTES)
+    response = fetch_page(urljoin(base_url, '/robots.txt'), scheduler=scheduler, fetch_log=fetch_log,
+                          breaker=breaker)
+    budget.spend(response[3] if response is not None else None)
+    sitemaps = sitemaps_from_robots(response[1], base_url) if response is not None else []
+    walk = SitemapWalk(sitemaps or [urljoin(base_url, '/sitemap.xml')], budget)
+    while True:
+        sitemap_url = walk.next_sitemap()
+        if sitemap_url is None:
+            break
+        response = fetch_page(sitemap_url, scheduler=scheduler, fetch_log=fetch_log, breaker=breaker)
+        if response is not None:
+            walk.add(response[1], response[3])
+        else:
+            walk.add(None, None)
+    return sitemap_contact_links(walk.page_urls, base_url)
+
+
+def create_scheduler():
+    """
+    Vytvori planovac zdvorilosti podle domeny z konfigurace skriptu.
+
+    Navratova hodnota:
+    DomainScheduler: Novy planovac
+    """
+    return DomainScheduler(rate=DOMAIN_RATE, burst=DOMAIN_BURST,
+                           initial_concurrency=DOMAIN_INITIAL_CONCURRENCY,
+                           max_concurrency=DOMAIN_MAX_CONCURRENCY)
+
+
+def scrape_urls(df, cache=None, scheduler=None, checkpoint=None, sink=None, fetch_log=None, breaker=None):
+    """
+    Skriptuje URL adresy z DataFrame a hleda emaily a telefonni cisla. Vsechny weby jdou do jedne
+    fronty prokladane podle domeny, zatez jednotlivych domen hlida DomainScheduler.
 
     Parametry:
     df (pd.DataFrame): DataFrame obsahujici URL adresy k prohledavani
+    cache (ResponseCache): Perzistentni cache odpovedi, None cache vypne
+    scheduler (DomainScheduler): Planovac pozadavku podle domeny, None vytvori novy
+    checkpoint (ScrapeCheckpoint): Checkpoint, do ktereho se zapise kazdy dokonceny web, nebo None
+    sink (ResultSink): Sink, do ktereho se radky kazdeho dokonceneho webu hned zapisou misto
+                       hromadeni v pameti, nebo None
+    fetch_log (FetchLog): Log stahovani jednotlivych stranek nebo None
+    breaker (HostCircuitBreaker): Jistic hostu, None vytvori novy pro toto volani
 
     Navratova hodnota:
-    list: List slovniku s nalezenymi emaily a telefonni cisly pro kazdou URL adresu
-    """
-
-    email_regex = re.compile(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}")
-    # Phone regex V2
-    phone_regex = re.compile(r"""
-        (?:
-            \+420[-\s]?        # Optional country code +420 followed by an optional space or dash
-        )?
-        (?:
-            \d{3}[-\s]?        # First part of the phone number (3 digits) followed by an optional space or dash
-            \d{3}[-\s]?        # Second part of the phone number (3 digits) followed by an optional space or dash
-            \d{3}              # Third part of the phone number (3 digits)
-            |                  # OR
-            \d{3}[-\s]?        # First part of the phone number (3 digits) followed by an optional space or dash
-            \d{2}[-\s]?        # Second part of the phone number (2 digits) followed by an optional space or dash
-            \d{2}[-\s]?        # Third part of the phone number (2 digits) followed by an optional space or dash
-            \d{2}              # Fourth part of the phone number (2 digits)
-        )
-    """, re.VERBOSE)
+    list: List slovniku s nalezenymi emaily a telefonni cisly pro kazdou URL adresu (se sinkem prazdny)
+    """
+
+    if scheduler is None:
+        scheduler = create_scheduler()
+    if breaker is None:
+        breaker = HostCircuitBreaker(failure_threshold=BREAKER_FAILURE_THRESHOLD)
+    if SCRAPER_ENGINE == "asyncio":
+        return scrape_urls_async(df, cache=cache, scheduler=scheduler, checkpoint=checkpoint, sink=sink,
+                                 fetch_log=fetch_log, breaker=breaker)
 
     # List to collect data
     data = []
+    # Every page is downloaded and parsed at most once per run, even when several sites link to it
+    page_results = {}
+    page_results_lock = threading.Lock()
+    # Probes never submit further work, a separate pool cannot deadlock with the site workers
+    discovery_executor = ThreadPoolExecutor(max_workers=DISCOVERY_WORKERS) if SITE_DISCOVERY else None
 
-    # Function to scrape a single URL
-    def scrape_website_main_page(url, retries=3, backoff_factor=0.3, page_type='main'):
+    def scrape_page(url):
         """
-        Skriptuje hlavni stranku webu a hleda emaily a telefonni cisla.
+        Vrati vysledek stranky, pri prvnim pozadavku ji stahne a parsuje, dalsi pozadavky cekaji na stejny vysledek.
 
         Parametry:
         url (str): URL adresa k prohledani
-        retries (int): Pocet pokusu pri selhani
-        backoff_factor (float): Faktor pro exponentialni cekani mezi pokusy
-        page_type (str): Typ stranky ('main' nebo 'contact')
 
         Navratova hodnota:
-        tuple: Sada nalezenych emailu, telefonnich cisel, URL adresa a typ stranky
+        tuple: Sada emailu, sada telefonnich cisel, list odkazu na kontaktni stranky, pocet stazenych bajtu
+               a otisk stranky (vystup load_page)
         """
-
-        url = validate_url(url)
-        for attempt in range(retries):
+        with page_results_lock:
+            future = page_results.get(url)
+            is_owner = future is None
+            if is_owner:
+                future = page_results[url] = Future()
+        if is_owner:
             try:
-                # print(url)
-                response = requests.get(url, timeout=10)
-                # Raises an HTTPError if the response status code is 4XX or 5XX
-                response.raise_for_status()
-                soup = BeautifulSoup(response.text, 'html.parser')
-                emails = set(email_regex.findall(soup.text))
-                phones = set(phone_regex.findall(soup.text))
-                return emails, phones, url, page_type
-            except requests.RequestException as e:
-                if attempt < retries - 1:
-                    time.sleep(backoff_factor * (2 ** attempt))
-                else:
-                    return set(), set(), url, page_type
+                future.set_result(load_page(url, cache, scheduler, fetch_log, breaker))
+            except Exception as e:
+                future.set_exception(e)
+        return future.result()
 
     # Function to scrape potential contact pages
-    def scrape_website_contacts(base_url, visited_urls=set(), retries=3, backoff_factor=0.3):
+    def scrape_website_contacts(base_url):
         """
-        Skriptuje potencialni kontaktni stranky webu a hleda emaily a telefonni cisla.
+        Skriptuje hlavni a nejlepe hodnocene kontaktni stranky webu v ramci rozpoctu webu
+        a hleda emaily a telefonni cisla.
 
         Parametry:
         base_url (str): Zakladni URL adresa webu
-        visited_urls (set): Sada navstivenych URL adres
-        retries (int): Pocet pokusu pri selhani
-        backoff_factor (float): Faktor pro exponentialni cekani mezi pokusy
 
         Navratova hodnota:
-        tuple: Sada nalezenych emailu, telefonnich cisel, zakladni URL adresa a kontaktni stranky
+        tuple: Sada nalezenych emailu, telefonnich cisel, slovnik vysledku kontaktnich stranek
+               a zda se podarilo stahnout hlavni stranku
         """
 
-        contact_pages = set()
-        emails = set()
-        phones = set()
-
-        def get_contact_links(soup, base_url):
-            """
-            Najde odkazy na kontaktni stranky v HTML dokumentu.
+        probes = {}
+        sitemap_links = None
+        if discovery_executor is not None:
+            probes = {page: discovery_executor.submit(scrape_page, page)
+                      for page in probe_urls(base_url, DISCOVERY_PATHS) if page != base_url}
+            sitemap_links = discovery_executor.submit(discover_sitemap_links, base_url, scheduler, fetch_log, breaker)
+
+        main_emails, main_phones, links, size, main_fingerprint = scrape_page(base_url)
+        fetched = size is not None
+        emails = set(main_emails)
+        phones = set(main_phones)
+        budget = SiteBudget(SITE_MAX_PAGES, SITE_MAX_BYTES)
+        budget.spend(size)
+        visited = [base_url]
+
+        contact_results = {}
+        for probe, future in probes.items():
+            contact_emails, contact_phones, _, size, fingerprint = future.result()
+            visited.append(probe)
+            # A probed path that does not exist or serves the homepage is not a contact page and costs nothing
+            if size is not None and not is_homepage_echo(fingerprint, main_fingerprint):
+                budget.spend(size)
+                contact_results[probe] = (contact_emails, contact_phones)
+                emails.update(contact_emails)
+                phones.update(contact_phones)
+        if sitemap_links is not None:
+            links = links + sitemap_links.result()
+
+        for _ in range(2 if CONTACT_EXTRA_HOP else 1):
+            contact_pages = next_contact_pages(links, visited, budget, CONTACT_TOP_K)
+            visited.extend(contact_pages)
+            links = []
+            for contact_page in contact_pages:
+                contact_emails, contact_phones, contact_links, size, _ = scrape_page(contact_page)
+                budget.spend(size)
+                contact_results[contact_page] = (contact_emails, contact_phones)
+                emails.update(contact_emails)
+                phones.update(contact_phones)
+                links.extend(contact_links)
 
-            Parametry:
-            soup (BeautifulSoup): Parsovany HTML dokument
-            base_url (str): Zakladni URL adresa webu
+        return emails, phones, contact_results, fetched
 
-            Navratova hodnota:
-            list: List URL adres kontaktovanych stranek
-            """
-
-            links = []
-            for link in soup.find_all('a', href=True):
-                if 'kontakt' in link.text.lower() or 'contact' in link.text.lower() or 'kontakty' in link.text.lower() or 'o nás' in link.text.lower() or 'kdo-jsem' in link.text.lower() or 'o-nas' in link.text.lower():
-                    contact_href = urljoin(base_url, link['href'])
-                    if contact_href not in visited_urls:
-                        links.append(contact_href)
-            return links
-
-        def scrape_page(url, page_type):
-            """
-            Skriptuje stranku a hleda emaily a telefonni cisla.
-
-            Parametry:
-            url (str): URL adresa k prohledani
-            page_type (str): Typ stranky ('main' nebo 'contact')
-
-            Navratova hodnota:
-            tuple: Sada nalezenych emailu, telefonnich cisel, URL adresa a typ stranky
-            """
-
-            if url in visited_urls:
-                return set(), set(), url, page_type
-            visited_urls.add(url)
-
-            for attempt in range(retries):
-                try:
-                    response = requests.get(url, timeout=10)
-                    response.raise_for_status()
-                    soup = BeautifulSoup(response.text, 'html.parser')
-
-                    page_emails = set(email_regex.findall(soup.text))
-                    page_phones = set(phone_regex.findall(soup.text))
-
-                    return page_emails, page_phones, url, page_type
-                except requests.RequestException as e:
-                    if attempt < retries - 1:
-                        time.sleep(backoff_factor * (2 ** attempt))
-                    else:
-                        return set(), set(), url, page_type
-
-        main_emails, main_phones, main_url, main_page_type = scrape_page(
-            base_url, 'main')
-        emails.update(main_emails)
-        phones.update(main_phones)
-        contact_pages.update(get_contact_links(BeautifulSoup(
-            requests.get(base_url).text, 'html.parser'), base_url))
-
-        for contact_page in contact_pages:
-            contact_emails, contact_phones, contact_url, contact_page_type = scrape_page(
-                contact_page, 'contact')
-            emails.update(contact_emails)
-            phones.update(contact_phones)
-
-        return emails, phones, main_url, contact_pages
-
-    # Set of URLs to scrape
-    urls = set(df["web"])
+    # URLs to scrape, neighbouring jobs target different domains
+    urls = interleave_by_domain(set(df["web"]))
 
     # Function to process each URL in parallel
     def process_url(url):
@@ -264,33 +567,8 @@ def scrape_urls(df):
         Navratova hodnota:
         list: List slovniku s nalezenymi emaily a telefonni cisly pro kazdou URL adresu
         """
-        visited_urls = set()
-        all_results = []
-        emails, phones, main_url, contact_pages = scrape_website_contacts(
-            url, visited_urls=visited_urls)
-
-        # Append the main page result
-        all_results.append({
-            'Base Website': url,
-            'Scraped Page': main_url,
-            'Page Type': 'main',
-            'Emails': ', '.join(emails),
-            'Phone Numbers': ', '.join(phones)
-        })
-
-        # Append the contact page results
-        for contact_page in contact_pages:
-            contact_emails, contact_phones, contact_url, contact_page_type = scrape_website_main_page(
-                contact_page, page_type='contact')
-            all_results.append({
-                'Base Website': url,
-                'Scraped Page': contact_url,
-                'Page Type': contact_page_type,
-                'Emails': ', '.join(contact_emails),
-                'Phone Numbers': ', '.join(contact_phones)
-            })
-
-        return all_results
+        emails, phones, contact_results, fetched = scrape_website_contacts(url)
+        return build_rows(url, emails, phones, contact_results, fetched)
 
     # Use ThreadPoolExecutor to scrape URLs in parallel
     with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
@@ -298,13 +576,324 @@ def scrape_urls(df):
         for future in tqdm(as_completed(futures), total=len(futures)):
             try:
                 result = future.result()
-                data.extend(result)
+                if sink is not None:
+                    sink.write(result)
+                else:
+                    data.extend(result)
+                if checkpoint is not None:
+                    checkpoint.append(result)
             except Exception as e:
                 print(f"An error occurred: {e}")
+    if discovery_executor is not None:
+        discovery_executor.shutdown()
 
     return data
 
 
+async def fetch_page_async(session, url, headers=None, scheduler=None, retries=3, backoff_factor=0.3, fetch_log=None,
+                           breaker=None):
+    """
+    Asynchronne stahne stranku, pri selhani opakuje pokus s exponencialnim cekanim.
+
+    Parametry:
+    session (aiohttp.ClientSession | Http2Session): Sdilena HTTP session (create_async_session)
+    url (str): URL adresa ke stazeni
+    headers (dict): Dodatecne hlavicky pozadavku (napr. podminene hlavicky cache)
+    scheduler (DomainScheduler): Planovac pozadavku podle domeny nebo None
+    retries (int): Pocet pokusu pri selhani
+    backoff_factor (float): Faktor pro exponentialni cekani mezi pokusy
+    fetch_log (FetchLog): Log stahovani, jeden radek za vsechny pokusy, nebo None
+    breaker (HostCircuitBreaker): Jistic hostu, kazdy neuspesny pokus se zapocita a dalsi pokusy se po rozpojeni
+                                  neposilaji, nebo None
+
+    Navratova hodnota:
+    tuple: Status, HTML obsah, hlavicky odpovedi, velikost tela v bajtech a URL adresa po presmerovani,
+           nebo None pokud se stranku nepodarilo stahnout
+    """
+    skipped = dead_host_error(url)
+    if skipped is None and breaker is not None:
+        skipped = breaker.open_error(url)
+    if skipped is not None:
+        with track_fetch(fetch_log, url, thread_local=False) as record:
+            set_error(record, skipped)
+        return None
+    with track_fetch(fetch_log, url, thread_local=False) as record:
+        for attempt in range(retries):
+            if record is not None:
+                record['retries'] = attempt
+            if scheduler is not None:
+                await scheduler.acquire_async(url)
+            backoff = False
+            try:
+                # The breaker may have opened while this request waited for its slot or backoff
+                skipped = breaker.open_error(url) if breaker is not None else None
+                if skipped is not None:
+                    set_error(record, skipped)
+                    return None
+                with get_profiler().measure('fetch', cpu=False) as stage:
+                    async with session.get(url, headers=headers, trace_request_ctx=record) as response:
+                        set_status(record, response.status)
+                        if breaker is not None:
+                            breaker.record_success(url)
+                        backoff = response.status in RETRY_STATUS_CODES
+                        # Raises an HTTPError if the response status code is 4XX or 5XX
+                        response.raise_for_status()
+                        content_type = response.headers.get('Content-Type')
+                        if not accepts_content_type(content_type):
+                            raise UnsupportedContentType(content_type)
+                        reader = BodyReader(RESPONSE_MAX_BYTES, header_charset(content_type))
+                        download_start = time.perf_counter()
+                        async for chunk in response.content.iter_chunked(RESPONSE_CHUNK_BYTES):
+                            if not reader.feed(chunk):
+                                break
+                        html = reader.finish()
+                        if record is not None:
+                            record['download_s'] += time.perf_counter() - download_start
+                            record['bytes'] = reader.size
+                        get_body_stats().add(reader)
+                        stage.add_rows(rows_in=1, rows_out=1)
+                        stage.add_bytes(reader.size)
+                        return response.status, html, response.headers, reader.size, str(response.url)
+            except aiohttp.ClientResponseError:
+                # Only throttling and server errors are worth another attempt
+                if not backoff:
+                    return None
+            except UnsupportedContentType as e:
+                set_error(record, e)
+                get_body_stats().add_skipped()
+                return None
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                set_error(record, e)
+                backoff = True
+                # Every attempt counts, concurrent requests to a dead host stop after the breaker opens
+                if breaker is not None:
+                    breaker.record_failure(url, error_category(e))
+            except ValueError as e:
+                set_error(record, e)
+                return None
+            finally:
+                if scheduler is not None:
+                    scheduler.release(url, backoff=backoff)
+            if attempt < retries - 1:
+                await asyncio.sleep(backoff_factor * (2 ** attempt))
+    return None
+
+
+async def scrape_page_async(session, url, cache=None, scheduler=None, fetch_log=None, breaker=None):
+    """
+    Asynchronne stahne a parsuje stranku, se zapnutou cache posle podmineny pozadavek.
+
+    Parametry:
+    session (aiohttp.ClientSession): Sdilena HTTP session
+    url (str): URL adresa k prohledani
+    cache (ResponseCache): Cache odpovedi nebo None
+    scheduler (DomainScheduler): Planovac pozadavku podle domeny nebo None
+    fetch_log (FetchLog): Log stahovani nebo None
+    breaker (HostCircuitBreaker): Jistic hostu nebo None
+
+    Navratova hodnota:
+    tuple: Sada emailu, sada telefonnich cisel, list odkazu na kontaktni stranky, pocet stazenych bajtu
+           (None, pokud se stranku nepodarilo stahnout) a otisk stranky (page_fingerprint) nebo None
+    """
+    entry = cache.get(url) if cache is not None else None
+    response = await fetch_page_async(
+        session, url, headers=ResponseCache.conditional_headers(entry), scheduler=scheduler, fetch_log=fetch_log,
+        breaker=breaker)
+    if response is None:
+        return set(), set(), [], None, None
+    status, html, headers, size, final_url = response
+    if status == 304 and entry is not None:
+        emails, phones, links, fingerprint = cached_result(cache.revalidated(url, entry))
+    else:
+        # Parsing is CPU bound, keep the event loop free for other sites
+        emails, phones, links, fingerprint = await asyncio.to_thread(
+            parse_and_store, url, html, headers, cache, final_url)
+    return emails, phones, links, size, fingerprint
+
+
+async def discover_sitemap_links_async(session, base_url, scheduler=None, fetch_log=None, breaker=None):
+    """
+    Asynchronni varianta discover_sitemap_links.
+
+    Parametry:
+    session (aiohttp.ClientSession): Sdilena HTTP session
+    base_url (str): Zakladni URL adresa webu
+    scheduler (DomainScheduler): Planovac pozadavku podle domeny nebo None
+    fetch_log (FetchLog): Log stahovani nebo None
+    breaker (HostCircuitBreaker): Jistic hostu nebo None
+
+    Navratova hodnota:
+    list: URL adresy kandidatu od nejlepsiho
+    """
+    budget = SiteBudget(1 + SITEMAP_MAX_FILES, DISCOVERY_MAX_BYTES)
+    response = await fetch_page_async(session, urljoin(base_url, '/robots.txt'), scheduler=scheduler,
+                                      fetch_log=fetch_log, breaker=breaker)
+    budget.spend(response[3] if response is not None else None)
+    sitemaps = sitemaps_from_robots(response[1], base_url) if response is not None else []
+    walk = SitemapWalk(sitemaps or [urljoin(base_url, '/sitemap.xml')], budget)
+    while True:
+        sitemap_url = walk.next_sitemap()
+        if sitemap_url is None:
+            break
+        response = await fetch_page_async(session, sitemap_url, scheduler=scheduler, fetch_log=fetch_log,
+                                          breaker=breaker)
+        if response is not None:
+            walk.add(response[1], response[3])
+        else:
+            walk.add(None, None)
+    return sitemap_contact_links(walk.page_urls, base_url)
+
+
+async def process_url_async(session, url, site_limit, page_tasks, cache=None, scheduler=None, fetch_log=None,
+                            breaker=None):
+    """
+    Asynchronne zpracuje URL adresu, skriptuje hlavni a kontaktni stranky a hleda emaily a telefonni cisla.
+
+    Parametry:
+    session (aiohttp.ClientSession): Sdilena HTTP session
+    url (str): URL adresa k prohledani
+    site_limit (asyncio.Semaphore): Omezeni poctu soucasne zpracovavanych webu
+    page_tasks (dict): Ulohy stranek v ramci behu, kazda stranka se stahne jen jednou
+    cache (ResponseCache): Cache odpovedi nebo None
+    scheduler (DomainScheduler): Planovac pozadavku podle domeny nebo None
+    fetch_log (FetchLog): Log stahovani nebo None
+    breaker (HostCircuitBreaker): Jistic hostu nebo None
+
+    Navratova hodnota:
+    list: List slovniku s nalezenymi emaily a telefonni cisly, stejny jako u vlaknoveho enginu
+    """
+    def scrape_page(page_url):
+        if page_url not in page_tasks:
+            page_tasks[page_url] = asyncio.ensure_future(
+                scrape_page_async(session, page_url, cache, scheduler, fetch_log, breaker))
+        return page_tasks[page_url]
+
+    contact_results = {}
+    async with site_limit:
+        probes = []
+        sitemap_task = None
+        if SITE_DISCOVERY:
+            probes = [page for page in probe_urls(url, DISCOVERY_PATHS) if page != url]
+            sitemap_task = asyncio.ensure_future(
+                discover_sitemap_links_async(session, url, scheduler, fetch_log, breaker))
+        (main_emails, main_phones, links, size, main_fingerprint), *probe_results = await asyncio.gather(
+            scrape_page(url), *(scrape_page(probe) for probe in probes))
+        fetched = size is not None
+        emails = set(main_emails)
+        phones = set(main_phones)
+        budget = SiteBudget(SITE_MAX_PAGES, SITE_MAX_BYTES)
+        budget.spend(size)
+        visited = [url]
+        for probe, (contact_emails, contact_phones, _, size, fingerprint) in zip(probes, probe_results):
+            visited.append(probe)
+            # A probed path that does not exist or serves the homepage is not a contact page and costs nothing
+            if size is not None and not is_homepage_echo(fingerprint, main_fingerprint):
+                budget.spend(size)
+                contact_results[probe] = (contact_emails, contact_phones)
+                emails.update(contact_emails)
+                phones.update(contact_phones)
+        if sitemap_task is not None:
+            links = links + await sitemap_task
+        # Pages of one level are fetched concurrently, the budget is checked between levels as in the thread engine
+        for _ in range(2 if CONTACT_EXTRA_HOP else 1):
+            contact_pages = next_contact_pages(links, visited, budget, CONTACT_TOP_K)
+            visited.extend(contact_pages)
+            pages = await asyncio.gather(*(scrape_page(contact_page) for contact_page in contact_pages))
+            links = []
+            for contact_page, (contact_emails, contact_phones, contact_links, size, _) in zip(contact_pages, pages):
+                budget.spend(size)
+                contact_results[contact_page] = (contact_emails, contact_phones)
+                emails.update(contact_emails)
+                phones.update(contact_phones)
+                links.extend(contact_links)
+    return build_rows(url, emails, phones, contact_results, fetched)
+
+
+def create_async_session(fetch_log=None):
+    """
+    Vytvori sdilenou HTTP session asyncio enginu: aiohttp (HTTP/1.1 s keep-alive, nejvyse ASYNC_MAX_PER_HOST
+    spojeni na host), nebo s HTTP2 httpx, ktere pozadavky na jeden host multiplexuje jednim HTTP/2 spojenim.
+
+    Parametry:
+    fetch_log (FetchLog): Log stahovani, zapne trasovani pozadavku, nebo None
+
+    Navratova hodnota:
+    aiohttp.ClientSession | Http2Session: Session, pouziva se jako async context manager
+    """
+    if HTTP2:
+        return Http2Session(timeout=REQUEST_TIMEOUT, max_connections=ASYNC_MAX_CONNECTIONS,
+                            prior_knowledge=HTTP2_PRIOR_KNOWLEDGE)
+    dns_cache = get_dns_cache()
+    # With the process-wide DNS cache the connector's own 10 s cache would only shadow its TTLs
+    resolver_options = {'resolver': CachedResolver(dns_cache), 'use_dns_cache': False} if dns_cache is not None else {}
+    connector = aiohttp.TCPConnector(
+        limit=ASYNC_MAX_CONNECTIONS, limit_per_host=ASYNC_MAX_PER_HOST, **resolver_options)
+    timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+    trace_configs = [create_trace_config()] if fetch_log is not None else None
+    return aiohttp.ClientSession(connector=connector, timeout=timeout, trace_configs=trace_configs)
+
+
+async def crawl_async(urls, cache=None, scheduler=None, checkpoint=None, sink=None, fetch_log=None, breaker=None):
+    """
+    Asynchronne projde vsechny URL adresy nad jednim poolem spojeni s limitem spojeni na host.
+
+    Parametry:
+    urls (list): URL adresy k prohledani
+    cache (ResponseCache): Cache odpovedi nebo None
+    scheduler (DomainScheduler): Planovac pozadavku podle domeny nebo None
+    checkpoint (ScrapeCheckpoint): Checkpoint dokoncenych webu nebo None
+    sink (ResultSink): Sink pro prubezny zapis radku nebo None
+    fetch_log (FetchLog): Log stahovani, zapne trasovani pozadavku, nebo None
+    breaker (HostCircuitBreaker): Jistic hostu nebo None
+
+    Navratova hodnota:
+    list: List slovniku s nalezenymi emaily a telefonni cisly pro kazdou URL adresu (se sinkem prazdny)
+    """
+    data = []
+    page_tasks = {}
+    site_limit = asyncio.Semaphore(ASYNC_MAX_SITES)
+    async with create_async_session(fetch_log) as session:
+        tasks = [asyncio.ensure_future(process_url_async(session, url, site_limit, page_tasks, cache, scheduler,
+                                                         fetch_log, breaker))
+                 for url in urls]
+        for future in tqdm(asyncio.as_completed(tasks), total=len(tasks)):
+            try:
+                result = await future
+                if sink is not None:
+                    sink.write(result)
+                else:
+                    data.extend(result)
+                if checkpoint is not None:
+                    checkpoint.append(result)
+            except Exception as e:
+                print(f"An error occurred: {e}")
+    return data
+
+
+def scrape_urls_async(df, cache=None, scheduler=None, checkpoint=None, sink=None, fetch_log=None, breaker=None):
+    """
+    Alternativni asyncio engine pro scrape_urls, vraci stejne radky jako vlaknovy engine.
+
+    Parametry:
+    df (pd.DataFrame): DataFrame obsahujici URL adresy k prohledavani
+    cache (ResponseCache): Cache odpovedi nebo None
+    scheduler (DomainScheduler): Planovac pozadavku podle domeny nebo None
+    checkpoint (ScrapeCheckpoint): Checkpoint dokoncenych webu nebo None
+    sink (ResultSink): Sink pro prubezny zapis radku nebo None
+    fetch_log (FetchLog): Log stahovani nebo None
+    breaker (HostCircuitBreaker): Jistic hostu nebo None
+
+    Navratova hodnota:
+    list: List slovniku s nalezenymi emaily a telefonni cisly pro kazdou URL adresu (se sinkem prazdny)
+    """
+    if aiohttp is None:
+        raise ImportError(
+            "SCRAPER_ENGINE 'asyncio' requires the aiohttp package")
+    urls = interleave_by_domain(set(df["web"]))
+    return asyncio.run(crawl_async(urls, cache=cache, scheduler=scheduler, checkpoint=checkpoint, sink=sink,
+                                   fetch_log=fetch_log, breaker=breaker))
+
+
 def check_empty_or_nan(value):
     """
     Overi, zda je hodnota prazdna nebo NaN.
@@ -318,57 +907,100 @@ def check_empty_or_nan(value):
     return pd.isna(value) or value == {} or value == [] or value == ''
 
 
-def process_data(max_iterations=0):
+def open_response_cache():
+    """
+    Otevre perzistentni cache odpovedi, pri prvnim behu ji prevezme ze vstupniho mapovani souboru.
+
+    Navratova hodnota:
+    ResponseCache: Otevrena cache, nebo None pokud je cache vypnuta
+    """
+    if RESPONSE_CACHE_PATH is None:
+        return None
+    os.makedirs(os.path.dirname(RESPONSE_CACHE_PATH), exist_ok=True)
+    if not os.path.exists(RESPONSE_CACHE_PATH) and RESPONSE_CACHE_INPUT_PATH and os.path.exists(RESPONSE_CACHE_INPUT_PATH):
+        shutil.copy(RESPONSE_CACHE_INPUT_PATH, RESPONSE_CACHE_PATH)
+    return ResponseCache(RESPONSE_CACHE_PATH, ttl_seconds=RESPONSE_CACHE_TTL, max_bytes=RESPONSE_CACHE_MAX_BYTES)
+
+
+def process_data(max_iterations=0, incremental=INCREMENTAL_SCRAPE, resume=False, sink=None, fetch_log=None):
     """
     Zpracuje data, skriptuje URL adresy a opakovane kontroluje chybejici data.
 
     Parametry:
     max_iterations (int): Maximalni pocet opakovani pri hledani chybejicich dat
+    incremental (bool): Pokud je True, skriptuji se jen nove, nestazene nebo zastarale weby
+                        a vysledky se sloucuji s predchozim df_scraped.csv
+    resume (bool): Pokud je True, weby dokoncene v checkpointu preruseneho behu se preskoci
+    sink (ResultSink): Sink, do ktereho se vysledky prubezne zapisuji, None je drzi v pameti
+    fetch_log (FetchLog): Log stahovani jednotlivych stranek, na konci se vypise jeho souhrn, nebo None
 
     Navratova hodnota:
-    pd.DataFrame: DataFrame s nalezenymi daty po skriptovani
+    pd.DataFrame: DataFrame s nalezenymi daty po skriptovani, u souboroveho sinku pocet zapsanych radku
     """
-    df = data_prep(subset=False)
-    scraped_dfs = []
-
-    df_split = np.array_split(df, 4)
-
-    for df_part in tqdm(df_split):
-        result = scrape_urls(df_part)
-        scraped_data = pd.DataFrame(result)
-        scraped_dfs.append(scraped_data)
+    if sink is None:
+        sink = ResultSink(RESULT_COLUMNS)
+    profiler = get_profiler()
+    with profiler.stage('data_prep') as stage:
+        df, url_map = data_prep(subset=False)
+        stage.add_rows(rows_in=url_map['source_row'].nunique(), rows_out=len(df))
+    if os.path.dirname(URL_MAP_PATH):
+        os.makedirs(os.path.dirname(URL_MAP_PATH), exist_ok=True)
+    url_map.to_csv(URL_MAP_PATH, index=False)
+    print(f"URL frontier: {len(df)} websites for {url_map['source_row'].nunique()} source rows ({len(url_map)} URL variants)")
+    now = datetime.datetime.now()
+    current_websites = set(df['web'])
+    if incremental:
+        state = load_scrape_state(SCRAPE_STATE_INPUT_PATH, PREVIOUS_SCRAPED_PATH)
+        df = select_websites_to_scrape(df, state, SCRAPE_MAX_AGE_DAYS, now)
+        if not state.empty:
+            # Rows of websites scraped again below are superseded by the sink
+            for previous in iter_result_chunks(PREVIOUS_SCRAPED_PATH, dtype=str, keep_default_na=False):
+                sink.write_previous(previous[previous['Base Website'].isin(current_websites)])
+    checkpoint = ScrapeCheckpoint(CHECKPOINT_PATH)
+    if resume:
+        completed = checkpoint.load()
+        print(f"Resuming: {len(completed)} websites already completed")
+        for rows in completed.values():
+            sink.write(rows)
+        df = df[~df['web'].isin(completed)]
+    else:
+        checkpoint.reset()
+    cache = open_response_cache()
+    scheduler = create_scheduler()
+    # Shared by all iterations, a host given up in the first pass is not retried for missing data
+    breaker = HostCircuitBreaker(failure_threshold=BREAKER_FAILURE_THRESHOLD)
+    body_stats = BodyStats()
+    set_body_stats(body_stats)
+    dns_cache = None
+    if DNS_CACHE:
+        dns_cache = DNSCache(default_ttl=DNS_DEFAULT_TTL, negative_ttl=DNS_NEGATIVE_TTL)
+        set_dns_cache(dns_cache)
+        with profiler.stage('dns_prefetch') as stage:
+            dns_counts = dns_cache.prefetch(df['web'].map(host_of), max_workers=DNS_PREFETCH_WORKERS)
+            stage.add_rows(rows_in=sum(dns_counts.values()), rows_out=dns_counts['resolved'])
+        print(
+            f"DNS prefetch: {dns_counts['resolved']} hosts resolved, {dns_counts['dead']} dead (skipped), {dns_counts['failed']} failed lookups")
 
-    result_scraper = pd.concat(scraped_dfs).reset_index(drop=True)
+    # One global queue for the whole frame, rows are streamed to the sink as websites complete
+    with profiler.stage('scrape') as stage:
+        scrape_urls(df, cache=cache, scheduler=scheduler,
+                    checkpoint=checkpoint, sink=sink, fetch_log=fetch_log, breaker=breaker)
+        stage.add_rows(rows_in=df['web'].nunique(), rows_out=len(sink.summaries))
 
-    missing_data = result_scraper[
-        result_scraper["Emails"].apply(check_empty_or_nan) |
-        result_scraper["Phone Numbers"].apply(check_empty_or_nan)
-    ]["Base Website"]
+    missing_data = sink.missing_websites()
 
     iterations = 0
     while len(missing_data) > 0 and iterations < max_iterations:
         print(
             f"Iteration {iterations + 1}: Found {len(missing_data)} websites with missing data. Scraping again.")
-        set_not_found = list(set(missing_data))
-        df = pd.DataFrame({"web": set_not_found})
-
-        missing_scraped_dfs = []
-        df_split = np.array_split(df, 4)
-        for df_part in tqdm(df_split):
-            result = scrape_urls(df_part)
-            scraped_data = pd.DataFrame(result)
-            missing_scraped_dfs.append(scraped_data)
-
-        new_scraped_data = pd.concat(
-            missing_scraped_dfs).reset_index(drop=True)
+        df = pd.DataFrame({"web": missing_data})
 
-        result_scraper = result_scraper.reset_index(drop=True)
-        result_scraper.update(new_scraped_data)
+        # A repeated write of a website replaces its earlier rows in the sink
+        with profiler.stage('scrape') as stage:
+            scrape_urls(df, cache=cache, scheduler=scheduler, sink=sink, fetch_log=fetch_log, breaker=breaker)
+            stage.add_rows(rows_in=len(df))
 
-        missing_data = result_scraper[
-            result_scraper["Emails"].apply(check_empty_or_nan) |
-            result_scraper["Phone Numbers"].apply(check_empty_or_nan)
-        ]["Base Website"]
+        missing_data = sink.missing_websites()
 
         iterations += 1
 
@@ -378,41 +1010,48 @@ def process_data(max_iterations=0):
     else:
         print("Scraping complete. No missing emails or phone numbers.")
 
-    return result_scraper
+    print(f"Domain scheduler backed off {scheduler.backoffs} times")
+    body_counts = body_stats.stats()
+    print(
+        f"Response bodies: {body_counts['complete']} complete, {body_counts['truncated']} truncated at {RESPONSE_MAX_BYTES} bytes, {body_counts['skipped_content_type']} skipped (not HTML), {body_counts['bytes'] / 1024 / 1024:.1f} MB read")
+    breaker_stats = breaker.stats()
+    print(
+        f"Circuit breaker: {breaker_stats['open']} hosts unreachable, {breaker_stats['failing']} failing, {breaker_stats['short_circuited']} requests short-circuited")
+    unreachable = pd.DataFrame(breaker.unreachable_hosts(), columns=['host', 'failures', 'reason'])
+    if not unreachable.empty:
+        print(f"Unreachable hosts:\n{unreachable.head(20).to_string(index=False)}")
+    if cache is not None:
+        cache_stats = cache.stats()
+        cache.close()
+        print(
+            f"Response cache: {cache_stats['hits']} hits (304), {cache_stats['misses']} misses, {cache_stats['evictions']} evictions, {cache_stats['entries']} entries")
+    if dns_cache is not None:
+        dns_stats = dns_cache.stats()
+        set_dns_cache(None)
+        print(
+            f"DNS cache: {dns_stats['hits']} hits, {dns_stats['misses']} misses, {dns_stats['entries']} hosts, {dns_stats['dead']} dead")
+    if fetch_log is not None:
+        slowest_hosts, failures = summarize_fetch_log(fetch_log.close())
+        print(f"Fetches by outcome:\n{failures.to_string()}")
+        print(f"Slowest hosts:\n{slowest_hosts.round(3).to_string()}")
+
+    if incremental:
+        state = update_scrape_state(
+            state, sink.website_summaries(), current_websites, now)
+        state.to_csv(SCRAPE_STATE_PATH, index=False)
+
+    with profiler.stage('output') as stage:
+        result = sink.close()
+        stage.rows_out = result if isinstance(result, int) else len(result)
+    return result
 
 
 ###
 # Phones Part
 ###
-def py_parse_phonenumber(num):
-    """
-    Analyzuje telefonni cislo a vraci informace o jeho formatu, platnosti a moznosti.
-
-    Parametry:
-    num (str): Telefonni cislo k analyzovani
-
-    Navratova hodnota:
-    dict: Slovnik s informacemi o telefonni cislo
-    """
-    try:
-        parsed_num = phonenumbers.parse(num, 'CZ')
-        phonenumbers.is_possible_number_with_reason(parsed_num)
-        return {
-            'formated_number': phonenumbers.format_number(parsed_num, phonenumbers.PhoneNumberFormat.E164),
-            'number': parsed_num.national_number,
-            'prefix': parsed_num.country_code,
-            'country_code': phonenumbers.region_code_for_number(parsed_num),
-            'valid': phonenumbers.is_valid_number(parsed_num),
-            'possible': phonenumbers.is_possible_number(parsed_num),
-            'parsed': True
-        }
-    except Exception as e:
-        return {'number': num, 'prefix': None, 'country_code': None, 'valid': False, 'possible': False, 'parsed': False}
-
-
 def udf(df: pd.DataFrame, column_name: str):
     """
-    Pouziva funkci py_parse_phonenumber na DataFrame sloupec a vraci novy DataFrame s analyzovanymi cisly.
+    Davkove analyzuje telefonni cisla ve sloupci DataFrame (normalize_phones) a vraci DataFrame s analyzovanymi cisly.
 
     Parametry:
     df (pd.DataFrame): DataFrame obsahujici telefonni cisla
@@ -421,9 +1060,7 @@ def udf(df: pd.DataFrame, column_name: str):
     Navratova hodnota:
     pd.DataFrame: DataFrame s analyzovanymi telefonni cisly
     """
-    results = df[column_name].apply(py_parse_phonenumber)
-    parsed_df = pd.DataFrame(results.tolist())
-    return parsed_df
+    return normalize_phones(df[column_name])
 
 
 def explode_df(df: pd.DataFrame, column_name: str, web_column="Base Website", scraped_web_column="Scraped Page") -> pd.DataFrame:
@@ -495,35 +1132,6 @@ def clean_scraped_phones(df: pd.DataFrame, phone_scraped_column="Phone Numbers",
 # Emails Part
 
 
-def clean_email(email):
-    """
-    Cisti a formatuje emailove adresy.
-
-    Parametry:
-    email (str): Emailova adresa k cisteni
-
-    Navratova hodnota:
-    str: Cistena a formatovana emailova adresa
-    """
-    if pd.isna(email):
-        return email
-    # Regular expression to find valid email addresses
-    email_pattern = re.compile(
-        r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,7}\b')
-    # Find all valid email addresses in the string and convert them to lowercase
-    valid_emails = [e.lower() for e in email_pattern.findall(email)]
-    # Fix emails that have additional symbols after specified domains
-    domains = ['.cz', '.com', '.eu', '.org']
-    cleaned_emails = []
-    for email in valid_emails:
-        for domain in domains:
-            if email.endswith(domain):
-                email = re.sub(f'{domain}.*', domain, email)
-                break
-        cleaned_emails.append(email)
-    return ', '.join(cleaned_emails)
-
-
 def clean_scraped_emails(df: pd.DataFrame, email_scraped_column="Emails", web_column="Base Website") -> pd.DataFrame:
     """
     Cisti a formatuje emailove adresy nalezene pri skriptovani.
@@ -568,8 +1176,32 @@ def main():
     """
     Hlavni funkce pro zpracovani a skriptovani dat. Vysledky uklada do CSV souboru.
     """
-    result_scraper = process_data()
-    result_scraper.to_csv(f'out/tables/df_scraped.csv', index=False)
-
-
-main()
+    parser = argparse.ArgumentParser(description="Skriptovani kontaktu z webu db_pomoci.")
+    parser.add_argument("--resume", action="store_true",
+                        help="pokracovat v prerusenem behu a preskocit weby dokoncene v checkpointu "
+                             "(jen lokalne, vystupy preruseneho jobu Keboola se neukladaji)")
+    parser.add_argument("--profile", action="store_true", default=PROFILE_CPROFILE,
+                        help="ulozit cProfile kazde faze do PROFILE_DUMP_DIR")
+    parser.add_argument("--trace-memory", action="store_true", default=PROFILE_TRACEMALLOC,
+                        help="merit spicku alokaci kazde faze pres tracemalloc")
+    args = parser.parse_args()
+
+    profiler = PipelineProfiler(use_cprofile=args.profile, use_tracemalloc=args.trace_memory,
+                                dump_dir=PROFILE_DUMP_DIR)
+    set_profiler(profiler)
+    if not PARQUET_AVAILABLE:
+        print("pyarrow is not installed, skipping the Parquet output")
+    if DNS_CACHE and not DNS_TTL_AVAILABLE:
+        print(f"dnspython is not installed, DNS cache entries use a fixed TTL of {DNS_DEFAULT_TTL} s")
+    sink = FileResultSink(RESULT_COLUMNS, SCRAPED_OUTPUT_PATH,
+                          parquet_path=SCRAPED_PARQUET_PATH if PARQUET_AVAILABLE else None)
+    fetch_log = FetchLog(FETCH_LOG_PATH)
+    rows_written = process_data(resume=args.resume, sink=sink, fetch_log=fetch_log)
+    print(f"Written {rows_written} rows to {SCRAPED_OUTPUT_PATH}")
+    ScrapeCheckpoint(CHECKPOINT_PATH).remove()
+    report = profiler.write_report(PROFILE_REPORT_PATH, engine=SCRAPER_ENGINE, parser=PARSER_BACKEND)
+    print(report.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,8 @@ import time
 import datetime
 import os
 
+from keboola.contact_extractor import extract_contacts, clean_email
+
 RUN_EVIRONMENT = "kagle"
 
 if RUN_EVIRONMENT == "local":
@@ -74,24 +76,6 @@ def data_prep(subset:bool = False) -> pd.DataFrame:
 
 
 def scrape_urls(df):    
-    email_regex = re.compile(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}")
-    # Phone regex V2
-    phone_regex = re.compile(r"""
-        (?:
-            \+420[-\s]?        # Optional country code +420 followed by an optional space or dash
-        )?
-        (?:
-            \d{3}[-\s]?        # First part of the phone number (3 digits) followed by an optional space or dash
-            \d{3}[-\s]?        # Second part of the phone number (3 digits) followed by an optional space or dash
-            \d{3}              # Third part of the phone number (3 digits)
-            |                  # OR
-            \d{3}[-\s]?        # First part of the phone number (3 digits) followed by an optional space or dash
-            \d{2}[-\s]?        # Second part of the phone number (2 digits) followed by an optional space or dash
-            \d{2}[-\s]?        # Third part of the phone number (2 digits) followed by an optional space or dash
-            \d{2}              # Fourth part of the phone number (2 digits)
-        )
-    """, re.VERBOSE)
-
     # List to collect data
     data = []
 
@@ -103,8 +87,7 @@ def scrape_urls(df):
                 response = requests.get(url, timeout=10)
                 response.raise_for_status()  # Raises an HTTPError if the response status code is 4XX or 5XX
                 soup = BeautifulSoup(response.text, 'html.parser')
-                emails = set(email_regex.findall(soup.text))
-                phones = set(phone_regex.findall(soup.text))
+                emails, phones = extract_contacts(soup.text)
                 return emails, phones, url, page_type
             except requests.RequestException as e:
                 if attempt < retries - 1:
@@ -138,8 +121,7 @@ def scrape_urls(df):
                     response.raise_for_status()
                     soup = BeautifulSoup(response.text, 'html.parser')
 
-                    page_emails = set(email_regex.findall(soup.text))
-                    page_phones = set(phone_regex.findall(soup.text))
+                    page_emails, page_phones = extract_contacts(soup.text)
 
                     return page_emails, page_phones, url, page_type
                 except requests.RequestException as e:
@@ -320,24 +302,6 @@ def clean_scraped_phones(df: pd.DataFrame, phone_scraped_column = "Phone Numbers
     return phones_df
 
 # Emails Part 
-def clean_email(email):
-    if pd.isna(email):
-        return email
-    # Regular expression to find valid email addresses
-    email_pattern = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,7}\b')
-    # Find all valid email addresses in the string and convert them to lowercase
-    valid_emails = [e.lower() for e in email_pattern.findall(email)]
-    # Fix emails that have additional symbols after specified domains
-    domains = ['.cz', '.com', '.eu', '.org']
-    cleaned_emails = []
-    for email in valid_emails:
-        for domain in domains:
-            if email.endswith(domain):
-                email = re.sub(f'{domain}.*', domain, email)
-                break
-        cleaned_emails.append(email)
-    return ', '.join(cleaned_emails)
-
 def clean_scraped_emails(df: pd.DataFrame, email_scraped_column = "Emails", web_column = "Base Website") -> pd.DataFrame:
     emails_exp = explode_df(df,email_scraped_column)
     emails_exp[f'{email_scraped_column}_scraped'] = emails_exp[f'{email_scraped_column}_scraped'].apply(clean_email)
@@ -1,4 +1,3 @@
-import re
 import requests
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin
@@ -7,25 +6,9 @@ import pandas as pd
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import time
 
-def scrape_urls(df):    
-    email_regex = re.compile(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}")
-    # Phone regex V2
-    phone_regex = re.compile(r"""
-        (?:
-            \+420[-\s]?        # Optional country code +420 followed by an optional space or dash
-        )?
-        (?:
-            \d{3}[-\s]?        # First part of the phone number (3 digits) followed by an optional space or dash
-            \d{3}[-\s]?        # Second part of the phone number (3 digits) followed by an optional space or dash
-            \d{3}              # Third part of the phone number (3 digits)
-            |                  # OR
-            \d{3}[-\s]?        # First part of the phone number (3 digits) followed by an optional space or dash
-            \d{2}[-\s]?        # Second part of the phone number (2 digits) followed by an optional space or dash
-            \d{2}[-\s]?        # Third part of the phone number (2 digits) followed by an optional space or dash
-            \d{2}              # Fourth part of the phone number (2 digits)
-        )
-    """, re.VERBOSE)
+from keboola.contact_extractor import extract_contacts
 
+def scrape_urls(df):    
     # List to collect data
     data = []
 
@@ -37,8 +20,7 @@ def scrape_urls(df):
                 response = requests.get(url, timeout=10)
                 response.raise_for_status()  # Raises an HTTPError if the response status code is 4XX or 5XX
                 soup = BeautifulSoup(response.text, 'html.parser')
-                emails = set(email_regex.findall(soup.text))
-                phones = set(phone_regex.findall(soup.text))
+                emails, phones = extract_contacts(soup.text)
                 return emails, phones, url, page_type
             except requests.RequestException as e:
                 if attempt < retries - 1:
@@ -72,8 +54,7 @@ def scrape_urls(df):
                     response.raise_for_status()
                     soup = BeautifulSoup(response.text, 'html.parser')
 
-                    page_emails = set(email_regex.findall(soup.text))
-                    page_phones = set(phone_regex.findall(soup.text))
+                    page_emails, page_phones = extract_contacts(soup.text)
 
                     return page_emails, page_phones, url, page_type
                 except requests.RequestException as e:
@@ -1,7 +1,15 @@
+import os
+import sys
 import pandas as pd
-import requests
 import re
 
+# The shared HTTP layer lives with the pipeline modules in keboola/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'keboola'))
+from http_client import get_session  # noqa: E402
+
+# One keep-alive session for all RUIAN calls, retries 429/5xx and connection errors with backoff
+session = get_session('ruian')
+
 # Load your data
 file_path = '/content/drive/MyDrive/maps_results.xlsx'
 df = pd.read_excel(file_path, sheet_name='Sheet1')
@@ -61,7 +69,7 @@ def get_standardized_address(row):
         "street": row['Street']
     }
 
-    response = requests.get(base_url, params=params)
+    response = session.get(base_url, params=params, timeout=10)
     if response.status_code == 200:
         data = response.json()
         if data['status'] in ["POSSIBLE", "MATCH"]:
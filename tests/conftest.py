@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The pipeline modules import each other by plain name, as when the scripts run from keboola/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'keboola'))
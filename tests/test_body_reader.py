@@ -0,0 +1,93 @@
+import pytest
+
+from body_reader import SNIFF_BYTES, BodyReader, BodyStats, header_charset, known_encoding, sniff_charset
+
+
+def read(chunks, max_bytes=10 ** 6, declared_charset=None):
+    reader = BodyReader(max_bytes, declared_charset)
+    for chunk in chunks:
+        if not reader.feed(chunk):
+            break
+    return reader, reader.finish()
+
+
+@pytest.mark.parametrize('content_type, charset', [
+    ('text/html; charset=windows-1250', 'windows-1250'),
+    ('text/html;Charset="ISO-8859-2"', 'ISO-8859-2'),
+    ('text/html; boundary=x; charset=', None),
+    ('text/html', None),
+    (None, None),
+])
+def test_header_charset(content_type, charset):
+    assert header_charset(content_type) == charset
+
+
+@pytest.mark.parametrize('name, encoding', [
+    ('UTF8', 'utf-8'),
+    (b'windows-1250', 'cp1250'),
+    ('x-neznamy', None),
+    (None, None),
+])
+def test_known_encoding(name, encoding):
+    assert known_encoding(name) == encoding
+
+
+def test_header_charset_decodes_the_body():
+    text = '<html><body>Příliš žluťoučký kůň</body></html>'
+    reader, body = read([text.encode('cp1250')], declared_charset='windows-1250')
+    assert body == text
+    assert (reader.encoding, reader.size, reader.truncated) == ('cp1250', len(text), False)
+
+
+def test_meta_charset_decodes_the_body_across_chunks():
+    text = '<html><head><meta charset="iso-8859-2"></head><body>' + 'Kontakt: Čížková ' * 100 + '</body></html>'
+    data = text.encode('iso-8859-2')
+    # Decoding starts once SNIFF_BYTES are buffered, later chunks are decoded as they come
+    reader, body = read([data[start:start + 100] for start in range(0, len(data), 100)])
+    assert len(data) > SNIFF_BYTES
+    assert body == text
+    assert reader.encoding == 'iso8859-2'
+
+
+def test_header_charset_wins_over_meta():
+    html = '<meta http-equiv="Content-Type" content="text/html; charset=iso-8859-2"><p>čaj</p>'
+    reader, body = read([html.encode('utf-8')], declared_charset='utf-8')
+    assert body == html
+
+
+def test_unknown_charset_falls_back_to_meta_and_utf8():
+    html = '<meta charset="windows-1250"><p>čaj</p>'
+    assert read([html.encode('cp1250')], declared_charset='x-neznamy')[1] == html
+    # Neither charset is known, legacy bytes decode as UTF-8 with replacement characters
+    reader, body = read(['<meta charset="x-neznamy"><p>čaj</p>'.encode('cp1250')], declared_charset='x-neznamy')
+    assert reader.encoding == 'utf-8'
+    assert body == '<meta charset="x-neznamy"><p>�aj</p>'
+    assert sniff_charset(b'\xef\xbb\xbf<p>a</p>', 'windows-1250') == 'utf-8-sig'
+
+
+def test_truncated_body_drops_the_cut_character_and_tag():
+    html = '<p>Kontakt: Čížková</p><img src="data:image/png;base64,AAAA">'
+    data = html.encode('utf-8')
+    cut = data.index('í'.encode('utf-8')) + 1
+    reader, body = read([data[:10], data[10:]], max_bytes=cut)
+    assert body == '<p>Kontakt: Č'
+    assert (reader.size, reader.truncated) == (cut, True)
+    # A tag cut in half is dropped as well
+    cut = data.index(b'base64')
+    reader, body = read([data], max_bytes=cut)
+    assert body == '<p>Kontakt: Čížková</p>'
+
+
+def test_feed_stops_at_the_limit():
+    reader = BodyReader(5)
+    assert reader.feed(b'abc')
+    assert not reader.feed(b'defgh')
+    assert reader.finish() == 'abcde'
+
+
+def test_body_stats():
+    stats = BodyStats()
+    stats.add(read([b'<p>a</p>'])[0])
+    stats.add(read([b'<p>abcdef</p>'], max_bytes=4)[0])
+    stats.add_skipped()
+    assert stats.stats() == {'complete': 1, 'truncated': 1, 'skipped_content_type': 1, 'bytes': 12}
@@ -0,0 +1,49 @@
+import json
+
+from checkpoint import ScrapeCheckpoint
+
+
+def rows(website, email):
+    return [{'Base Website': website, 'Scraped Page': website, 'Emails': email}]
+
+
+def test_append_and_load_round_trip(tmp_path):
+    checkpoint = ScrapeCheckpoint(str(tmp_path / 'checkpoint.jsonl'))
+    checkpoint.reset()
+    checkpoint.append(rows('https://a.cz/', 'info@a.cz'))
+    checkpoint.append(rows('https://b.cz/', 'info@b.cz'))
+    checkpoint.append([])
+    completed = checkpoint.load()
+    assert list(completed) == ['https://a.cz/', 'https://b.cz/']
+    assert completed['https://b.cz/'] == rows('https://b.cz/', 'info@b.cz')
+
+
+def test_resume_skips_truncated_last_line(tmp_path):
+    path = tmp_path / 'checkpoint.jsonl'
+    checkpoint = ScrapeCheckpoint(str(path))
+    checkpoint.reset()
+    checkpoint.append(rows('https://a.cz/', 'info@a.cz'))
+    # The run was killed in the middle of writing the second website
+    line = json.dumps({'url': 'https://b.cz/', 'rows': rows('https://b.cz/', 'info@b.cz')})
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(line[:len(line) // 2])
+    assert list(checkpoint.load()) == ['https://a.cz/']
+    # A resumed run appends after the broken line and both websites load again
+    checkpoint.append(rows('https://c.cz/', 'info@c.cz'))
+    assert list(ScrapeCheckpoint(str(path)).load()) == ['https://a.cz/', 'https://c.cz/']
+
+
+def test_load_without_file_is_empty(tmp_path):
+    assert ScrapeCheckpoint(str(tmp_path / 'missing.jsonl')).load() == {}
+
+
+def test_reset_and_remove(tmp_path):
+    path = tmp_path / 'out' / 'checkpoint.jsonl'
+    checkpoint = ScrapeCheckpoint(str(path))
+    checkpoint.reset()
+    checkpoint.append(rows('https://a.cz/', 'info@a.cz'))
+    checkpoint.reset()
+    assert checkpoint.load() == {}
+    checkpoint.remove()
+    assert not path.exists()
+
@@ -0,0 +1,51 @@
+from circuit_breaker import CircuitOpenError, HostCircuitBreaker
+
+
+def test_opens_after_threshold_of_consecutive_failures():
+    breaker = HostCircuitBreaker(failure_threshold=3)
+    breaker.record_failure('https://www.spolek.cz/', 'timeout')
+    breaker.record_failure('https://spolek.cz/kontakt', 'timeout')
+    assert not breaker.is_open('https://spolek.cz/')
+    assert breaker.stats() == {'open': 0, 'failing': 1, 'short_circuited': 0}
+    breaker.record_failure('https://spolek.cz/o-nas', 'connect')
+    # www. and the path do not matter, the host is one
+    assert breaker.is_open('https://www.spolek.cz/kontakt')
+    assert not breaker.is_open('https://jiny-web.cz/')
+
+
+def test_success_resets_the_failure_count():
+    breaker = HostCircuitBreaker(failure_threshold=2)
+    breaker.record_failure('https://spolek.cz/', 'timeout')
+    breaker.record_success('https://spolek.cz/')
+    breaker.record_failure('https://spolek.cz/', 'timeout')
+    assert not breaker.is_open('https://spolek.cz/')
+    breaker.record_failure('https://spolek.cz/', 'timeout')
+    assert breaker.is_open('https://spolek.cz/')
+    # An open breaker stays open until the end of the run
+    breaker.record_success('https://spolek.cz/')
+    assert breaker.is_open('https://spolek.cz/')
+
+
+def test_open_breaker_short_circuits_requests():
+    breaker = HostCircuitBreaker(failure_threshold=1)
+    assert breaker.open_error('https://spolek.cz/') is None
+    breaker.record_failure('https://spolek.cz/', 'dns')
+    error = breaker.open_error('https://www.spolek.cz/kontakt')
+    assert isinstance(error, CircuitOpenError)
+    assert isinstance(error, ConnectionError)
+    assert str(error) == 'Circuit open for spolek.cz'
+    breaker.is_open('https://spolek.cz/o-nas')
+    breaker.is_open('https://jiny-web.cz/')
+    assert breaker.stats() == {'open': 1, 'failing': 0, 'short_circuited': 2}
+
+
+def test_unreachable_hosts_keep_the_reason_of_opening():
+    breaker = HostCircuitBreaker(failure_threshold=2)
+    for reason in ('dns', 'dns', 'timeout'):
+        breaker.record_failure('https://mrtvy-web.cz/', reason)
+    breaker.record_failure('https://pomaly-web.cz/', 'tls')
+    breaker.record_failure('https://pomaly-web.cz/', 'tls')
+    breaker.record_failure('https://jiny-web.cz/', 'connect')
+    assert breaker.unreachable_hosts() == [{'host': 'mrtvy-web.cz', 'failures': 2, 'reason': 'dns'},
+                                           {'host': 'pomaly-web.cz', 'failures': 2, 'reason': 'tls'}]
+    assert breaker.stats() == {'open': 2, 'failing': 1, 'short_circuited': 0}
@@ -0,0 +1,73 @@
+import pytest
+
+from contact_links import (PATH_DEPTH_PENALTY, SAME_HOST_BONUS, SiteBudget, link_key, next_contact_pages,
+                           rank_contact_links, score_contact_link)
+
+BASE = 'https://www.spolek.cz/'
+
+
+@pytest.mark.parametrize('url, key', [
+    ('https://www.spolek.cz/kontakt/', 'spolek.cz/kontakt'),
+    ('http://SPOLEK.cz/kontakt?lang=en#mapa', 'spolek.cz/kontakt'),
+    ('https://poradna.spolek.cz/', 'poradna.spolek.cz'),
+])
+def test_link_key(url, key):
+    assert link_key(url) == key
+
+
+def test_query_and_fragment_variants_merge_into_one_candidate():
+    anchors = [('/kontakt?lang=en', 'Contact'), ('/kontakt#mapa', 'Kontakt'), ('kontakt/', 'kontakt')]
+    # The variant without a query wins, the fragment is dropped
+    assert rank_contact_links(anchors, BASE) == ['https://www.spolek.cz/kontakt']
+    assert rank_contact_links([('/kontakt?lang=en', 'Kontakt')], BASE) == ['https://www.spolek.cz/kontakt?lang=en']
+
+
+def test_same_host_bonus_orders_origins():
+    anchors = [('https://jiny-web.cz/kontakt', 'Kontakt'), ('https://poradna.spolek.cz/kontakt', 'Kontakt'),
+               ('/kontakt', 'Kontakt')]
+    assert rank_contact_links(anchors, BASE) == ['https://www.spolek.cz/kontakt',
+                                                 'https://poradna.spolek.cz/kontakt',
+                                                 'https://jiny-web.cz/kontakt']
+    assert score_contact_link('https://www.spolek.cz/kontakt', 'Kontakt', BASE) - \
+        score_contact_link('https://jiny-web.cz/kontakt', 'Kontakt', BASE) == SAME_HOST_BONUS
+
+
+def test_depth_penalty_prefers_shallow_pages():
+    assert score_contact_link('https://www.spolek.cz/a/b/kontakt', 'Kontakt', BASE) == \
+        score_contact_link('https://www.spolek.cz/kontakt', 'Kontakt', BASE) - 2 * PATH_DEPTH_PENALTY
+    anchors = [('/oddeleni/praha/kontakt', 'Kontakt'), ('/kontakt', 'Kontakt')]
+    assert rank_contact_links(anchors, BASE) == ['https://www.spolek.cz/kontakt',
+                                                 'https://www.spolek.cz/oddeleni/praha/kontakt']
+
+
+def test_ties_keep_page_order_and_non_candidates_are_dropped():
+    anchors = [('/o-nas', 'O nás'), ('/sluzby', 'Služby'), ('mailto:info@spolek.cz', 'Kontakt'),
+               ('/kontakt.pdf', 'Kontakt'), (None, 'Kontakt'), ('/', 'Kontakt'), ('/kdo-jsme', 'O nás')]
+    assert rank_contact_links(anchors, BASE, ['https://spolek.cz/kdo-jsme/']) == ['https://www.spolek.cz/o-nas']
+
+
+def test_budget_counts_pages_and_bytes():
+    budget = SiteBudget(max_pages=3, max_bytes=1000)
+    assert budget.pages_left() == 3
+    budget.spend(400)
+    budget.spend(None)
+    assert (budget.pages, budget.bytes, budget.pages_left()) == (2, 400, 1)
+    budget.spend(600)
+    assert budget.pages_left() == 0
+    # The byte cap closes the budget with pages left
+    budget = SiteBudget(max_pages=10, max_bytes=1000)
+    budget.spend(1500)
+    assert budget.pages_left() == 0
+
+
+def test_next_contact_pages_respects_top_k_budget_and_visited():
+    candidates = ['https://www.spolek.cz/kontakt', 'https://spolek.cz/kontakt/', 'https://www.spolek.cz/o-nas',
+                  'https://www.spolek.cz/kdo-jsme', 'https://www.spolek.cz/about']
+    budget = SiteBudget(max_pages=10, max_bytes=10 ** 6)
+    assert next_contact_pages(candidates, [BASE], budget, top_k=3) == [
+        'https://www.spolek.cz/kontakt', 'https://www.spolek.cz/o-nas', 'https://www.spolek.cz/kdo-jsme']
+    assert next_contact_pages(candidates, ['https://spolek.cz/o-nas'], budget, top_k=2) == [
+        'https://www.spolek.cz/kontakt', 'https://www.spolek.cz/kdo-jsme']
+    budget = SiteBudget(max_pages=2, max_bytes=10 ** 6)
+    budget.spend(100)
+    assert next_contact_pages(candidates, [BASE], budget, top_k=3) == ['https://www.spolek.cz/kontakt']
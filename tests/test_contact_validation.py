@@ -0,0 +1,160 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import contact_validation
+
+REPO_DIR = os.path.join(os.path.dirname(__file__), '..')
+# Output of contact_validation.py at the baseline commit (078091e) for the inputs of prepare_inputs,
+# generated with PYTHONHASHSEED=0, the baseline joins Source from a set
+GOLDEN_PATH = os.path.join(os.path.dirname(__file__), 'data', 'db_pomoci_flagged.csv')
+# Intended differences from the baseline, by row of the golden file. The baseline looked websites up with
+# str.contains as a regex, so websites with a query (? and +) never matched their own scraped contacts,
+# the domain index of find_new_contacts finds them.
+INTENDED_CHANGES = {
+    # search.seznam.cz query URLs
+    123: {'Matched': 'new_phone_match', 'New Contact': "['+420602350018']", 'New Matched': 'new_phone_match'},
+    127: {'Matched': 'new_phone_match',
+          'New Contact': "['+420373301297', '+420373301297', '+420377813111', '+420377813111', '+420377953439', "
+                         "'+420377953439', '+420602350018', '+420602350018', '+420602350018', '+420773252101', "
+                         "'+420773252101']",
+          'New Matched': 'new_phone_match'},
+    130: {'Matched': 'new_phone_match',
+          'New Contact': "['+420373301297', '+420377813111', '+420377953439', '+420602350018', '+420602350018', "
+                         "'+420773252101']",
+          'New Matched': 'new_phone_match'},
+    # zlin.charita.cz/adresar/?s=...#directory-detail, the first new contact fills the missing Telefon
+    # even when it is an email, as in the baseline
+    385: {'Telefon': 'info@zlin.charita.cz', 'Matched': 'new_email_match', 'New Contact': "['info@zlin.charita.cz']",
+          'New Matched': 'new_email_match'},
+}
+
+
+def prepare_inputs(directory):
+    """
+    Prevede pribalena data repozitare do vstupnich tabulek Keboola (in/tables) se jmeny sloupcu bez mezer.
+    """
+    tables = directory / 'in' / 'tables'
+    tables.mkdir(parents=True)
+    (directory / 'out' / 'tables').mkdir(parents=True)
+    pd.read_csv(os.path.join(REPO_DIR, 'db_pomoci.csv')).to_csv(tables / 'db_pomoci.csv', index=False)
+    scraped = pd.read_csv(os.path.join(REPO_DIR, 'data', '2_06', 'df_scraped_2_06 (1).csv'), index_col=0)
+    scraped.columns = [column.replace(' ', '_') for column in scraped.columns]
+    scraped.to_csv(tables / 'df_scraped.csv', index=False)
+    maps = pd.read_csv(os.path.join(REPO_DIR, 'data', 'maps_results.csv'), sep=';', encoding='utf-8-sig')
+    maps.columns = [column.replace(' ', '_') for column in maps.columns]
+    maps.to_csv(tables / 'maps_scraped.csv', index=False)
+
+
+def expected_output():
+    """
+    Nacte vystup baseline a aplikuje na nej zamerne zmeny, zdroje ve Source jsou serazene.
+    """
+    expected = pd.read_csv(GOLDEN_PATH, dtype=str, keep_default_na=False)
+    expected['Source'] = expected['Source'].map(lambda source: ', '.join(sorted(source.split(', '))) if source else '')
+    for row, changes in INTENDED_CHANGES.items():
+        for column, value in changes.items():
+            expected.at[row, column] = value
+    return expected
+
+
+@pytest.mark.parametrize('processes', [1, 2])
+def test_flagged_output_matches_golden(tmp_path, monkeypatch, processes):
+    monkeypatch.setattr(contact_validation, 'CLEANING_PROCESSES', processes)
+    prepare_inputs(tmp_path)
+    monkeypatch.chdir(tmp_path)
+    contact_validation.main()
+    output = pd.read_csv(tmp_path / 'out' / 'tables' / 'db_pomoci_flagged.csv', dtype=str, keep_default_na=False)
+    pd.testing.assert_frame_equal(output, expected_output())
+
+
+def test_build_domain_index_keys_urls_with_query_and_fragment():
+    scraped = pd.DataFrame({
+        'Base_Website': ['https://search.seznam.cz/?q=ambulance+plzen', 'https://WWW.Charita.cz/adresar/#detail',
+                         'charita.cz/?s=poradna', None, 'https://www.charita.cz/'],
+        'Contact': ['+420602350018', 'info@charita.cz', '+420577000111', 'x@y.cz', None],
+        'Contact_type': ['Phone', 'Email', 'Phone', 'Email', 'Email'],
+    })
+    index = contact_validation.build_domain_index(scraped, 'Base_Website', ['Base_Website', 'Contact'])
+    # Rows without a contact or a website are left out, the query and fragment do not change the key
+    assert dict(index) == {
+        'seznam.cz': [('https://search.seznam.cz/?q=ambulance+plzen', '+420602350018')],
+        'charita.cz': [('https://WWW.Charita.cz/adresar/#detail', 'info@charita.cz'),
+                       ('charita.cz/?s=poradna', '+420577000111')],
+    }
+
+
+def test_find_new_contacts_for_websites_with_query_or_fragment():
+    maps = pd.DataFrame({'Web': ['https://www.charita.cz/adresar/?s=dluhy#detail'],
+                         'Contact': ['info@charita.cz']})
+    scraped = pd.DataFrame({
+        'Base_Website': ['https://search.seznam.cz/?q=ambulance+plzen&oq=ambulance',
+                         'https://www.charita.cz/adresar/?s=dluhy#detail',
+                         'https://www.charita.cz/adresar/?s=dluhy#detail',
+                         'https://www.spolek.cz/o-nas#kontakt',
+                         'https://jiny-web.cz/?q=ambulance+plzen'],
+        'Contact': ['+420602350018', 'info@charita.cz', '+420577000111', 'spolek@spolek.cz', '+420777000111'],
+        'Contact_type': ['Phone', 'Email', 'Phone', 'Email', 'Phone'],
+    })
+    db_pomoci = pd.DataFrame({
+        'Matched': ['unmatched', 'unmatched', 'unmatched', 'unmatched', 'matched'],
+        'Webova_stranka': [
+            # Query with regex characters (? and +), a prefix of the scraped URL
+            'https://search.seznam.cz/?q=ambulance+plzen',
+            # Query and fragment, found in maps and in the scraped data
+            'https://www.charita.cz/adresar/?s=dluhy#detail',
+            # Fragment only
+            'https://www.spolek.cz/o-nas#kontakt',
+            # The same query on another domain is not a candidate
+            'https://www.jina-ambulance.cz/?q=ambulance+plzen',
+            'https://search.seznam.cz/?q=ambulance+plzen',
+        ],
+    })
+    new_contacts, new_matched = contact_validation.find_new_contacts(db_pomoci, maps, scraped)
+    assert new_contacts == [['+420602350018'], ['info@charita.cz', 'info@charita.cz'], ['spolek@spolek.cz'],
+                            None, None]
+    assert new_matched == ['new_phone_match', 'new_contact_both_match_with_email', 'new_email_match', None, None]
+
+
+def test_find_new_contacts_looks_up_the_crawled_url_of_the_frontier():
+    scraped = pd.DataFrame({'Base_Website': ['https://www.spolek.cz/?lang=cs'], 'Contact': ['+420602350018'],
+                            'Contact_type': ['Phone']})
+    db_pomoci = pd.DataFrame({'Matched': ['unmatched'], 'Webova_stranka': ['www.spolek.cz?lang=cs#uvod']})
+    maps = pd.DataFrame(columns=['Web', 'Contact'])
+    assert contact_validation.find_new_contacts(db_pomoci, maps, scraped) == ([None], [None])
+    url_map = {'www.spolek.cz?lang=cs#uvod': 'https://www.spolek.cz/?lang=cs'}
+    assert contact_validation.find_new_contacts(db_pomoci, maps, scraped, url_map) == \
+        ([['+420602350018']], ['new_phone_match'])
+
+
+def test_match_contacts_email_phone_both_and_neither():
+    maps = pd.DataFrame({'Contact': ['+420602350018', None]})
+    scraped = pd.DataFrame({'Contact': ['info@spolek.cz', '+420777000111', '+420602350018', None]})
+    db_pomoci = pd.DataFrame({
+        'E_mail': ['info@spolek.cz', None, 'info@spolek.cz', 'jiny@spolek.cz', None],
+        'Telefon': ['+420111222333', '+420602350018', '+420777000111', '+420111222333', None],
+    })
+    matched, sources = contact_validation.match_contacts(db_pomoci, maps, scraped)
+    assert matched.tolist() == ['matched', 'matched', 'matched', 'unmatched', 'unmatched']
+    # Missing contacts never match the missing contacts of the sources
+    assert sources.tolist() == ['scraped_contacts_email',
+                                'maps_contacts_telefon, scraped_contacts_telefon',
+                                'scraped_contacts_email, scraped_contacts_telefon',
+                                None, None]
+
+
+def test_map_unique_keeps_input_order_with_and_without_processes():
+    values = pd.Series(['B@X.cz ', np.nan, 'a@x.cz', 'B@X.cz ', 'c@x.cz', np.nan, 'a@x.cz', 'd@x.cz'],
+                       index=[7, 6, 5, 4, 3, 2, 1, 0])
+    expected = pd.Series([contact_validation.clean_email(value) if isinstance(value, str) else np.nan
+                          for value in values], index=values.index)
+    in_process = contact_validation.map_unique(contact_validation.clean_emails_shard, values)
+    # Shards of two values, the four distinct values go to both processes
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        two_processes = contact_validation.map_unique(contact_validation.clean_emails_shard, values, executor,
+                                                      shard_size=2)
+    pd.testing.assert_series_equal(in_process, expected)
+    pd.testing.assert_series_equal(two_processes, in_process)
@@ -0,0 +1,161 @@
+import socket
+
+import pytest
+
+import dns_cache
+from dns_cache import DNSCache, dead_host_error, host_of, is_ip_address, set_dns_cache
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class StubResolver:
+    """
+    Odpovedi resolveru podle hostu: (adresy, TTL), None pro neexistujici domenu, nebo vyjimka.
+    """
+
+    def __init__(self, answers):
+        self.answers = answers
+        self.queries = []
+
+    def __call__(self, host):
+        self.queries.append(host)
+        answer = self.answers[host]
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def resolver():
+    return StubResolver({
+        'spolek.cz': (['192.0.2.1'], 60),
+        'neexistuje.cz': None,
+        'pomaly-dns.cz': socket.gaierror(socket.EAI_AGAIN, 'timeout'),
+    })
+
+
+@pytest.fixture
+def cache(clock, resolver, monkeypatch):
+    cache = DNSCache(default_ttl=300, negative_ttl=600, clock=clock)
+    monkeypatch.setattr(cache, '_lookup', resolver)
+    return cache
+
+
+def test_positive_entry_expires_after_its_ttl(cache, clock, resolver):
+    assert cache.resolve('Spolek.cz') == ['192.0.2.1']
+    clock.now += 59
+    assert cache.resolve('spolek.cz') == ['192.0.2.1']
+    assert resolver.queries == ['spolek.cz']
+    clock.now += 1
+    cache.resolve('spolek.cz')
+    assert resolver.queries == ['spolek.cz', 'spolek.cz']
+    assert cache.stats() == {'hits': 1, 'misses': 2, 'entries': 1, 'dead': 0}
+
+
+def test_unknown_domain_is_remembered_for_the_negative_ttl(cache, clock, resolver):
+    with pytest.raises(socket.gaierror):
+        cache.resolve('neexistuje.cz')
+    assert cache.is_dead('NEEXISTUJE.cz')
+    clock.now += 599
+    with pytest.raises(socket.gaierror, match='cached'):
+        cache.resolve('neexistuje.cz')
+    assert resolver.queries == ['neexistuje.cz']
+    clock.now += 1
+    assert not cache.is_dead('neexistuje.cz')
+    with pytest.raises(socket.gaierror):
+        cache.resolve('neexistuje.cz')
+    assert resolver.queries == ['neexistuje.cz', 'neexistuje.cz']
+    assert cache.stats() == {'hits': 1, 'misses': 2, 'entries': 1, 'dead': 1}
+
+
+def test_resolver_failures_are_not_cached(cache, resolver):
+    for _ in range(2):
+        with pytest.raises(socket.gaierror):
+            cache.resolve('pomaly-dns.cz')
+    assert resolver.queries == ['pomaly-dns.cz', 'pomaly-dns.cz']
+    assert not cache.is_dead('pomaly-dns.cz')
+    assert cache.stats()['entries'] == 0
+
+
+def test_ip_addresses_skip_the_resolver(cache, resolver):
+    assert cache.resolve('192.0.2.7') == ['192.0.2.7']
+    assert cache.resolve('2001:db8::1') == ['2001:db8::1']
+    assert resolver.queries == []
+
+
+def test_prefetch_counts_outcomes_and_entries_expire(cache, clock, resolver):
+    counts = cache.prefetch(['spolek.cz', 'spolek.cz', 'neexistuje.cz', 'pomaly-dns.cz', None, ''])
+    assert counts == {'resolved': 1, 'dead': 1, 'failed': 1}
+    assert cache.stats() == {'hits': 0, 'misses': 3, 'entries': 2, 'dead': 1}
+    # The prefetched entries serve the crawl until they expire
+    cache.resolve('spolek.cz')
+    assert cache.stats()['hits'] == 1
+    clock.now += 600
+    cache.resolve('spolek.cz')
+    assert not cache.is_dead('neexistuje.cz')
+    assert resolver.queries.count('spolek.cz') == 2
+    assert cache.prefetch([]) == {'resolved': 0, 'dead': 0, 'failed': 0}
+
+
+def test_dead_host_error_uses_the_process_cache(cache):
+    with pytest.raises(socket.gaierror):
+        cache.resolve('neexistuje.cz')
+    assert dead_host_error('https://neexistuje.cz/kontakt') is None
+    set_dns_cache(cache)
+    try:
+        assert isinstance(dead_host_error('https://neexistuje.cz/kontakt'), socket.gaierror)
+        assert dead_host_error('https://spolek.cz/') is None
+        assert dead_host_error('http://[nevalidni') is None
+    finally:
+        set_dns_cache(None)
+
+
+@pytest.mark.skipif(dns_cache.dns is None, reason='dnspython is not installed')
+def test_dnspython_lookup_takes_the_smallest_ttl(clock):
+    class Answer(list):
+        def __init__(self, addresses, ttl):
+            super().__init__(type('Record', (), {'address': address})() for address in addresses)
+            self.rrset = type('RRset', (), {'ttl': ttl})()
+
+    class Resolver:
+        def __init__(self, answers):
+            self.answers = answers
+
+        def resolve(self, host, record_type):
+            answer = self.answers.get((host, record_type))
+            if answer is None:
+                raise dns_cache.dns.resolver.NoAnswer()
+            return answer
+
+    cache = DNSCache(clock=clock)
+    cache._resolver = Resolver({('spolek.cz', 'A'): Answer(['192.0.2.1'], 120),
+                                ('spolek.cz', 'AAAA'): Answer(['2001:db8::1'], 30)})
+    assert cache.resolve('spolek.cz') == ['192.0.2.1', '2001:db8::1']
+    clock.now += 30
+    assert cache._lookup_dnspython('neexistuje.cz') is None
+    cache._resolver.answers.clear()
+    with pytest.raises(socket.gaierror):
+        cache.resolve('spolek.cz')
+    assert cache.is_dead('spolek.cz')
+
+
+@pytest.mark.parametrize('host, expected', [('192.0.2.1', True), ('::1', True), ('spolek.cz', False), ('', False)])
+def test_is_ip_address(host, expected):
+    assert is_ip_address(host) is expected
+
+
+def test_host_of():
+    assert host_of('https://WWW.Spolek.cz:8080/kontakt') == 'www.spolek.cz'
+    assert host_of('http://[nevalidni') is None
@@ -0,0 +1,105 @@
+import pytest
+
+from domain_scheduler import SLOT_POLL_INTERVAL, DomainScheduler, domain_key, interleave_by_domain
+
+URL = 'https://www.spolek.cz/kontakt'
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def state(scheduler, url=URL):
+    return scheduler._domains[domain_key(url)]
+
+
+def test_domain_key_ignores_www_and_port():
+    assert domain_key('http://WWW.Spolek.cz:8080/a') == 'spolek.cz'
+
+
+def test_interleave_by_domain_alternates_hosts():
+    urls = ['https://a.cz/1', 'https://a.cz/2', 'https://b.cz/1']
+    assert interleave_by_domain(urls) == ['https://a.cz/1', 'https://b.cz/1', 'https://a.cz/2']
+
+
+def test_token_bucket_allows_burst_then_waits_for_refill(clock):
+    scheduler = DomainScheduler(rate=2.0, burst=2, initial_concurrency=10, max_concurrency=10, clock=clock)
+    assert scheduler.try_acquire(URL) == 0
+    assert scheduler.try_acquire(URL) == 0
+    # Empty bucket, one token comes after 1 / rate seconds
+    assert scheduler.try_acquire(URL) == pytest.approx(0.5)
+    clock.now += 0.25
+    assert scheduler.try_acquire(URL) == pytest.approx(0.25)
+    clock.now += 0.25
+    assert scheduler.try_acquire(URL) == 0
+
+
+def test_token_bucket_is_capped_at_burst(clock):
+    scheduler = DomainScheduler(rate=2.0, burst=2, initial_concurrency=10, max_concurrency=10, clock=clock)
+    scheduler.try_acquire(URL)
+    clock.now += 60
+    scheduler.try_acquire(URL)
+    assert state(scheduler)['tokens'] == pytest.approx(1.0)
+
+
+def test_domains_have_separate_buckets(clock):
+    scheduler = DomainScheduler(rate=1.0, burst=1, initial_concurrency=10, max_concurrency=10, clock=clock)
+    assert scheduler.try_acquire(URL) == 0
+    assert scheduler.try_acquire('https://jiny-spolek.cz/') == 0
+    assert scheduler.try_acquire(URL) > 0
+
+
+def test_concurrency_limit_blocks_until_release(clock):
+    scheduler = DomainScheduler(rate=100.0, burst=100, initial_concurrency=2, max_concurrency=4, clock=clock)
+    assert scheduler.try_acquire(URL) == 0
+    assert scheduler.try_acquire(URL) == 0
+    assert scheduler.try_acquire(URL) == SLOT_POLL_INTERVAL
+    scheduler.release(URL)
+    assert scheduler.try_acquire(URL) == 0
+
+
+def test_success_grows_limit_by_one_over_limit(clock):
+    scheduler = DomainScheduler(rate=100.0, burst=100, initial_concurrency=2, max_concurrency=4, clock=clock)
+    scheduler.try_acquire(URL)
+    scheduler.release(URL)
+    assert state(scheduler)['limit'] == pytest.approx(2.5)
+    scheduler.try_acquire(URL)
+    scheduler.release(URL)
+    assert state(scheduler)['limit'] == pytest.approx(2.5 + 1 / 2.5)
+
+
+def test_success_does_not_exceed_max_concurrency(clock):
+    scheduler = DomainScheduler(rate=100.0, burst=100, initial_concurrency=4, max_concurrency=4, clock=clock)
+    scheduler.try_acquire(URL)
+    scheduler.release(URL)
+    assert state(scheduler)['limit'] == 4.0
+
+
+def test_backoff_halves_limit_and_empties_bucket(clock):
+    scheduler = DomainScheduler(rate=2.0, burst=4, initial_concurrency=4, max_concurrency=4, clock=clock)
+    scheduler.try_acquire(URL)
+    scheduler.release(URL, backoff=True)
+    assert state(scheduler)['limit'] == 2.0
+    assert state(scheduler)['tokens'] == 0.0
+    assert scheduler.backoffs == 1
+    assert scheduler.try_acquire(URL) == pytest.approx(0.5)
+
+
+def test_backoff_never_drops_limit_below_one(clock):
+    scheduler = DomainScheduler(rate=100.0, burst=100, initial_concurrency=1, max_concurrency=4, clock=clock)
+    for _ in range(3):
+        clock.now += 1
+        scheduler.try_acquire(URL)
+        scheduler.release(URL, backoff=True)
+    assert state(scheduler)['limit'] == 1.0
+    assert scheduler.backoffs == 3
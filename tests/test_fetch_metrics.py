@@ -0,0 +1,26 @@
+import pytest
+
+from fetch_metrics import FETCH_LOG_COLUMNS, FetchLog, new_fetch_record, set_status, summarize_fetch_log
+
+
+def fetch_record(url, total_s, status=200, dns_s=0.0):
+    record = new_fetch_record(url)
+    set_status(record, status)
+    record.update(total_s=total_s, dns_s=dns_s, bytes=1000)
+    return record
+
+
+@pytest.mark.parametrize('path', [None, 'logs/fetch_log.csv'])
+def test_fetch_log_summary(tmp_path, path):
+    fetch_log = FetchLog(str(tmp_path / path) if path else None)
+    fetch_log.write(fetch_record('https://spolek.cz/', 0.5, dns_s=0.1))
+    fetch_log.write(fetch_record('https://pomaly-web.cz/kontakt', 2.0, status=503))
+    log = fetch_log.close()
+    assert list(log.columns) == FETCH_LOG_COLUMNS
+    assert len(log) == 2
+    slowest, failures = summarize_fetch_log(log)
+    assert list(slowest.index) == ['pomaly-web.cz', 'spolek.cz']
+    assert slowest.loc['pomaly-web.cz', ['requests', 'total_s', 'errors']].tolist() == [1, 2.0, 1]
+    assert slowest.loc['spolek.cz', ['requests', 'dns_s', 'errors']].tolist() == [1, 0.1, 0]
+    assert failures.to_dict() == {'ok': 1, 'http_5xx': 1}
+    assert summarize_fetch_log(log, top=1)[0].index.tolist() == ['pomaly-web.cz']
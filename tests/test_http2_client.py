@@ -0,0 +1,59 @@
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import http2_client
+from http2_client import Http2Session, aiohttp_errors
+
+pytestmark = pytest.mark.skipif(http2_client.httpx is None or http2_client.aiohttp is None,
+                                reason='httpx[http2] or aiohttp is not installed')
+
+
+class RedirectLoopHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        self.send_response(302)
+        self.send_header('Location', '/a' if self.path == '/b' else '/b')
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def redirect_loop_url():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), RedirectLoopHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/a"
+    server.shutdown()
+    server.server_close()
+
+
+def test_redirect_loop_raises_aiohttp_too_many_redirects(redirect_loop_url):
+    async def fetch():
+        async with Http2Session(timeout=5) as session:
+            async with session.get(redirect_loop_url):
+                pass
+
+    with pytest.raises(http2_client.aiohttp.TooManyRedirects) as error:
+        asyncio.run(fetch())
+    # A ClientResponseError, fetch_page_async gives up without retrying as with aiohttp
+    assert isinstance(error.value, http2_client.aiohttp.ClientResponseError)
+    assert isinstance(error.value.__cause__, http2_client.httpx.TooManyRedirects)
+
+
+@pytest.mark.parametrize('error, expected', [
+    ('ReadTimeout', asyncio.TimeoutError),
+    ('ConnectError', 'ClientConnectionError'),
+    ('DecodingError', 'ClientError'),
+])
+def test_httpx_errors_are_mapped(error, expected):
+    expected = getattr(http2_client.aiohttp, expected) if isinstance(expected, str) else expected
+    with pytest.raises(expected) as raised:
+        with aiohttp_errors('https://x.cz/'):
+            raise getattr(http2_client.httpx, error)('chyba')
+    assert isinstance(raised.value.__cause__, http2_client.httpx.HTTPError)
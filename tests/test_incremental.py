@@ -0,0 +1,37 @@
+import datetime
+
+import pandas as pd
+
+from incremental import select_websites_to_scrape, summarize_website
+
+NOW = datetime.datetime(2026, 10, 18)
+
+
+def main_row(emails, phones, **extra):
+    return dict({'Base Website': 'https://a.cz/', 'Scraped Page': 'https://a.cz/', 'Page Type': 'main',
+                 'Emails': emails, 'Phone Numbers': phones}, **extra)
+
+
+def test_summarize_website_separates_fetch_failures_from_missing_contacts():
+    assert summarize_website([main_row('info@a.cz', '+420111111111', Fetched=True)])['status'] == 'ok'
+    assert summarize_website([main_row('info@a.cz', '', Fetched=True)])['status'] == 'no_contacts'
+    assert summarize_website([main_row('', '', Fetched=False)])['status'] == 'failed'
+    # Checkpoint rows written without the key count as fetched
+    assert summarize_website([main_row('', None)])['status'] == 'no_contacts'
+    # The key does not change the content hash
+    assert summarize_website([main_row('a@a.cz', '1', Fetched=True)])['hash'] == \
+        summarize_website([main_row('a@a.cz', '1')])['hash']
+
+
+def test_select_retries_only_fetch_failures():
+    df = pd.DataFrame({'web': ['https://new.cz/', 'https://ok.cz/', 'https://empty.cz/', 'https://down.cz/',
+                               'https://old.cz/']})
+    recent = NOW - datetime.timedelta(days=1)
+    state = pd.DataFrame({
+        'Base Website': ['https://ok.cz/', 'https://empty.cz/', 'https://down.cz/', 'https://old.cz/'],
+        'Last Scraped': [recent, recent, recent, NOW - datetime.timedelta(days=30)],
+        'Content Hash': ['1', '2', '3', '4'],
+        'Status': ['ok', 'no_contacts', 'failed', 'no_contacts'],
+    })
+    selected = select_websites_to_scrape(df, state, max_age_days=7, now=NOW)
+    assert list(selected['web']) == ['https://new.cz/', 'https://down.cz/', 'https://old.cz/']
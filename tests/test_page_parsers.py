@@ -0,0 +1,49 @@
+import pytest
+
+import page_parsers
+from page_parsers import extract_text_and_links, has_nested_anchors
+
+pytestmark = pytest.mark.skipif(page_parsers.lxml is None, reason='lxml is not installed')
+
+
+@pytest.mark.parametrize('html', [
+    # Content after </html> and </body>
+    '<html><body><p>Uvod</p></body></html>\n<div>Kontakt: x@y.cz</div>',
+    '<html><body>a</body>b@c.cz</html>',
+    '</html><script>var a = "b@c.cz"</script><a href="/kontakt">Kontakt</a>',
+    # CDATA sections
+    '<html><body><p><![CDATA[x@y.cz]]></p></body></html>',
+    '<div>a</div><![CDATA[tel 123 456 789]]><p>b</p>',
+    # Nested anchors, html.parser keeps the inner text in the outer anchor
+    '<html><body><a href="/a">A <a href="/kontakt">Kontakt x@y.cz</a> tail</a></body></html>',
+    '<a href="/o-nas"><span>O nás <A HREF="/kontakt">kontakt</A></span></a>',
+    # Anchors nested in markup, text of skipped tags and comments
+    '<nav><a href="/kontakt"><b>Kon</b>takt <i>a mapa</i></a></nav>',
+    '<p>a<template><p>skryty@x.cz</p></template>b</p><ruby>k<rt>reading</rt></ruby>',
+    '<p>a<!-- stary@x.cz -->b</p><style>.x{content:"css@x.cz"}</style>',
+    # Attributes and entities
+    '<a href>prazdny</a><a href="">p2</a><a name="x">bez</a><A HREF="/K">Kontakt</A>',
+    '<a href="/a?x=1&amp;y=2">O n&aacute;s</a> tel.&nbsp;+420 777 888 999',
+    # Broken and empty documents
+    '<div><a href="/kontakt">Kontakt',
+    '<?xml version="1.0"?><!DOCTYPE html><html><body>x</body></html>',
+    'x@y.cz',
+    '',
+])
+def test_lxml_backend_matches_bs4(html):
+    assert extract_text_and_links(html, 'lxml') == extract_text_and_links(html, 'html.parser')
+
+
+@pytest.mark.parametrize('html, expected', [
+    ('<a href="/a">A</a><a href="/b">B</a>', False),
+    ('<a href="/a">A <a href="/b">B</a></a>', True),
+    ('<A href="/a">A <abbr>x</abbr><area></A><a>b</a>', False),
+    ('</a></a><a href="/a">A</a>', False),
+])
+def test_has_nested_anchors(html, expected):
+    assert has_nested_anchors(html) is expected
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        extract_text_and_links('<p>a</p>', 'selectolax')
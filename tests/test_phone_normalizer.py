@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from phone_normalizer import PHONE_COLUMNS, failed_phone, normalize_phones, parse_phone_cached, py_parse_phonenumber
+
+PHONES = [
+    # Czech numbers in the usual notations
+    '777 123 456', '+420 602 350 018', '00420602350018', 'tel.: 577 004 111',
+    # Foreign, invalid and not possible numbers that still parse
+    '+44 20 7946 0958', '+420 123', '999 999 999 999',
+    # Fewer than two digits, rejected before phonenumbers (failed_phone)
+    '', ' ', '1', 'tel.', 'info@spolek.cz', np.nan, None,
+    # Two digits and more that phonenumbers rejects (the except branch)
+    '12', '+1', '1' * 20, '+420 ' + '7' * 30, 'a1b2c3',
+    # Not a string at all
+    777123456,
+]
+
+
+def rowwise(values):
+    """
+    Puvodni zpracovani: py_parse_phonenumber pro kazdy radek pres Series.apply.
+    """
+    results = pd.Series(values, dtype=object).apply(py_parse_phonenumber)
+    return pd.DataFrame(results.tolist()).reindex(columns=PHONE_COLUMNS)
+
+
+@pytest.mark.parametrize('values', [
+    PHONES,
+    # Repeated values are parsed once and served from the cache
+    PHONES * 3,
+    ['', np.nan],
+    [np.nan, None],
+    [],
+])
+def test_normalize_phones_matches_rowwise_parse(values):
+    parse_phone_cached.cache_clear()
+    pd.testing.assert_frame_equal(normalize_phones(pd.Series(values, dtype=object)), rowwise(values),
+                                  check_dtype=False)
+
+
+def test_too_short_and_too_long_digit_strings():
+    values = pd.Series(['1', '12', '+1', '1' * 17, '1' * 20], dtype=object)
+    result = normalize_phones(values)
+    # One digit never reaches phonenumbers, '+1' and twenty digits end in its except branch
+    assert result['parsed'].tolist() == [False, True, False, True, False]
+    assert result['formated_number'].isna().tolist() == [True, False, True, False, True]
+    assert result.loc[~result['parsed'], 'number'].tolist() == ['1', '+1', '1' * 20]
+
+
+def test_failed_phone_matches_the_except_branch():
+    expected = py_parse_phonenumber('x')
+    assert dict(zip(PHONE_COLUMNS[1:], failed_phone('x')[1:])) == expected
+    assert np.isnan(failed_phone('x')[0])
+
+
+def test_index_is_kept():
+    values = pd.Series(['777 123 456', '1'], index=[10, 3], dtype=object)
+    result = normalize_phones(values)
+    assert result.index.tolist() == [10, 3]
+    assert result.loc[10, 'formated_number'] == '+420777123456'
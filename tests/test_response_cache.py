@@ -0,0 +1,111 @@
+import pytest
+
+from response_cache import ResponseCache, normalize_cache_key
+
+URL = 'https://www.spolek.cz/kontakt'
+RESULT = {'emails': ['info@spolek.cz'], 'phones': ['777 123 456'], 'links': []}
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    cache = ResponseCache(str(tmp_path / 'cache.sqlite'), ttl_seconds=100, clock=clock)
+    yield cache
+    cache.close()
+
+
+@pytest.mark.parametrize('url, key', [
+    ('HTTPS://WWW.Spolek.cz:443/kontakt#mapa', 'https://www.spolek.cz/kontakt'),
+    ('http://spolek.cz:80', 'http://spolek.cz/'),
+    ('http://spolek.cz:8080/?a=1', 'http://spolek.cz:8080/?a=1'),
+])
+def test_normalize_cache_key(url, key):
+    assert normalize_cache_key(url) == key
+
+
+def test_store_and_lookup(cache):
+    assert cache.get(URL) is None
+    cache.store(URL, '<html></html>', '"v1"', 'Mon, 01 Jun 2026 10:00:00 GMT', RESULT)
+    entry = cache.get('HTTPS://www.spolek.cz/kontakt#mapa')
+    assert entry == {'etag': '"v1"', 'last_modified': 'Mon, 01 Jun 2026 10:00:00 GMT', 'result': RESULT}
+    assert ResponseCache.conditional_headers(entry) == {'If-None-Match': '"v1"',
+                                                        'If-Modified-Since': 'Mon, 01 Jun 2026 10:00:00 GMT'}
+    assert cache.stats() == {'hits': 0, 'misses': 1, 'evictions': 0, 'entries': 1}
+
+
+def test_conditional_headers_without_validators():
+    assert ResponseCache.conditional_headers(None) == {}
+    assert ResponseCache.conditional_headers({'etag': None, 'last_modified': 'x', 'result': {}}) == \
+        {'If-Modified-Since': 'x'}
+
+
+def test_revalidation_counts_a_hit_and_renews_the_entry(cache, clock):
+    cache.store(URL, '<html></html>', '"v1"', None, RESULT)
+    clock.now += 90
+    entry = cache.get(URL)
+    # A 304 returns the stored parse result and restarts the TTL
+    assert cache.revalidated(URL, entry) == RESULT
+    clock.now += 90
+    assert cache.get(URL) is not None
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 0
+
+
+def test_expired_entry_is_a_miss_and_evicted(cache, clock):
+    cache.store(URL, '<html></html>', '"v1"', None, RESULT)
+    clock.now += 101
+    assert cache.get(URL) is None
+    assert cache.stats()['misses'] == 1
+    cache.evict()
+    assert cache.stats()['evictions'] == 1
+    assert cache.stats()['entries'] == 0
+
+
+def test_size_limit_evicts_least_recently_used(tmp_path, clock):
+    cache = ResponseCache(str(tmp_path / 'cache.sqlite'), ttl_seconds=100, max_bytes=25, clock=clock)
+    for page in ('a', 'b', 'c'):
+        cache.store(f'https://x.cz/{page}', '0123456789', None, None, RESULT)
+        clock.now += 1
+    cache.revalidated('https://x.cz/a', cache.get('https://x.cz/a'))
+    cache.evict()
+    assert cache.get('https://x.cz/b') is None
+    assert cache.get('https://x.cz/a') is not None
+    assert cache.get('https://x.cz/c') is not None
+    cache.close()
+
+
+def test_entries_persist_across_runs(tmp_path, clock):
+    path = str(tmp_path / 'cache.sqlite')
+    cache = ResponseCache(path, clock=clock)
+    cache.store(URL, '<html></html>', '"v1"', None, RESULT)
+    cache.close()
+    reopened = ResponseCache(path, clock=clock)
+    assert reopened.get(URL)['result'] == RESULT
+    # Counters are per run
+    assert reopened.stats() == {'hits': 0, 'misses': 0, 'evictions': 0, 'entries': 1}
+    reopened.close()
+
+
+def test_size_limit_counts_utf8_bytes(tmp_path, clock):
+    # Ten characters, twenty bytes in UTF-8
+    cache = ResponseCache(str(tmp_path / 'cache.sqlite'), ttl_seconds=100, max_bytes=30, clock=clock)
+    for page in ('a', 'b'):
+        cache.store(f'https://x.cz/{page}', 'čččččččččč', None, None, RESULT)
+        clock.now += 1
+    cache.evict()
+    assert cache.get('https://x.cz/a') is None
+    assert cache.get('https://x.cz/b') is not None
+    cache.close()
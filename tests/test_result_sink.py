@@ -0,0 +1,73 @@
+import pandas as pd
+import pytest
+
+from result_sink import PARQUET_AVAILABLE, FileResultSink, ResultSink
+
+COLUMNS = ['Base Website', 'Scraped Page', 'Page Type', 'Emails', 'Phone Numbers']
+
+
+def site_rows(website, emails, phones=''):
+    return [
+        {'Base Website': website, 'Scraped Page': website, 'Page Type': 'main', 'Emails': emails,
+         'Phone Numbers': phones},
+        {'Base Website': website, 'Scraped Page': website + 'kontakt', 'Page Type': 'contact', 'Emails': emails,
+         'Phone Numbers': phones},
+    ]
+
+
+def write_run(sink):
+    sink.write_previous(pd.DataFrame(site_rows('https://a.cz/', 'old@a.cz', '+420111111111') +
+                                     site_rows('https://c.cz/', 'old@c.cz', '+420333333333')))
+    # The first write of a.cz misses phones and is retried, the retry supersedes it
+    sink.write(site_rows('https://a.cz/', 'info@a.cz'))
+    sink.write(site_rows('https://b.cz/', 'info@b.cz', '+420222222222'))
+    sink.write(site_rows('https://a.cz/', 'info@a.cz', '+420111111111'))
+
+
+EXPECTED = pd.DataFrame(site_rows('https://c.cz/', 'old@c.cz', '+420333333333') +
+                        site_rows('https://b.cz/', 'info@b.cz', '+420222222222') +
+                        site_rows('https://a.cz/', 'info@a.cz', '+420111111111'), columns=COLUMNS)
+
+
+def test_memory_sink_drops_superseded_generations():
+    sink = ResultSink(COLUMNS)
+    write_run(sink)
+    assert sink.missing_websites() == []
+    assert list(sink.website_summaries()['Base Website']) == ['https://a.cz/', 'https://b.cz/']
+    pd.testing.assert_frame_equal(sink.close(), EXPECTED)
+
+
+def test_missing_websites_follow_the_last_write():
+    sink = ResultSink(COLUMNS)
+    sink.write(site_rows('https://a.cz/', 'info@a.cz'))
+    sink.write(site_rows('https://b.cz/', 'info@b.cz', '+420222222222'))
+    assert sink.missing_websites() == ['https://a.cz/']
+    summaries = sink.website_summaries().set_index('Base Website')['Status']
+    assert summaries.to_dict() == {'https://a.cz/': 'no_contacts', 'https://b.cz/': 'ok'}
+
+
+@pytest.mark.parametrize('chunksize', [1, 3, 1000])
+def test_file_sink_drops_superseded_generations(tmp_path, chunksize):
+    csv_path = str(tmp_path / 'out' / 'df_scraped.csv')
+    sink = FileResultSink(COLUMNS, csv_path, chunksize=chunksize)
+    write_run(sink)
+    assert sink.close() == len(EXPECTED)
+    result = pd.read_csv(csv_path, dtype=str, keep_default_na=False)
+    pd.testing.assert_frame_equal(result, EXPECTED)
+    assert not (tmp_path / 'out' / 'df_scraped.csv.partial').exists()
+
+
+def test_file_sink_without_rows_writes_header(tmp_path):
+    csv_path = str(tmp_path / 'df_scraped.csv')
+    assert FileResultSink(COLUMNS, csv_path).close() == 0
+    assert open(csv_path, encoding='utf-8').read().strip() == ','.join(COLUMNS)
+
+
+@pytest.mark.skipif(not PARQUET_AVAILABLE, reason='pyarrow is not installed')
+def test_file_sink_parquet_matches_csv(tmp_path):
+    csv_path = str(tmp_path / 'df_scraped.csv')
+    parquet_path = str(tmp_path / 'df_scraped.parquet')
+    sink = FileResultSink(COLUMNS, csv_path, parquet_path=parquet_path, chunksize=2)
+    write_run(sink)
+    sink.close()
+    pd.testing.assert_frame_equal(pd.read_parquet(parquet_path), EXPECTED)
@@ -0,0 +1,92 @@
+from contact_links import SiteBudget
+from site_discovery import (SitemapWalk, is_homepage_echo, page_fingerprint, parse_sitemap, probe_urls,
+                            sitemap_contact_links, sitemaps_from_robots)
+
+URLSET = """<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <url><loc>https://x.cz/</loc></url>
+  <url><loc> https://x.cz/o-nas/kontakt </loc></url>
+  <url><loc>https://x.cz/clanek?id=1&amp;page=2</loc></url>
+</urlset>"""
+
+INDEX = """<?xml version="1.0" encoding="UTF-8"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <sitemap><loc>https://x.cz/post-sitemap.xml</loc></sitemap>
+  <sitemap><loc>https://x.cz/page-sitemap.xml</loc></sitemap>
+</sitemapindex>"""
+
+
+def test_sitemaps_from_robots():
+    robots = "User-agent: *\nDisallow: /admin\nSitemap: https://x.cz/sitemap_index.xml\n" \
+             "  sitemap:/extra.xml\nSitemap: https://x.cz/sitemap_index.xml\n"
+    assert sitemaps_from_robots(robots, 'https://x.cz/') == ['https://x.cz/sitemap_index.xml',
+                                                             'https://x.cz/extra.xml']
+    assert sitemaps_from_robots("User-agent: *\nDisallow:\n", 'https://x.cz/') == []
+
+
+def test_parse_sitemap_urlset():
+    assert parse_sitemap(URLSET) == (['https://x.cz/', 'https://x.cz/o-nas/kontakt',
+                                      'https://x.cz/clanek?id=1&page=2'], [])
+
+
+def test_parse_sitemap_index_returns_nested_sitemaps():
+    assert parse_sitemap(INDEX) == ([], ['https://x.cz/post-sitemap.xml', 'https://x.cz/page-sitemap.xml'])
+
+
+def test_parse_sitemap_with_namespace_prefix():
+    xml = '<sm:urlset xmlns:sm="http://www.sitemaps.org/schemas/sitemap/0.9">' \
+          '<sm:url><sm:loc>https://x.cz/kontakt</sm:loc></sm:url></sm:urlset>'
+    assert parse_sitemap(xml) == (['https://x.cz/kontakt'], [])
+
+
+def walk_sitemaps(walk, files):
+    fetched = []
+    while True:
+        sitemap_url = walk.next_sitemap()
+        if sitemap_url is None:
+            return fetched
+        fetched.append(sitemap_url)
+        xml = files.get(sitemap_url)
+        walk.add(xml, len(xml) if xml is not None else None)
+
+
+def test_sitemap_walk_follows_index():
+    files = {'https://x.cz/sitemap_index.xml': INDEX,
+             'https://x.cz/page-sitemap.xml': URLSET}
+    walk = SitemapWalk(['https://x.cz/sitemap_index.xml'], SiteBudget(3, 10 ** 6))
+    # The post sitemap is missing, it still costs a file
+    assert walk_sitemaps(walk, files) == ['https://x.cz/sitemap_index.xml', 'https://x.cz/post-sitemap.xml',
+                                          'https://x.cz/page-sitemap.xml']
+    assert 'https://x.cz/o-nas/kontakt' in walk.page_urls
+    assert sitemap_contact_links(walk.page_urls, 'https://x.cz/') == ['https://x.cz/o-nas/kontakt']
+
+
+def test_sitemap_walk_stops_at_file_budget_and_skips_repeated_sitemaps():
+    index = INDEX.replace('https://x.cz/page-sitemap.xml', 'https://x.cz/sitemap_index.xml')
+    walk = SitemapWalk(['https://x.cz/sitemap_index.xml', 'https://x.cz/sitemap_index.xml'], SiteBudget(2, 10 ** 6))
+    assert walk_sitemaps(walk, {'https://x.cz/sitemap_index.xml': index}) == [
+        'https://x.cz/sitemap_index.xml', 'https://x.cz/post-sitemap.xml']
+    walk = SitemapWalk(['https://x.cz/sitemap_index.xml'], SiteBudget(10, 10 ** 6))
+    assert walk_sitemaps(walk, {'https://x.cz/sitemap_index.xml': index}) == [
+        'https://x.cz/sitemap_index.xml', 'https://x.cz/post-sitemap.xml']
+
+
+def test_sitemap_walk_stops_at_byte_budget():
+    walk = SitemapWalk(['https://x.cz/sitemap_index.xml'], SiteBudget(10, len(INDEX)))
+    assert walk_sitemaps(walk, {'https://x.cz/sitemap_index.xml': INDEX}) == ['https://x.cz/sitemap_index.xml']
+
+
+def test_probe_urls():
+    assert probe_urls('https://x.cz/sluzby/', ['/kontakt', '/o-nas']) == ['https://x.cz/kontakt',
+                                                                          'https://x.cz/o-nas']
+
+
+def test_is_homepage_echo():
+    homepage = page_fingerprint('https://www.x.cz/', '<html>Uvod</html>')
+    # Redirected to the homepage, or the homepage served for an unknown path
+    assert is_homepage_echo(page_fingerprint('https://x.cz', '<html>Jina</html>'), homepage)
+    assert is_homepage_echo(page_fingerprint('https://x.cz/kontakt', '<html>Uvod</html>'), homepage)
+    assert not is_homepage_echo(page_fingerprint('https://x.cz/kontakt', '<html>Kontakt</html>'), homepage)
+    # Cache entries stored without a fingerprint are kept
+    assert not is_homepage_echo(None, homepage)
+    assert not is_homepage_echo(homepage, None)
@@ -0,0 +1,66 @@
+import pandas as pd
+import pytest
+
+from url_normalizer import build_frontier, canonical_url, url_key
+
+
+@pytest.mark.parametrize('url, expected', [
+    # Scheme and www variants
+    ('x.cz', 'https://www.x.cz/'),
+    ('www.x.cz', 'https://www.x.cz/'),
+    ('poradna.x.cz/kontakt', 'https://poradna.x.cz/kontakt'),
+    ('http://x.cz', 'http://x.cz/'),
+    ('HTTPS://WWW.X.CZ:443/Kontakt#mapa', 'https://www.x.cz/Kontakt'),
+    ('http://x.cz:8080/', 'http://x.cz:8080/'),
+    (' https://x.cz/a b ', 'https://x.cz/ab'),
+    # IDNA hosts
+    ('https://žluťoučký.cz/', 'https://xn--luouk-uva4it5a4g.cz/'),
+    ('https://xn--luouk-uva4it5a4g.cz/', 'https://xn--luouk-uva4it5a4g.cz/'),
+    # Tracking parameters
+    ('https://x.cz/?utm_source=fb&utm_medium=cpc', 'https://x.cz/'),
+    ('https://x.cz/a?id=1&fbclid=abc&UTM_campaign=x', 'https://x.cz/a?id=1'),
+    ('https://x.cz/?%75tm_source=fb&id=1', 'https://x.cz/?id=1'),
+    # The rest of the query is kept verbatim
+    ('https://x.cz/?/kontakt/', 'https://x.cz/?/kontakt/'),
+    ('https://x.cz/index.php?kontakt', 'https://x.cz/index.php?kontakt'),
+    ('https://x.cz/?q=a%20b&gclid=1', 'https://x.cz/?q=a%20b'),
+    ('https://x.cz/?q=a+b&sleva=5%', 'https://x.cz/?q=a+b&sleva=5%'),
+    ('https://x.cz/?b=2&a=1', 'https://x.cz/?b=2&a=1'),
+    # Addresses without a host
+    ('https://', None),
+    ('http://x.cz:port/', None),
+])
+def test_canonical_url(url, expected):
+    assert canonical_url(url) == expected
+
+
+@pytest.mark.parametrize('urls, key', [
+    (['http://x.cz', 'https://www.x.cz/', 'x.cz', 'www.x.cz/'], 'x.cz'),
+    (['https://x.cz/kontakt/', 'http://www.x.cz/kontakt', 'x.cz/kontakt#mapa'], 'x.cz/kontakt'),
+    (['https://x.cz/?/kontakt/&utm_source=fb', 'x.cz?/kontakt/'], 'x.cz?/kontakt/'),
+    (['https://žluťoučký.cz', 'xn--luouk-uva4it5a4g.cz'], 'xn--luouk-uva4it5a4g.cz'),
+    (['https://', ''], ''),
+])
+def test_url_key(urls, key):
+    assert [url_key(url) for url in urls] == [key] * len(urls)
+
+
+def test_build_frontier_fetches_every_key_once():
+    df = pd.DataFrame({'web': ['http://x.cz', 'https://www.x.cz/', 'x.cz/kontakt', 'https://y.cz/a/b?utm_source=fb',
+                               'https://', 'poradna.x.cz']},
+                      index=[10, 11, 12, 13, 14, 15])
+    frontier, mapping = build_frontier(df)
+    # https from the source wins over the first address of the variants
+    assert frontier.to_dict('list') == {
+        'web': ['https://www.x.cz/', 'https://www.x.cz/kontakt', 'https://y.cz/a/b', 'https://y.cz/',
+                'https://poradna.x.cz/'],
+        'source_rows': [3, 1, 1, 1, 1],
+    }
+    assert mapping.to_dict('list') == {
+        'source_row': [10, 11, 12, 12, 13, 13, 15],
+        'source_web': ['http://x.cz', 'https://www.x.cz/', 'x.cz/kontakt', 'x.cz/kontakt',
+                       'https://y.cz/a/b?utm_source=fb', 'https://y.cz/a/b?utm_source=fb', 'poradna.x.cz'],
+        'web': ['https://www.x.cz/', 'https://www.x.cz/', 'https://www.x.cz/kontakt', 'https://www.x.cz/',
+                'https://y.cz/a/b', 'https://y.cz/', 'https://poradna.x.cz/'],
+        'url_key': ['x.cz', 'x.cz', 'x.cz/kontakt', 'x.cz', 'y.cz/a/b', 'y.cz', 'poradna.x.cz'],
+    }